@@ -1,24 +1,401 @@
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from flask import Flask, g, has_request_context, request, jsonify, send_file, send_from_directory
 from flask_cors import CORS
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+from werkzeug.utils import secure_filename
 from lxml import etree
 import os
-import tempfile
+import threading
+import time
 import yaml
-from io import BytesIO
 import json
+import contextvars
+import zipfile
+import zlib
+from io import BytesIO, RawIOBase
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import ObjectCache, ResultCache, content_key
+from compare import diff_environments
+from content_encoding import COMPRESSIBLE_MIMETYPES, ENCODINGS, compress, negotiate
+from fragments import FragmentRenderer
+from includes import IncludeError, IncludeResolver, uses_includes
+from json_export import JsonExporter
+from model import Config, build_config
+from multi_env import MultiEnvironmentRenderer, yaml_stream
+from native_render import NATIVE_RENDERERS
+from metrics import BYTE_BUCKETS, MetricsRegistry
+from profiling import ProfileSession, ProfileStore, active_session
+from registry import CompiledRegistry
+from targets import (
+    XSD_SCHEMA_PATH, DOCKER_COMPOSE_XSLT, KUBERNETES_XSLT, HELM_XSLT, JSON_XSLT,
+    GITHUB_ACTIONS_XSLT, JENKINS_XSLT, EXAMPLES_DIR, TRANSFORM_TARGETS, TARGET_FILENAMES
+)
+from validation import VALIDATION_MODES, IncrementalValidator, validate_document, validate_while_parsing
+from workers import JobTimeout, PoolBusy, WorkerPool, run_job
 
 app = Flask(__name__)
 CORS(app)
 
-# Chemins des fichiers
-XSD_SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'schemas', 'config.xsd')
-DOCKER_COMPOSE_XSLT = os.path.join(os.path.dirname(__file__), 'xslt', 'docker-compose.xslt')
-KUBERNETES_XSLT = os.path.join(os.path.dirname(__file__), 'xslt', 'kubernetes.xslt')
-HELM_XSLT = os.path.join(os.path.dirname(__file__), 'xslt', 'helm.xslt')
-JSON_XSLT = os.path.join(os.path.dirname(__file__), 'xslt', 'json.xslt')
-GITHUB_ACTIONS_XSLT = os.path.join(os.path.dirname(__file__), 'xslt', 'github-actions.xslt')
-JENKINS_XSLT = os.path.join(os.path.dirname(__file__), 'xslt', 'jenkins.xslt')
-EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), 'examples')
+# Nombre de threads pour /api/transform/batch
+app.config.setdefault('BATCH_MAX_WORKERS', int(os.environ.get('BATCH_MAX_WORKERS', os.cpu_count() or 4)))
+_batch_executor = None
+_batch_executor_lock = threading.Lock()
+
+# Exécution de la validation et des transformations : 'thread' (dans le
+# processus de l'API) ou 'process' (pool de processus, file bornée)
+app.config.setdefault('WORKER_MODE', os.environ.get('WORKER_MODE', 'thread'))
+app.config.setdefault('WORKER_PROCESSES', int(os.environ.get('WORKER_PROCESSES', os.cpu_count() or 2)))
+app.config.setdefault('WORKER_QUEUE_SIZE', int(os.environ.get('WORKER_QUEUE_SIZE', 2 * app.config['WORKER_PROCESSES'])))
+app.config.setdefault('WORKER_TIMEOUT', float(os.environ.get('WORKER_TIMEOUT', 30)))
+_worker_pool = None
+_worker_pool_lock = threading.Lock()
+
+# Taille maximale d'un corps de requête (après décompression gzip), 0 pour aucune limite ;
+# vérifiée sur Content-Length avant toute lecture
+if app.config.get('MAX_CONTENT_LENGTH') is None:
+    app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 64 * 1024 * 1024)) or None
+
+# Taille des morceaux envoyés par les réponses en streaming
+app.config.setdefault('STREAM_CHUNK_SIZE', int(os.environ.get('STREAM_CHUNK_SIZE', 64 * 1024)))
+
+# Validation : 'tree' (après parsing), 'streaming' (pendant le parsing)
+# ou 'incremental' (par environnement, résultats en cache)
+app.config.setdefault('VALIDATION_MODE', os.environ.get('VALIDATION_MODE', 'tree'))
+# Arrêt après N erreurs de validation (0 = toutes)
+app.config.setdefault('VALIDATION_MAX_ERRORS', int(os.environ.get('VALIDATION_MAX_ERRORS', 0)))
+# Lever les limites de libxml2 pour les très gros documents (choix explicite)
+app.config.setdefault('XML_HUGE_TREE', os.environ.get('XML_HUGE_TREE', '').lower() in ('1', 'true', 'yes'))
+
+# Configurations multi-fichiers : racine locale des fichiers désignés par
+# <xi:include href="..."/> (vide : inclusions désactivées). Chaque fichier
+# inclus est parsé une fois puis gardé en cache tant que mtime et taille ne changent pas
+app.config.setdefault('INCLUDE_ROOT', os.environ.get('INCLUDE_ROOT', ''))
+app.config.setdefault('INCLUDE_CACHE_SIZE', int(os.environ.get('INCLUDE_CACHE_SIZE', 256)))
+include_resolver = IncludeResolver(app.config['INCLUDE_CACHE_SIZE'], app.config['XML_HUGE_TREE'])
+
+# Schéma et feuilles compilés une seule fois au démarrage
+registry = CompiledRegistry(XSD_SCHEMA_PATH, TRANSFORM_TARGETS)
+registry.warm_up()
+
+# Résultats de validation par environnement (mode 'incremental')
+incremental_validator = IncrementalValidator(XSD_SCHEMA_PATH)
+
+# Export JSON natif, typé d'après le schéma XSD ('native' ou 'xslt')
+app.config.setdefault('JSON_ENGINE', os.environ.get('JSON_ENGINE', 'native'))
+json_exporter = JsonExporter(XSD_SCHEMA_PATH)
+
+# Moteur de rendu kubernetes / docker-compose ('xslt' ou 'native', sortie identique)
+app.config.setdefault('RENDER_ENGINE', os.environ.get('RENDER_ENGINE', 'xslt'))
+
+# Cache des réponses de transformation, borné en octets
+app.config.setdefault('RESULT_CACHE_MAX_BYTES', int(os.environ.get('RESULT_CACHE_MAX_BYTES', 64 * 1024 * 1024)))
+result_cache = ResultCache(app.config['RESULT_CACHE_MAX_BYTES'])
+
+# Compression des réponses négociée par Accept-Encoding (gzip, zstd si installé) ;
+# les réponses plus petites que COMPRESSION_MIN_SIZE octets sont envoyées telles quelles
+app.config.setdefault('COMPRESSION_ENABLED', os.environ.get('COMPRESSION_ENABLED', '1').lower() in ('1', 'true', 'yes'))
+app.config.setdefault('COMPRESSION_MIN_SIZE', int(os.environ.get('COMPRESSION_MIN_SIZE', 1024)))
+app.config.setdefault('COMPRESSION_GZIP_LEVEL', int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6)))
+app.config.setdefault('COMPRESSION_ZSTD_LEVEL', int(os.environ.get('COMPRESSION_ZSTD_LEVEL', 3)))
+
+# Modèles compacts (export, comparaison, environnements) partagés par empreinte du XML
+app.config.setdefault('MODEL_CACHE_SIZE', int(os.environ.get('MODEL_CACHE_SIZE', 16)))
+model_cache = ObjectCache(app.config['MODEL_CACHE_SIZE'])
+
+# Rendu incrémental kubernetes / docker-compose : fragments par service en cache
+app.config.setdefault('INCREMENTAL_RENDERING', os.environ.get('INCREMENTAL_RENDERING', '').lower() in ('1', 'true', 'yes'))
+app.config.setdefault('FRAGMENT_CACHE_MAX_BYTES', int(os.environ.get('FRAGMENT_CACHE_MAX_BYTES', 32 * 1024 * 1024)))
+fragment_cache = ResultCache(app.config['FRAGMENT_CACHE_MAX_BYTES'])
+fragment_renderer = FragmentRenderer(registry, fragment_cache, TRANSFORM_TARGETS)
+
+# Rendu de tous les environnements demandés (environment="*", liste ou
+# environments=[...]) en un seul passage XSLT pour kubernetes, docker-compose et helm
+multi_env_renderer = MultiEnvironmentRenderer(registry, TRANSFORM_TARGETS)
+
+# Métriques exposées sur /api/metrics (format texte Prometheus)
+app.config.setdefault('METRICS_ENABLED', os.environ.get('METRICS_ENABLED', '1').lower() in ('1', 'true', 'yes'))
+metrics = MetricsRegistry('devops', enabled=app.config['METRICS_ENABLED'])
+metrics.describe('requests_total', 'Requêtes HTTP par endpoint et code de statut')
+metrics.describe('request_errors_total', 'Requêtes HTTP terminées en erreur (statut >= 400)')
+metrics.describe('request_duration_seconds', 'Durée totale des requêtes HTTP')
+metrics.describe('stage_duration_seconds', 'Durée des étapes : json_decode, xml_parse, schema_validation, parse_validation, xslt_transform, native_render, json_export, model_build, serialization, compression, xinclude')
+metrics.describe('request_size_bytes', 'Taille des corps de requête', buckets=BYTE_BUCKETS)
+metrics.describe('response_size_bytes', 'Taille des corps de réponse (hors streaming)', buckets=BYTE_BUCKETS)
+
+
+def metrics_endpoint():
+    """Endpoint courant pour les labels (route Flask ou 'internal' hors requête)"""
+    if not has_request_context():
+        return 'internal'
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def timed(stage):
+    """Chronomètre une étape du pipeline pour l'endpoint courant"""
+    if not metrics.enabled:
+        timer = metrics.stage(stage)
+    else:
+        timer = metrics.stage(stage, endpoint=metrics_endpoint())
+    session = active_session()
+    if session is not None:
+        return session.stage(stage, timer)
+    return timer
+
+
+# Corps XML brut : types acceptés et paramètres de requête à convertir
+XML_MIMETYPES = ('application/xml', 'text/xml')
+LIST_PARAMS = ('environments', 'targets')
+BOOL_PARAMS = ('compact', 'include_data')
+INT_PARAMS = ('max_errors',)
+# stream=1/true/yes : artefact brut ; 0/false/no : pas de streaming
+TRUE_VALUES = ('1', 'true', 'yes')
+FALSE_VALUES = ('', '0', 'false', 'no')
+
+
+def decompress_body(body, limit):
+    """Décompresse un corps gzip sans dépasser limit octets (None : sans limite)"""
+    decompressor = zlib.decompressobj(wbits=31)
+    try:
+        data = decompressor.decompress(body, limit + 1 if limit else 0)
+    except zlib.error as e:
+        raise BadRequest(f'Corps gzip invalide: {e}')
+    if limit and len(data) > limit:
+        raise RequestEntityTooLarge()
+    return data
+
+
+def list_param(name, value):
+    """Liste de noms : liste de chaînes, '*' ou chaîne séparée par des virgules (None si absent)"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        items = [item for item in value.split(',') if item]
+        return '*' if items == ['*'] else items
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return value
+    raise BadRequest(f'Paramètre {name} invalide: liste de noms attendue')
+
+
+def int_param(name, value):
+    """Entier positif ou nul, ou None ; BadRequest sinon (corps JSON ou query string)"""
+    if value is None or (isinstance(value, int) and not isinstance(value, bool) and value >= 0):
+        return value
+    raise BadRequest(f'Paramètre {name} invalide: entier positif ou nul attendu')
+
+
+def query_params():
+    """Paramètres de la query string, typés comme leurs équivalents JSON"""
+    data = {}
+    for name in request.args:
+        values = request.args.getlist(name)
+        if name in LIST_PARAMS:
+            data[name] = list_param(name, ','.join(values))
+        elif name in BOOL_PARAMS:
+            data[name] = values[-1].lower() in TRUE_VALUES
+        elif name in INT_PARAMS:
+            try:
+                value = int(values[-1]) if values[-1] else None
+            except ValueError:
+                raise BadRequest(f'Paramètre {name} invalide: entier positif ou nul attendu')
+            data[name] = int_param(name, value)
+        else:
+            data[name] = values[-1]
+    return data
+
+
+def request_data():
+    """Paramètres de la requête sous forme de dict
+
+    Corps JSON ({"xml": "..."}) ou XML brut (application/xml, le XML est
+    passé au parseur en bytes, les paramètres viennent de la query
+    string). Les deux acceptent Content-Encoding: gzip.
+    """
+    gzipped = request.content_encoding == 'gzip'
+    if request.mimetype in XML_MIMETYPES:
+        body = request.get_data(cache=False)
+        if gzipped:
+            body = decompress_body(body, app.config['MAX_CONTENT_LENGTH'])
+        data = query_params()
+        data['xml'] = body
+        return data
+    with timed('json_decode'):
+        if gzipped:
+            body = decompress_body(request.get_data(cache=False), app.config['MAX_CONTENT_LENGTH'])
+            try:
+                return json.loads(body)
+            except ValueError as e:
+                raise BadRequest(f'Corps JSON invalide: {e}')
+        return request.get_json()
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    if not metrics.enabled or 'request_start' not in g:
+        return response
+    endpoint = metrics_endpoint()
+    status = response.status_code
+    metrics.inc('requests_total', endpoint=endpoint, method=request.method, status=status)
+    if status >= 400:
+        metrics.inc('request_errors_total', endpoint=endpoint)
+    metrics.observe('request_duration_seconds', time.perf_counter() - g.request_start, endpoint=endpoint)
+    if request.content_length:
+        metrics.observe('request_size_bytes', request.content_length, endpoint=endpoint)
+    if not response.is_streamed:
+        metrics.observe('response_size_bytes', response.calculate_content_length() or 0, endpoint=endpoint)
+    return response
+
+
+# Déclaré après record_request_metrics, donc exécuté avant : la taille mesurée est celle envoyée
+@app.after_request
+def compress_response(response):
+    """Compresse le corps selon Accept-Encoding
+
+    Pour une réponse à ETag fort (clé de contenu), les octets compressés
+    sont mis en cache à côté de l'artefact : une réponse chaude n'est
+    pas recompressée.
+    """
+    if not app.config['COMPRESSION_ENABLED'] or response.is_streamed or response.direct_passthrough:
+        return response
+    if response.status_code != 200 or 'Content-Encoding' in response.headers:
+        return response
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(request.accept_encodings, ENCODINGS)
+    if encoding is None or response.calculate_content_length() < app.config['COMPRESSION_MIN_SIZE']:
+        return response
+    
+    level = app.config['COMPRESSION_ZSTD_LEVEL' if encoding == 'zstd' else 'COMPRESSION_GZIP_LEVEL']
+    etag, weak = response.get_etag()
+    key = content_key('compressed', etag, encoding, str(level)) if etag and not weak else None
+    body = result_cache.get(key) if key is not None else None
+    if body is None:
+        with timed('compression'):
+            body = compress(response.get_data(), encoding, level)
+        if key is not None:
+            result_cache.put(key, body)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    if etag:
+        # Même contenu, autre représentation : l'ETag devient faible
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def _worker_gauges():
+    if _worker_pool is None:
+        return []
+    stats = _worker_pool.stats()
+    return [
+        (f'worker_pool_{name}', f'Pool de processus : {name}', [({}, stats[name])])
+        for name in ('processes', 'max_queue', 'pending', 'rejected', 'timeouts', 'recycled')
+    ]
+
+
+def _cache_gauges():
+    stats = result_cache.stats()
+    return [
+        (f'result_cache_{name}', f'Cache de résultats : {name}', [({}, stats[name])])
+        for name in ('entries', 'bytes', 'max_bytes', 'hits', 'misses', 'evictions', 'rejected')
+    ]
+
+
+def _fragment_gauges():
+    stats = fragment_cache.stats()
+    return [
+        (f'fragment_cache_{name}', f'Cache des fragments de rendu : {name}', [({}, stats[name])])
+        for name in ('entries', 'bytes', 'hits', 'misses', 'evictions')
+    ]
+
+
+def _model_gauges():
+    stats = model_cache.stats()
+    return [
+        (f'model_cache_{name}', f'Cache des modèles compacts : {name}', [({}, stats[name])])
+        for name in ('entries', 'hits', 'misses', 'evictions')
+    ]
+
+
+def _include_gauges():
+    stats = include_resolver.stats()
+    return [
+        (f'include_cache_{name}', f'Cache des fichiers inclus : {name}', [({}, stats[name])])
+        for name in ('entries', 'hits', 'parses')
+    ]
+
+
+def _incremental_gauges():
+    stats = incremental_validator.stats()
+    return [
+        (f'incremental_validation_{name}', f'Cache de validation par environnement : {name}', [({}, stats[name])])
+        for name in ('entries', 'hits', 'misses')
+    ]
+
+
+def _registry_gauges():
+    stats = registry.stats()
+    entries = [('schema', stats['schema'])] + list(stats['stylesheets'].items())
+    return [
+        (f'compiled_{name}', f'Schéma et feuilles XSLT compilés : {name}', [
+            ({'name': entry_name, 'kind': entry['kind']}, entry[name]) for entry_name, entry in entries
+        ])
+        for name in ('compile_count', 'instances', 'idle_instances', 'hits')
+    ]
+
+
+metrics.add_collector(_cache_gauges)
+metrics.add_collector(_registry_gauges)
+metrics.add_collector(_worker_gauges)
+metrics.add_collector(_incremental_gauges)
+metrics.add_collector(_fragment_gauges)
+metrics.add_collector(_model_gauges)
+metrics.add_collector(_include_gauges)
+
+# Profilage à la demande (en-tête X-Profile: 1 ou ?profile=1), désactivé par défaut
+app.config.setdefault('PROFILING_ENABLED', os.environ.get('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes'))
+# Répertoire où écrire les rapports (.json) et profils bruts (.prof), optionnel
+app.config.setdefault('PROFILING_DIR', os.environ.get('PROFILING_DIR') or None)
+# Nombre de fonctions retenues dans chaque rapport
+app.config.setdefault('PROFILING_TOP', int(os.environ.get('PROFILING_TOP', 20)))
+profile_store = ProfileStore(directory=app.config['PROFILING_DIR'])
+
+
+def profiling_requested():
+    value = request.headers.get('X-Profile') or request.args.get('profile')
+    return value is not None and value.lower() in ('1', 'true', 'yes')
+
+
+@app.before_request
+def start_profiling():
+    if not app.config['PROFILING_ENABLED'] or not profiling_requested():
+        return
+    g.profile_session = ProfileSession.start(request.method, request.path)
+
+
+@app.after_request
+def finish_profiling(response):
+    session = g.pop('profile_session', None)
+    if session is None:
+        if app.config['PROFILING_ENABLED'] and profiling_requested():
+            response.headers['X-Profile-Status'] = 'busy'
+        return response
+    session.stop()
+    profile_store.directory = app.config['PROFILING_DIR']
+    profile_store.save(session, session.report(response.status_code, app.config['PROFILING_TOP']))
+    response.headers['X-Profile-Id'] = session.id
+    return response
+
+
+@app.teardown_request
+def stop_profiling(exc):
+    session = g.pop('profile_session', None)
+    if session is not None:
+        session.stop()
 
 @app.route('/examples/<filename>')
 def serve_example(filename):
@@ -26,41 +403,166 @@ def serve_example(filename):
     return send_from_directory(EXAMPLES_DIR, filename)
 
 
-def validate_xml(xml_content):
-    """Valide le XML contre le schéma XSD"""
+def has_includes(xml_content):
+    """Vrai si les inclusions sont activées et que le XML en contient"""
+    return bool(app.config['INCLUDE_ROOT']) and uses_includes(xml_content)
+
+
+def parse_main(xml_content):
+    """Parse le document principal sans résoudre les inclusions"""
+    if isinstance(xml_content, str):
+        xml_content = xml_content.encode('utf-8')
+    parser = etree.XMLParser(huge_tree=app.config['XML_HUGE_TREE'])
+    with timed('xml_parse'):
+        return etree.fromstring(xml_content, parser).getroottree()
+
+
+def parse_main_for_includes(xml_content):
+    """Document principal parsé si le XML contient des inclusions (None sinon ou si mal formé)"""
+    if not has_includes(xml_content):
+        return None
     try:
-        # Parser le XML
-        xml_doc = etree.parse(BytesIO(xml_content.encode('utf-8')))
-        
-        # Charger le schéma XSD
-        xsd_doc = etree.parse(XSD_SCHEMA_PATH)
-        xsd_schema = etree.XMLSchema(xsd_doc)
-        
-        # Valider
-        is_valid = xsd_schema.validate(xml_doc)
+        return parse_main(xml_content)
+    except etree.XMLSyntaxError:
+        return None
+
+
+def include_fingerprint(main_doc):
+    """Empreinte des fichiers inclus d'un document principal parsé ('' pour None) : entre dans les clés de cache
+
+    Le même document est ensuite passé à parse_xml : le texte n'est parsé qu'une fois.
+    """
+    if main_doc is None:
+        return ''
+    return include_resolver.fingerprint(main_doc, app.config['INCLUDE_ROOT'])
+
+
+def parse_xml(xml_content, main_doc=None):
+    """Parse le contenu XML (str ou bytes) une seule fois, inclusions résolues
+
+    main_doc : document principal déjà parsé par parse_main, dont les
+    inclusions sont résolues en place au lieu de reparser le texte.
+    """
+    xml_doc = parse_main(xml_content) if main_doc is None else main_doc
+    if has_includes(xml_content):
+        with timed('xinclude'):
+            include_resolver.resolve(xml_doc, app.config['INCLUDE_ROOT'])
+    return xml_doc
+
+
+def load_config(xml_content):
+    """Modèle compact du XML, construit une fois par contenu ; l'arbre lxml n'est pas conservé"""
+    if isinstance(xml_content, str):
+        xml_content = xml_content.encode('utf-8')
+    main_doc = parse_main(xml_content) if has_includes(xml_content) else None
+    key = content_key(xml_content, include_fingerprint(main_doc))
+    config = model_cache.get(key)
+    if config is None:
+        xml_doc = parse_xml(xml_content, main_doc)
+        with timed('model_build'):
+            config = build_config(xml_doc)
+        model_cache.put(key, config)
+    return config
+
+
+def include_error_result(error):
+    """Résultat de validation pour une inclusion impossible"""
+    return {
+        'valid': False,
+        'message': f'Erreur d\'inclusion: {str(error)}',
+        'errors': [{'line': None, 'message': str(error)}]
+    }
+
+
+def syntax_error_result(error):
+    """Résultat de validation pour une erreur de syntaxe XML"""
+    return {
+        'valid': False,
+        'message': f'Erreur de syntaxe XML: {str(error)}',
+        'errors': [{'line': error.lineno, 'message': str(error), 'column': error.offset}]
+    }
+
+
+def validate_tree(xml_doc, max_errors=None):
+    """Valide un arbre XML déjà parsé contre le schéma XSD"""
+    with registry.schema() as xsd_schema, timed('schema_validation'):
+        is_valid, errors = validate_document(xml_doc, xsd_schema, max_errors)
+    
+    if is_valid:
+        return {'valid': True, 'message': 'Le fichier XML est valide'}
+    return {
+        'valid': False,
+        'message': 'Le fichier XML contient des erreurs',
+        'errors': errors
+    }
+
+
+def validate_incremental(xml_doc, max_errors=None, source=None):
+    """Valide un arbre en ne revalidant que les environnements modifiés
+
+    source : octets XML dont l'arbre est issu (empreintes calculées sur le texte).
+    """
+    with timed('schema_validation'):
+        is_valid, errors, fragments = incremental_validator.validate(
+            xml_doc, registry.version(), max_errors, source
+        )
+    
+    result = {'valid': True, 'message': 'Le fichier XML est valide'} if is_valid else {
+        'valid': False,
+        'message': 'Le fichier XML contient des erreurs',
+        'errors': errors
+    }
+    result['incremental'] = fragments
+    return result
+
+
+def validate_streaming(xml_content, max_errors=None, keep_tree=False):
+    """Valide pendant le parsing ; retourne (arbre ou None, résultat)"""
+    with registry.schema() as xsd_schema, timed('parse_validation'):
+        return validate_while_parsing(
+            xml_content,
+            xsd_schema,
+            max_errors=max_errors,
+            huge_tree=app.config['XML_HUGE_TREE'],
+            keep_tree=keep_tree
+        )
+
+
+def validate_xml(xml_content, mode=None, max_errors=None):
+    """Valide le XML contre le schéma XSD
+
+    mode : 'tree' (parsing puis validation), 'streaming' (validation
+    pendant le parsing, arrêt après max_errors erreurs) ou 'incremental'
+    (seuls les environnements modifiés depuis la dernière validation
+    sont revalidés).
+    """
+    mode = mode or app.config['VALIDATION_MODE']
+    max_errors = max_errors or app.config['VALIDATION_MAX_ERRORS']
+    try:
+        # Les inclusions doivent être résolues avant la validation : pas de mode streaming
+        if mode == 'streaming' and not has_includes(xml_content):
+            return validate_streaming(xml_content, max_errors)[1]
         
-        if is_valid:
-            return {'valid': True, 'message': 'Le fichier XML est valide'}
+        if isinstance(xml_content, str):
+            xml_content = xml_content.encode('utf-8')
+        start = time.perf_counter()
+        xml_doc = parse_xml(xml_content)
+        parsed = time.perf_counter()
+        if mode == 'incremental':
+            # Arbre fusionné : empreintes calculées sur l'arbre et non sur le texte
+            source = None if has_includes(xml_content) else xml_content
+            result = validate_incremental(xml_doc, max_errors, source)
         else:
-            errors = []
-            for error in xsd_schema.error_log:
-                errors.append({
-                    'line': error.line,
-                    'message': error.message,
-                    'level': error.level_name,
-                    'column': getattr(error, 'column', None)
-                })
-            return {
-                'valid': False,
-                'message': 'Le fichier XML contient des erreurs',
-                'errors': errors
-            }
-    except etree.XMLSyntaxError as e:
-        return {
-            'valid': False,
-            'message': f'Erreur de syntaxe XML: {str(e)}',
-            'errors': [{'line': e.lineno, 'message': str(e), 'column': e.offset}]
+            result = validate_tree(xml_doc, max_errors)
+        result['timings'] = {
+            'parse_ms': round((parsed - start) * 1000, 3),
+            'validation_ms': round((time.perf_counter() - parsed) * 1000, 3)
         }
+        return result
+    except etree.XMLSyntaxError as e:
+        return syntax_error_result(e)
+    except IncludeError as e:
+        return include_error_result(e)
     except Exception as e:
         return {
             'valid': False,
@@ -69,22 +571,18 @@ def validate_xml(xml_content):
         }
 
 
-def transform_xml(xml_content, xslt_path, environment='dev'):
-    """Transforme le XML en utilisant XSLT"""
+def transform_tree(xml_doc, xslt_path, environment='dev'):
+    """Applique une feuille XSLT compilée à un arbre XML déjà parsé"""
     try:
-        # Parser le XML
-        xml_doc = etree.parse(BytesIO(xml_content.encode('utf-8')))
-        
-        # Charger le XSLT
-        xslt_doc = etree.parse(xslt_path)
-        xslt_transformer = etree.XSLT(xslt_doc)
-        
-        # Appliquer la transformation avec le paramètre environment
-        result = xslt_transformer(xml_doc, environment=etree.XSLT.strparam(environment))
+        with registry.stylesheet(xslt_path) as xslt_transformer:
+            with timed('xslt_transform'):
+                result = xslt_transformer(xml_doc, environment=etree.XSLT.strparam(environment))
+            with timed('serialization'):
+                content = str(result)
         
         return {
             'success': True,
-            'content': str(result),
+            'content': content,
             'message': 'Transformation réussie'
         }
     except Exception as e:
@@ -95,126 +593,586 @@ def transform_xml(xml_content, xslt_path, environment='dev'):
         }
 
 
-@app.route('/api/validate', methods=['POST'])
-def validate():
-    """Endpoint pour valider un fichier XML"""
+def transform_xml(xml_content, xslt_path, environment='dev'):
+    """Transforme le XML en utilisant XSLT"""
     try:
-        data = request.get_json()
-        xml_content = data.get('xml', '')
-        
-        if not xml_content:
-            return jsonify({
-                'valid': False,
-                'message': 'Aucun contenu XML fourni'
-            }), 400
-        
-        result = validate_xml(xml_content)
-        return jsonify(result)
+        xml_doc = parse_xml(xml_content)
     except Exception as e:
-        return jsonify({
-            'valid': False,
-            'message': f'Erreur serveur: {str(e)}'
-        }), 500
+        return {
+            'success': False,
+            'content': None,
+            'message': f'Erreur lors de la transformation: {str(e)}'
+        }
+    return transform_tree(xml_doc, xslt_path, environment)
 
 
-@app.route('/api/transform/docker-compose', methods=['POST'])
-def transform_docker_compose():
-    """Endpoint pour transformer XML en Docker Compose YAML"""
-    try:
-        data = request.get_json()
-        xml_content = data.get('xml', '')
-        environment = data.get('environment', 'dev')
-        
-        if not xml_content:
-            return jsonify({
-                'success': False,
-                'message': 'Aucun contenu XML fourni'
-            }), 400
-        
-        # Valider d'abord
-        validation = validate_xml(xml_content)
-        if not validation['valid']:
-            return jsonify({
+def render_json(xml_doc, environment='dev', options=None):
+    """Rend la cible JSON en une seule sérialisation
+
+    Options : engine ('native' ou 'xslt'), compact (sans indentation),
+    include_data (ajoute la structure décodée sous 'data').
+    """
+    options = options or {}
+    engine = options.get('engine') or app.config['JSON_ENGINE']
+    
+    if engine == 'xslt':
+        # Ancien chemin conservé en repli : texte JSON produit par json.xslt
+        result = transform_tree(xml_doc, JSON_XSLT, environment)
+        if not result['success']:
+            return result, 200
+        try:
+            json_data = json.loads(result['content'])
+        except json.JSONDecodeError:
+            return {
                 'success': False,
-                'message': 'Le XML n\'est pas valide',
-                'validation_errors': validation.get('errors', [])
-            }), 400
-        
-        # Transformer
-        result = transform_xml(xml_content, DOCKER_COMPOSE_XSLT, environment)
-        return jsonify(result)
+                'message': 'Erreur lors du parsing JSON généré'
+            }, 500
+    else:
+        with timed('json_export'):
+            json_data = json_exporter.export(xml_doc, environment)
+    
+    with timed('serialization'):
+        if options.get('compact'):
+            content = json.dumps(json_data, separators=(',', ':'))
+        else:
+            content = json.dumps(json_data, indent=2)
+    
+    payload = {
+        'success': True,
+        'content': content,
+        'message': 'Transformation réussie'
+    }
+    if options.get('include_data'):
+        payload['data'] = json_data
+    return payload, 200
+
+
+# Cibles rendues sans (ou en plus de) la feuille XSLT
+TRANSFORM_RENDERERS = {
+    'json': render_json
+}
+
+# Options de requête reconnues par cible
+TRANSFORM_OPTIONS = {
+    'json': ('engine', 'compact', 'include_data'),
+    'kubernetes': ('engine', 'environments', 'format'),
+    'docker-compose': ('engine', 'environments', 'format'),
+    'helm': ('environments', 'format')
+}
+
+# Formats du rendu multi-environnements : flux YAML multi-documents ou {environnement: contenu}
+MULTI_ENV_FORMATS = ('stream', 'map')
+
+
+def transform_options(target, data):
+    """Extrait de la requête les options propres à une cible"""
+    return {name: data[name] for name in TRANSFORM_OPTIONS.get(target, ()) if name in data}
+
+
+def parse_and_validate(xml_content, main_doc=None):
+    """Parse le XML une seule fois et valide l'arbre obtenu
+
+    main_doc : document principal déjà parsé (voir parse_xml).
+    Retourne un couple (arbre, None) ou (None, payload d'erreur).
+    """
+    if app.config['VALIDATION_MODE'] == 'streaming' and not has_includes(xml_content):
+        xml_doc, validation = validate_streaming(
+            xml_content, app.config['VALIDATION_MAX_ERRORS'], keep_tree=True
+        )
+    else:
+        if isinstance(xml_content, str):
+            xml_content = xml_content.encode('utf-8')
+        try:
+            xml_doc = parse_xml(xml_content, main_doc)
+        except etree.XMLSyntaxError as e:
+            validation = syntax_error_result(e)
+        except IncludeError as e:
+            validation = include_error_result(e)
+        else:
+            if app.config['VALIDATION_MODE'] == 'incremental':
+                source = None if has_includes(xml_content) else xml_content
+                validation = validate_incremental(xml_doc, app.config['VALIDATION_MAX_ERRORS'], source)
+            else:
+                validation = validate_tree(xml_doc, app.config['VALIDATION_MAX_ERRORS'])
+    
+    if not validation['valid']:
+        return None, {
+            'success': False,
+            'message': 'Le XML n\'est pas valide',
+            'validation_errors': validation.get('errors', [])
+        }
+    return xml_doc, None
+
+
+def transform_cache_key(target, xml_content, environment, options=None, main_doc=None):
+    """Empreinte (XML, fichiers inclus, versions du schéma et de la feuille XSLT, environnement, options)
+
+    main_doc : document principal parsé (parse_main_for_includes) si le XML contient des inclusions.
+    """
+    return content_key(
+        xml_content,
+        include_fingerprint(main_doc),
+        registry.version(),
+        registry.version(target),
+        target,
+        environment,
+        json.dumps(options or {}, sort_keys=True)
+    )
+
+
+def check_target(target):
+    """Vérifie qu'une cible existe ; retourne (None, None) ou (payload d'erreur, code HTTP)"""
+    xslt_path = TRANSFORM_TARGETS.get(target)
+    if xslt_path is None:
+        return {
+            'success': False,
+            'message': f'Cible de transformation inconnue: {target}'
+        }, 404
+    if not os.path.exists(xslt_path):
+        return {
+            'success': False,
+            'message': f'Fichier XSLT non trouvé pour la cible {target}'
+        }, 501
+    return None, None
+
+
+def render_native(xml_doc, target, environment='dev', options=None):
+    """Rendu Python si le moteur 'native' est choisi pour la cible ; None sinon"""
+    engine = (options or {}).get('engine') or app.config['RENDER_ENGINE']
+    renderer = NATIVE_RENDERERS.get(target)
+    if engine != 'native' or renderer is None:
+        return None
+    with timed('native_render'):
+        return renderer(xml_doc, environment)
+
+
+def render_fragments(xml_doc, target, environment='dev'):
+    """Rendu par fragments en cache si activé pour la cible ; None sinon"""
+    if not app.config['INCREMENTAL_RENDERING'] or not fragment_renderer.supports(target):
+        return None
+    with timed('xslt_transform'):
+        rendered = fragment_renderer.render(xml_doc, target, environment)
+    return None if rendered is None else rendered[0]
+
+
+def environment_names(xml_doc):
+    """Noms distincts des environnements, dans l'ordre du document"""
+    names = xml_doc.xpath('/devops-config/environments/environment/name')
+    return list(dict.fromkeys(''.join(name.itertext()) for name in names))
+
+
+def unknown_environments_error(xml_doc, environments):
+    """Payload d'erreur si des environnements demandés sont absents du document, None sinon"""
+    available = environment_names(xml_doc)
+    unknown = [environment for environment in environments if environment not in available]
+    if unknown:
+        return {'success': False, 'message': f'Environnements inconnus: {", ".join(unknown)}'}
+    return None
+
+
+def render_environments(xml_doc, target, environments=None, options=None):
+    """Rend plusieurs environnements d'une cible (None : tous) ; retourne (payload, code HTTP)
+
+    Avec le moteur natif, chaque environnement est rendu séparément ;
+    sinon tous le sont en un seul passage XSLT.
+    """
+    options = options or {}
+    output_format = options.get('format') or 'stream'
+    if output_format not in MULTI_ENV_FORMATS:
+        return {'success': False, 'message': f'Format inconnu: {output_format}'}, 400
+    if environments:
+        error = unknown_environments_error(xml_doc, environments)
+        if error is not None:
+            return error, 400
+    try:
+        if (options.get('engine') or app.config['RENDER_ENGINE']) == 'native' and target in NATIVE_RENDERERS:
+            outputs = {
+                environment: render_native(xml_doc, target, environment, options)
+                for environment in environments or environment_names(xml_doc)
+            }
+        else:
+            with timed('xslt_transform'):
+                outputs = multi_env_renderer.render(xml_doc, target, environments)
     except Exception as e:
-        return jsonify({
+        return {
             'success': False,
-            'message': f'Erreur serveur: {str(e)}'
-        }), 500
+            'content': None,
+            'message': f'Erreur lors de la transformation: {str(e)}'
+        }, 200
+    return {
+        'success': True,
+        'content': outputs if output_format == 'map' else yaml_stream(outputs),
+        'environments': list(outputs),
+        'message': 'Transformation réussie'
+    }, 200
+
+
+def render_target(xml_doc, target, environment='dev', options=None):
+    """Transforme un arbre déjà validé vers une cible ; retourne (payload, code HTTP)"""
+    requested = (options or {}).get('environments')
+    if multi_env_renderer.supports(target) and (environment == '*' or requested):
+        return render_environments(xml_doc, target, None if requested in (None, '*') else requested, options)
+    renderer = TRANSFORM_RENDERERS.get(target)
+    if renderer is not None:
+        return renderer(xml_doc, environment, options)
+    try:
+        content = render_native(xml_doc, target, environment, options)
+        if content is None:
+            content = render_fragments(xml_doc, target, environment)
+    except Exception as e:
+        return {
+            'success': False,
+            'content': None,
+            'message': f'Erreur lors de la transformation: {str(e)}'
+        }, 200
+    if content is not None:
+        return {'success': True, 'content': content, 'message': 'Transformation réussie'}, 200
+    return transform_tree(xml_doc, TRANSFORM_TARGETS[target], environment), 200
+
+
+def run_transform_pipeline(target, xml_content, environment='dev', options=None, main_doc=None):
+    """Parse une fois, valide l'arbre obtenu puis le transforme
+
+    main_doc : document principal déjà parsé (voir parse_xml).
+    Retourne un couple (payload, code HTTP).
+    """
+    error, status = check_target(target)
+    if error is not None:
+        return error, status
+    
+    if not xml_content:
+        return {
+            'success': False,
+            'message': 'Aucun contenu XML fourni'
+        }, 400
+    
+    xml_doc, error = parse_and_validate(xml_content, main_doc)
+    if error is not None:
+        return error, 400
+    
+    return render_target(xml_doc, target, environment, options)
+
+
+def get_batch_executor():
+    """Pool de threads partagé par les transformations en lot
+
+    lxml relâche le GIL pendant l'exécution XSLT, les couples
+    (cible, environnement) s'exécutent donc réellement en parallèle.
+    """
+    global _batch_executor
+    if _batch_executor is None:
+        with _batch_executor_lock:
+            if _batch_executor is None:
+                _batch_executor = ThreadPoolExecutor(
+                    max_workers=app.config['BATCH_MAX_WORKERS'],
+                    thread_name_prefix='batch-transform'
+                )
+    return _batch_executor
 
 
-@app.route('/api/transform/kubernetes', methods=['POST'])
-def transform_kubernetes():
-    """Endpoint pour transformer XML en Kubernetes YAML"""
+def _render_batch_item(xml_doc, target, environment):
+    start = time.perf_counter()
     try:
-        data = request.get_json()
+        payload, _ = render_target(xml_doc, target, environment)
+    except Exception as e:
+        payload = {'success': False, 'message': f'Erreur lors de la transformation: {str(e)}'}
+    item = {'target': target, 'environment': environment}
+    item.update(payload)
+    item['duration_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    return item
+
+
+def prepare_batch(xml_content, targets=None, environments=None):
+    """Vérifie les cibles, parse et valide une fois, résout les environnements
+
+    Retourne (arbre, cibles, environnements, None) ou (None, None, None, (payload, code HTTP)).
+    """
+    if not xml_content:
+        return None, None, None, ({
+            'success': False,
+            'message': 'Aucun contenu XML fourni'
+        }, 400)
+    
+    # Liste, chaîne séparée par des virgules ou '*' (toutes les cibles)
+    targets = list_param('targets', targets)
+    targets = list(TRANSFORM_TARGETS) if not targets or targets == '*' else targets
+    for target in targets:
+        error, status = check_target(target)
+        if error is not None:
+            return None, None, None, (error, status)
+    
+    xml_doc, error = parse_and_validate(xml_content)
+    if error is not None:
+        return None, None, None, (error, 400)
+    
+    available = xml_doc.xpath('/devops-config/environments/environment/name/text()')
+    environments = list_param('environments', environments)
+    environments = list(available) if not environments or environments == '*' else environments
+    unknown = [env for env in environments if env not in available]
+    if unknown:
+        return None, None, None, ({
+            'success': False,
+            'message': f'Environnements inconnus: {", ".join(unknown)}'
+        }, 400)
+    
+    return xml_doc, targets, environments, None
+
+
+def run_batch_pipeline(xml_content, targets=None, environments=None):
+    """Parse et valide une fois puis rend chaque couple (cible, environnement) en parallèle
+
+    Retourne un couple (payload, code HTTP).
+    """
+    start = time.perf_counter()
+    xml_doc, targets, environments, error = prepare_batch(xml_content, targets, environments)
+    if error is not None:
+        return error
+    prepare_ms = (time.perf_counter() - start) * 1000
+    
+    executor = get_batch_executor()
+    # Chaque tâche s'exécute dans une copie du contexte de la requête (profilage, métriques)
+    futures = [
+        executor.submit(contextvars.copy_context().run, _render_batch_item, xml_doc, target, environment)
+        for target in targets
+        for environment in environments
+    ]
+    results = [future.result() for future in futures]
+    
+    return {
+        'success': all(item['success'] for item in results),
+        'parse_validate_ms': round(prepare_ms, 3),
+        'total_ms': round((time.perf_counter() - start) * 1000, 3),
+        'results': results
+    }, 200
+
+
+# Configuration transmise aux processus du pool
+WORKER_CONFIG_KEYS = (
+    'VALIDATION_MODE', 'VALIDATION_MAX_ERRORS', 'XML_HUGE_TREE', 'JSON_ENGINE', 'BATCH_MAX_WORKERS',
+    'INCREMENTAL_RENDERING', 'INCLUDE_ROOT', 'INCLUDE_CACHE_SIZE', 'RENDER_ENGINE'
+)
+
+
+def get_worker_pool():
+    """Pool de processus partagé, démarré à la première utilisation"""
+    global _worker_pool
+    if _worker_pool is None:
+        with _worker_pool_lock:
+            if _worker_pool is None:
+                config = {key: app.config[key] for key in WORKER_CONFIG_KEYS}
+                # Un worker exécute les traitements lui-même, sans métriques ni pool imbriqué
+                config.update(WORKER_MODE='thread', METRICS_ENABLED=False)
+                _worker_pool = WorkerPool(
+                    app.config['WORKER_PROCESSES'],
+                    app.config['WORKER_QUEUE_SIZE'],
+                    timeout=app.config['WORKER_TIMEOUT'],
+                    config=config
+                )
+    return _worker_pool
+
+
+def offload(name, *args):
+    """Exécute une fonction du pipeline selon WORKER_MODE
+
+    En mode 'process', lève PoolBusy si la file est pleine et JobTimeout
+    si le traitement dépasse WORKER_TIMEOUT.
+    """
+    if app.config['WORKER_MODE'] != 'process':
+        return globals()[name](*args)
+    return get_worker_pool().run(run_job, name, *args)
+
+
+@app.errorhandler(PoolBusy)
+def pool_busy(error):
+    response = jsonify({'success': False, 'message': 'Serveur saturé, réessayez plus tard'})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+
+@app.errorhandler(JobTimeout)
+def job_timeout(error):
+    return jsonify({'success': False, 'message': str(error)}), 504
+
+
+@app.errorhandler(BadRequest)
+def bad_request(error):
+    return jsonify({'success': False, 'message': error.description}), 400
+
+
+@app.errorhandler(RequestEntityTooLarge)
+def request_too_large(error):
+    limit = app.config['MAX_CONTENT_LENGTH']
+    return jsonify({'success': False, 'message': f'Requête trop volumineuse (maximum {limit} octets)'}), 413
+
+
+# Erreurs propagées telles quelles par les routes vers leurs gestionnaires
+PROPAGATED_ERRORS = (PoolBusy, JobTimeout, RequestEntityTooLarge, BadRequest)
+
+
+# Type MIME des artefacts envoyés en streaming
+TARGET_MIMETYPES = {
+    'docker-compose': 'text/yaml',
+    'kubernetes': 'text/yaml',
+    'helm': 'text/yaml',
+    'json': 'application/json',
+    'github-actions': 'text/yaml',
+    'jenkins': 'text/x-groovy'
+}
+
+STREAM_MODES = ('raw', 'ndjson')
+
+
+def iter_buffer(buffer, chunk_size):
+    """Découpe un buffer (bytes ou résultat XSLT) en morceaux sans copie intermédiaire"""
+    view = memoryview(buffer).cast('B')
+    for offset in range(0, len(view), chunk_size):
+        yield bytes(view[offset:offset + chunk_size])
+
+
+def render_buffer(xml_doc, target, environment='dev', options=None):
+    """Rend une cible vers un objet exposant le protocole buffer
+
+    Pour les cibles XSLT, c'est le résultat lui-même : la sortie n'est
+    jamais convertie en str Python.
+    """
+    renderer = TRANSFORM_RENDERERS.get(target)
+    if renderer is not None:
+        payload, _ = renderer(xml_doc, environment, options)
+        if not payload['success']:
+            raise ValueError(payload['message'])
+        return payload['content'].encode('utf-8')
+    content = render_native(xml_doc, target, environment, options)
+    if content is None:
+        content = render_fragments(xml_doc, target, environment)
+    if content is not None:
+        return content.encode('utf-8')
+    with registry.stylesheet(TRANSFORM_TARGETS[target]) as xslt_transformer, timed('xslt_transform'):
+        return xslt_transformer(xml_doc, environment=etree.XSLT.strparam(environment))
+
+
+def iter_ndjson(xml_doc, target, environments, options=None):
+    """Une ligne NDJSON par environnement, rendue au fil de l'envoi"""
+    for environment in environments:
+        start = time.perf_counter()
+        try:
+            result = render_buffer(xml_doc, target, environment, options)
+            line = {
+                'environment': environment,
+                'success': True,
+                'content': bytes(memoryview(result).cast('B')).decode('utf-8')
+            }
+        except Exception as e:
+            line = {
+                'environment': environment,
+                'success': False,
+                'message': f'Erreur lors de la transformation: {str(e)}'
+            }
+        line['duration_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        yield json.dumps(line).encode('utf-8') + b'\n'
+
+
+def stream_mode(value):
+    """Mode de streaming demandé (None : pas de streaming)
+
+    true ou 1/true/yes : artefact brut ; false ou 0/false/no : pas de
+    streaming ; sinon le nom du mode (raw, ndjson).
+    """
+    if isinstance(value, str):
+        if value.lower() in TRUE_VALUES:
+            return 'raw'
+        if value.lower() in FALSE_VALUES:
+            return None
+        return value
+    return 'raw' if value else None
+
+
+def stream_transform(target, data, mode):
+    """Réponse chunkée : artefact brut (un environnement) ou NDJSON (plusieurs)"""
+    xml_content = data.get('xml', '')
+    error, status = check_target(target)
+    if error is None and not xml_content:
+        error, status = {'success': False, 'message': 'Aucun contenu XML fourni'}, 400
+    if error is None and mode not in STREAM_MODES:
+        error, status = {'success': False, 'message': f'Mode de streaming inconnu: {mode}'}, 400
+    if error is not None:
+        return jsonify(error), status
+    
+    xml_doc, error = parse_and_validate(xml_content)
+    if error is not None:
+        return jsonify(error), 400
+    
+    options = transform_options(target, data)
+    chunk_size = app.config['STREAM_CHUNK_SIZE']
+    
+    if mode == 'raw':
+        # Rendu avant l'envoi des en-têtes : une erreur donne encore un code HTTP
+        result = render_buffer(xml_doc, target, data.get('environment', 'dev'), options)
+        return app.response_class(
+            iter_buffer(result, chunk_size),
+            mimetype=TARGET_MIMETYPES.get(target, 'text/plain')
+        )
+    
+    environments = data.get('environments')
+    if not environments or environments == '*' or data.get('environment') == '*':
+        environments = xml_doc.xpath('/devops-config/environments/environment/name/text()')
+    else:
+        error = unknown_environments_error(xml_doc, environments)
+        if error is not None:
+            return jsonify(error), 400
+    return app.response_class(
+        iter_ndjson(xml_doc, target, environments, options),
+        mimetype='application/x-ndjson'
+    )
+
+
+@app.route('/api/validate', methods=['POST'])
+def validate():
+    """Endpoint pour valider un fichier XML"""
+    try:
+        data = request_data()
         xml_content = data.get('xml', '')
-        environment = data.get('environment', 'dev')
+        mode = data.get('mode')
+        max_errors = int_param('max_errors', data.get('max_errors'))
         
         if not xml_content:
             return jsonify({
-                'success': False,
+                'valid': False,
                 'message': 'Aucun contenu XML fourni'
             }), 400
         
-        # Valider d'abord
-        validation = validate_xml(xml_content)
-        if not validation['valid']:
+        if mode is not None and mode not in VALIDATION_MODES:
             return jsonify({
-                'success': False,
-                'message': 'Le XML n\'est pas valide',
-                'validation_errors': validation.get('errors', [])
+                'valid': False,
+                'message': f'Mode de validation inconnu: {mode}'
             }), 400
         
-        # Transformer
-        result = transform_xml(xml_content, KUBERNETES_XSLT, environment)
+        result = offload('validate_xml', xml_content, mode, max_errors)
         return jsonify(result)
+    except PROPAGATED_ERRORS:
+        raise
     except Exception as e:
         return jsonify({
-            'success': False,
+            'valid': False,
             'message': f'Erreur serveur: {str(e)}'
         }), 500
 
 
-@app.route('/api/transform/helm', methods=['POST'])
-def transform_helm():
-    """Endpoint pour transformer XML en Helm Chart"""
+@app.route('/api/transform/batch', methods=['POST'])
+def transform_batch():
+    """Endpoint pour générer plusieurs cibles et environnements en une requête"""
     try:
-        data = request.get_json()
-        xml_content = data.get('xml', '')
-        environment = data.get('environment', 'dev')
-        
-        if not xml_content:
-            return jsonify({
-                'success': False,
-                'message': 'Aucun contenu XML fourni'
-            }), 400
-        
-        # Valider d'abord
-        validation = validate_xml(xml_content)
-        if not validation['valid']:
-            return jsonify({
-                'success': False,
-                'message': 'Le XML n\'est pas valide',
-                'validation_errors': validation.get('errors', [])
-            }), 400
-        
-        # Transformer (si le fichier XSLT existe)
-        if os.path.exists(HELM_XSLT):
-            result = transform_xml(xml_content, HELM_XSLT, environment)
-            return jsonify(result)
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'Support Helm Charts non encore implémenté'
-            }), 501
+        data = request_data()
+        # Listes vérifiées ici : un BadRequest donne un 400 aussi en mode 'process'
+        payload, status = offload(
+            'run_batch_pipeline',
+            data.get('xml', ''),
+            list_param('targets', data.get('targets')),
+            list_param('environments', data.get('environments'))
+        )
+        return jsonify(payload), status
+    except PROPAGATED_ERRORS:
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
@@ -222,51 +1180,64 @@ def transform_helm():
         }), 500
 
 
-@app.route('/api/transform/json', methods=['POST'])
-def transform_json():
-    """Endpoint pour transformer XML en JSON"""
+@app.route('/api/transform/<target>', methods=['POST'])
+def transform(target):
+    """Endpoint pour transformer XML vers une cible (docker-compose, kubernetes, helm, json, github-actions, jenkins)"""
     try:
-        data = request.get_json()
+        data = request_data()
         xml_content = data.get('xml', '')
+        if isinstance(data.get('environment'), list):
+            # Liste d'environnements : équivalent de environments=[...]
+            data['environments'] = data['environment']
+            data['environment'] = '*'
+        if 'environments' in data:
+            data['environments'] = list_param('environments', data['environments'])
         environment = data.get('environment', 'dev')
+        options = transform_options(target, data)
         
-        if not xml_content:
-            return jsonify({
-                'success': False,
-                'message': 'Aucun contenu XML fourni'
-            }), 400
+        stream = stream_mode(data.get('stream') or request.args.get('stream'))
+        if stream:
+            return stream_transform(target, data, stream)
         
-        # Valider d'abord
-        validation = validate_xml(xml_content)
-        if not validation['valid']:
+        if check_target(target)[0] is not None or not xml_content:
+            payload, status = run_transform_pipeline(target, xml_content, environment, options)
+            return jsonify(payload), status
+
+        if (environment == '*' or data.get('environments')) and not multi_env_renderer.supports(target):
             return jsonify({
                 'success': False,
-                'message': 'Le XML n\'est pas valide',
-                'validation_errors': validation.get('errors', [])
+                'message': f'Plusieurs environnements non pris en charge pour la cible {target}'
             }), 400
+
+        # Clé de contenu : sert d'ETag et de clé du cache de résultats ; avec des
+        # inclusions, le document principal parsé pour l'empreinte est réutilisé
+        main_doc = parse_main_for_includes(xml_content)
+        key = transform_cache_key(target, xml_content, environment, options, main_doc)
+        if request.if_none_match.contains_weak(key):
+            response = app.response_class(status=304)
+            response.set_etag(key)
+            return response
         
-        # Transformer en JSON via XSLT
-        if os.path.exists(JSON_XSLT):
-            result = transform_xml(xml_content, JSON_XSLT, environment)
-            if result['success']:
-                # Parser le JSON pour valider
-                try:
-                    json_data = json.loads(result['content'])
-                    return jsonify({
-                        'success': True,
-                        'content': json.dumps(json_data, indent=2),
-                        'data': json_data,
-                        'message': 'Transformation réussie'
-                    })
-                except json.JSONDecodeError:
-                    return jsonify({
-                        'success': False,
-                        'message': 'Erreur lors du parsing JSON généré'
-                    }), 500
-            return jsonify(result)
+        body = result_cache.get(key)
+        if body is None:
+            if main_doc is not None and app.config['WORKER_MODE'] != 'process':
+                payload, status = run_transform_pipeline(target, xml_content, environment, options, main_doc)
+            else:
+                # Un arbre lxml ne passe pas d'un processus à l'autre : le worker parse le texte
+                payload, status = offload('run_transform_pipeline', target, xml_content, environment, options)
+            with timed('serialization'):
+                response = jsonify(payload)
+            response.status_code = status
+            if status != 200 or not payload.get('success'):
+                return response
+            result_cache.put(key, response.get_data())
         else:
-            # Fallback: utiliser l'endpoint export
-            return export_config()
+            response = app.response_class(body, mimetype='application/json')
+        
+        response.set_etag(key)
+        return response
+    except PROPAGATED_ERRORS:
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
@@ -278,19 +1249,18 @@ def transform_json():
 def get_environments():
     """Récupère la liste des environnements depuis le XML"""
     try:
-        data = request.get_json()
+        data = request_data()
         xml_content = data.get('xml', '')
         
         if not xml_content:
             return jsonify({'environments': []}), 200
         
-        # Parser le XML
-        xml_doc = etree.parse(BytesIO(xml_content.encode('utf-8')))
-        
-        # Extraire les noms d'environnements
-        environments = xml_doc.xpath('//environment/name/text()')
+        config = load_config(xml_content)
+        environments = [env.name for env in config.environments if env.name]
         
         return jsonify({'environments': environments})
+    except PROPAGATED_ERRORS:
+        raise
     except Exception as e:
         return jsonify({
             'environments': [],
@@ -302,7 +1272,7 @@ def get_environments():
 def compare_environments():
     """Compare deux environnements"""
     try:
-        data = request.get_json()
+        data = request_data()
         xml_content = data.get('xml', '')
         env1 = data.get('environment1', '')
         env2 = data.get('environment2', '')
@@ -313,43 +1283,14 @@ def compare_environments():
                 'message': 'Paramètres manquants'
             }), 400
         
-        xml_doc = etree.parse(BytesIO(xml_content.encode('utf-8')))
-        
-        # Extraire les services de chaque environnement
-        env1_services = xml_doc.xpath(f'//environment[name="{env1}"]/services/service/name/text()')
-        env2_services = xml_doc.xpath(f'//environment[name="{env2}"]/services/service/name/text()')
-        
-        # Comparer
-        only_in_env1 = set(env1_services) - set(env2_services)
-        only_in_env2 = set(env2_services) - set(env1_services)
-        common = set(env1_services) & set(env2_services)
-        
-        # Comparer les détails des services communs
-        differences = []
-        for service_name in common:
-            env1_service = xml_doc.xpath(f'//environment[name="{env1}"]/services/service[name="{service_name}"]')[0]
-            env2_service = xml_doc.xpath(f'//environment[name="{env2}"]/services/service[name="{service_name}"]')[0]
-            
-            env1_image = env1_service.xpath('image/text()')[0] if env1_service.xpath('image/text()') else ''
-            env2_image = env2_service.xpath('image/text()')[0] if env2_service.xpath('image/text()') else ''
-            
-            if env1_image != env2_image:
-                differences.append({
-                    'service': service_name,
-                    'field': 'image',
-                    'env1_value': env1_image,
-                    'env2_value': env2_image
-                })
+        comparison = diff_environments(load_config(xml_content), env1, env2)
         
         return jsonify({
             'success': True,
-            'comparison': {
-                'only_in_env1': list(only_in_env1),
-                'only_in_env2': list(only_in_env2),
-                'common': list(common),
-                'differences': differences
-            }
+            'comparison': comparison
         })
+    except PROPAGATED_ERRORS:
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
@@ -357,52 +1298,40 @@ def compare_environments():
         }), 500
 
 
-@app.route('/api/transform/github-actions', methods=['POST'])
-def transform_github_actions():
-    """Endpoint pour transformer XML en GitHub Actions workflow YAML"""
-    try:
-        data = request.get_json()
-        xml_content = data.get('xml', '')
-        environment = data.get('environment', 'dev')
-        
-        if not xml_content:
-            return jsonify({
-                'success': False,
-                'message': 'Aucun contenu XML fourni'
-            }), 400
-        
-        # Valider d'abord
-        validation = validate_xml(xml_content)
-        if not validation['valid']:
-            return jsonify({
-                'success': False,
-                'message': 'Le XML n\'est pas valide',
-                'validation_errors': validation.get('errors', [])
-            }), 400
-        
-        # Transformer
-        if os.path.exists(GITHUB_ACTIONS_XSLT):
-            result = transform_xml(xml_content, GITHUB_ACTIONS_XSLT, environment)
-            return jsonify(result)
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'Fichier XSLT GitHub Actions non trouvé'
-            }), 500
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'Erreur serveur: {str(e)}'
-        }), 500
+def export_tree(config):
+    """Structure d'export d'un modèle (model.Config) ou d'un arbre lxml"""
+    if not isinstance(config, Config):
+        config = build_config(config)
+    application = config.application
+    return {
+        'application': {
+            'name': application.name or '' if application is not None else '',
+            'version': application.version or '' if application is not None else '',
+            'description': application.description or '' if application is not None else ''
+        },
+        'environments': [
+            {
+                'name': env.name or '',
+                'services': [
+                    {'name': service.name or '', 'image': service.image or '', 'tag': service.tag or ''}
+                    for service in env.services
+                ],
+                'variables': [
+                    {'name': variable.name or '', 'value': variable.value or ''}
+                    for variable in env.variables
+                ]
+            }
+            for env in config.environments
+        ]
+    }
 
 
-@app.route('/api/transform/jenkins', methods=['POST'])
-def transform_jenkins():
-    """Endpoint pour transformer XML en Jenkins pipeline Groovy"""
+@app.route('/api/export', methods=['POST'])
+def export_config():
+    """Exporte la configuration au format JSON"""
     try:
-        data = request.get_json()
+        data = request_data()
         xml_content = data.get('xml', '')
-        environment = data.get('environment', 'dev')
         
         if not xml_content:
             return jsonify({
@@ -410,97 +1339,109 @@ def transform_jenkins():
                 'message': 'Aucun contenu XML fourni'
             }), 400
         
-        # Valider d'abord
-        validation = validate_xml(xml_content)
-        if not validation['valid']:
-            return jsonify({
-                'success': False,
-                'message': 'Le XML n\'est pas valide',
-                'validation_errors': validation.get('errors', [])
-            }), 400
+        config = export_tree(load_config(xml_content))
         
-        # Transformer
-        if os.path.exists(JENKINS_XSLT):
-            result = transform_xml(xml_content, JENKINS_XSLT, environment)
-            return jsonify(result)
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'Fichier XSLT Jenkins non trouvé'
-            }), 500
+        return jsonify({
+            'success': True,
+            'config': config
+        })
+    except PROPAGATED_ERRORS:
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
-            'message': f'Erreur serveur: {str(e)}'
+            'message': f'Erreur lors de l\'export: {str(e)}'
         }), 500
 
 
-@app.route('/api/export', methods=['POST'])
-def export_config():
-    """Exporte la configuration au format JSON"""
+class _ZipStream(RawIOBase):
+    """Flux d'écriture non positionnable vidé au fil de la construction du zip"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def is_safe_entry_name(name):
+    """Vrai si name peut servir de répertoire dans l'archive (ni vide, ni '.', ni '..', sans séparateur)"""
+    return bool(name) and name not in ('.', '..') and not any(char in name for char in '/\\\0')
+
+
+def iter_bundle(xml_doc, targets, environments, chunk_size):
+    """Construit l'archive zip morceau par morceau, un artefact à la fois"""
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for environment in environments:
+            for target in targets:
+                name = f'{environment}/{TARGET_FILENAMES.get(target, target)}'
+                try:
+                    result = render_buffer(xml_doc, target, environment)
+                except Exception as e:
+                    archive.writestr(f'{name}.error.txt', f'Erreur lors de la transformation: {str(e)}')
+                    yield stream.drain()
+                    continue
+                with archive.open(name, 'w') as entry:
+                    for chunk in iter_buffer(result, chunk_size):
+                        entry.write(chunk)
+                        data = stream.drain()
+                        if data:
+                            yield data
+                del result
+                yield stream.drain()
+    yield stream.drain()
+
+
+@app.route('/api/download/bundle', methods=['POST'])
+def download_bundle():
+    """Télécharge une archive zip de plusieurs cibles et environnements"""
     try:
-        data = request.get_json()
-        xml_content = data.get('xml', '')
+        data = request_data()
+        xml_doc, targets, environments, error = prepare_batch(
+            data.get('xml', ''),
+            data.get('targets'),
+            data.get('environments')
+        )
+        if error is not None:
+            payload, status = error
+            return jsonify(payload), status
         
-        if not xml_content:
+        # Les noms d'environnement deviennent des chemins dans l'archive
+        unsafe = [environment for environment in environments if not is_safe_entry_name(environment)]
+        if unsafe:
             return jsonify({
                 'success': False,
-                'message': 'Aucun contenu XML fourni'
+                'message': f"Noms d'environnement invalides pour l'archive: {', '.join(map(repr, unsafe))}"
             }), 400
         
-        xml_doc = etree.parse(BytesIO(xml_content.encode('utf-8')))
-        
-        # Convertir en structure JSON
-        config = {
-            'application': {
-                'name': xml_doc.xpath('//application/name/text()')[0] if xml_doc.xpath('//application/name/text()') else '',
-                'version': xml_doc.xpath('//application/version/text()')[0] if xml_doc.xpath('//application/version/text()') else '',
-                'description': xml_doc.xpath('//application/description/text()')[0] if xml_doc.xpath('//application/description/text()') else ''
-            },
-            'environments': []
-        }
-        
-        for env in xml_doc.xpath('//environment'):
-            env_name = env.xpath('name/text()')[0]
-            env_config = {
-                'name': env_name,
-                'services': [],
-                'variables': []
-            }
-            
-            for service in env.xpath('.//service'):
-                service_config = {
-                    'name': service.xpath('name/text()')[0] if service.xpath('name/text()') else '',
-                    'image': service.xpath('image/text()')[0] if service.xpath('image/text()') else '',
-                    'tag': service.xpath('tag/text()')[0] if service.xpath('tag/text()') else ''
-                }
-                env_config['services'].append(service_config)
-            
-            for var in env.xpath('.//variables/variable'):
-                var_config = {
-                    'name': var.xpath('name/text()')[0] if var.xpath('name/text()') else '',
-                    'value': var.xpath('value/text()')[0] if var.xpath('value/text()') else ''
-                }
-                env_config['variables'].append(var_config)
-            
-            config['environments'].append(env_config)
-        
-        return jsonify({
-            'success': True,
-            'config': config
-        })
+        filename = secure_filename(data.get('filename', '')) or 'config-bundle'
+        response = app.response_class(
+            iter_bundle(xml_doc, targets, environments, app.config['STREAM_CHUNK_SIZE']),
+            mimetype='application/zip'
+        )
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}.zip"'
+        return response
+    except PROPAGATED_ERRORS:
+        raise
     except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'Erreur lors de l\'export: {str(e)}'
-        }), 500
+        return jsonify({'error': str(e)}), 500
 
 
 @app.route('/api/download/<format_type>', methods=['POST'])
 def download_file(format_type):
     """Télécharge le fichier généré"""
     try:
-        data = request.get_json()
+        data = request_data()
         content = data.get('content', '')
         environment = data.get('environment', 'dev')
         filename = data.get('filename', f'config-{environment}')
@@ -508,18 +1449,17 @@ def download_file(format_type):
         if not content:
             return jsonify({'error': 'Aucun contenu fourni'}), 400
         
-        # Créer un fichier temporaire
+        # Servir depuis un buffer en mémoire (aucun fichier temporaire)
         suffix = '.yaml' if format_type in ['docker-compose', 'kubernetes', 'helm'] else '.txt'
-        temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix=suffix, encoding='utf-8')
-        temp_file.write(content)
-        temp_file.close()
         
         return send_file(
-            temp_file.name,
+            BytesIO(content.encode('utf-8')),
             as_attachment=True,
             download_name=f'{filename}{suffix}',
             mimetype='text/yaml'
         )
+    except PROPAGATED_ERRORS:
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -530,5 +1470,40 @@ def health():
     return jsonify({'status': 'ok', 'message': 'API fonctionnelle'})
 
 
+@app.route('/api/registry', methods=['GET'])
+def registry_stats():
+    """Compteurs de compilation du schéma et des feuilles XSLT"""
+    return jsonify(registry.stats())
+
+
+@app.route('/api/cache', methods=['GET'])
+def cache_stats():
+    """Statistiques du cache de résultats de transformation"""
+    return jsonify(result_cache.stats())
+
+
+@app.route('/api/profiles', methods=['GET'])
+def list_profiles():
+    """Rapports de profilage conservés (profilage activé uniquement)"""
+    if not app.config['PROFILING_ENABLED']:
+        return jsonify({'error': 'Profilage désactivé'}), 404
+    return jsonify({'profiles': profile_store.summaries()})
+
+
+@app.route('/api/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """Rapport de profilage d'une requête : ventilation et points chauds"""
+    report = profile_store.get(profile_id) if app.config['PROFILING_ENABLED'] else None
+    if report is None:
+        return jsonify({'error': f'Profil inconnu: {profile_id}'}), 404
+    return jsonify(report)
+
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics_export():
+    """Métriques au format texte Prometheus"""
+    return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -0,0 +1,211 @@
+"""
+Mode de service asynchrone (ASGI)
+
+Le corps des requêtes est lu sur la boucle asyncio, sans occuper de
+thread pendant l'envoi par un client lent. Une fois le corps complet,
+l'application Flask est exécutée dans un pool de threads dédié au CPU
+(parsing, validation, transformation) : les routes et leurs contrats
+restent ceux de app.py.
+
+Deux limites distinctes :
+- ASGI_MAX_CONNECTIONS : requêtes acceptées simultanément (au-delà, 503) ;
+- ASGI_CPU_WORKERS : traitements exécutés en parallèle.
+
+MAX_CONTENT_LENGTH (app.py) est appliqué dès l'en-tête Content-Length,
+puis pendant la lecture : un corps trop gros n'est jamais mis en mémoire.
+
+Lancement : uvicorn asgi:application
+"""
+
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from app import app
+
+app.config.setdefault('ASGI_CPU_WORKERS', int(os.environ.get('ASGI_CPU_WORKERS', os.cpu_count() or 4)))
+app.config.setdefault('ASGI_MAX_CONNECTIONS', int(os.environ.get('ASGI_MAX_CONNECTIONS', 1000)))
+
+
+def build_environ(scope, body):
+    """Environnement WSGI équivalent à une requête HTTP ASGI"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+            continue
+        if name == 'CONTENT_LENGTH':
+            continue
+        key = f'HTTP_{name}'
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+async def send_error(send, status, message, headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), *headers]
+    })
+    await send({
+        'type': 'http.response.body',
+        'body': json.dumps({'success': False, 'message': message}).encode('utf-8')
+    })
+
+
+class AsgiApplication:
+    """Adapte une application WSGI à ASGI avec des limites de connexions et de CPU"""
+
+    def __init__(self, wsgi_app, cpu_workers, max_connections, max_content_length=None):
+        self.wsgi_app = wsgi_app
+        self.cpu_workers = cpu_workers
+        self.max_connections = max_connections
+        self.max_content_length = max_content_length
+        self.active = 0
+        self.rejected = 0
+        self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.cpu_workers,
+                thread_name_prefix='asgi-cpu'
+            )
+        return self._executor
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"Type de connexion non supporté: {scope['type']}")
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._executor is not None:
+                    self._executor.shutdown(wait=True)
+                    self._executor = None
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        # Un seul thread exécute la boucle : un compteur suffit
+        if self.active >= self.max_connections:
+            self.rejected += 1
+            await send_error(send, 503, 'Trop de connexions simultanées', [(b'retry-after', b'1')])
+            return
+        self.active += 1
+        try:
+            body = await self._read_body(scope, receive)
+            if body is None:
+                return
+            if body is False:
+                await send_error(
+                    send, 413, f'Requête trop volumineuse (maximum {self.max_content_length} octets)'
+                )
+                return
+            await self._respond(build_environ(scope, body), send)
+        finally:
+            self.active -= 1
+
+    async def _read_body(self, scope, receive):
+        """Lit le corps sans bloquer ; None si le client s'est déconnecté, False s'il est trop gros"""
+        limit = self.max_content_length
+        if limit:
+            for name, value in scope.get('headers', []):
+                if name.lower() == b'content-length' and value.isdigit() and int(value) > limit:
+                    return False
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if limit and size > limit:
+                return False
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+
+    async def _respond(self, environ, send):
+        loop = asyncio.get_running_loop()
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ]
+
+        def call_app():
+            return iter(self.wsgi_app(environ, start_response))
+
+        iterator = await loop.run_in_executor(self.executor, call_app)
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': started['status'],
+                'headers': started['headers']
+            })
+            # Les réponses en streaming sont rendues morceau par morceau dans le pool
+            while True:
+                chunk = await loop.run_in_executor(self.executor, next, iterator, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                await loop.run_in_executor(self.executor, close)
+
+    def stats(self):
+        return {
+            'cpu_workers': self.cpu_workers,
+            'max_connections': self.max_connections,
+            'active_connections': self.active,
+            'rejected': self.rejected
+        }
+
+
+application = AsgiApplication(
+    app,
+    app.config['ASGI_CPU_WORKERS'],
+    app.config['ASGI_MAX_CONNECTIONS'],
+    app.config['MAX_CONTENT_LENGTH']
+)
@@ -0,0 +1 @@
+# Benchmarks de performance pour DevOps Config Manager
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'export JSON (/api/export) : mise à l'échelle services × environnements
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import parse_xml, export_tree
+from benchmarks.generator import generate_config
+
+
+def bench(environments, services, repeat):
+    """Retourne le meilleur temps (ms) d'export pour une taille donnée"""
+    xml_doc = parse_xml(generate_config(environments=environments, services=services))
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        export_tree(xml_doc)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de export_tree')
+    parser.add_argument('--environments', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--services', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'envs':>6} {'services':>9} {'total':>8} {'ms':>10} {'µs/service':>11}")
+    for environments in args.environments:
+        for services in args.services:
+            elapsed = bench(environments, services, args.repeat)
+            total = environments * services
+            print(f'{environments:>6} {services:>9} {total:>8} {elapsed:>10.3f} {elapsed * 1000 / total:>11.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark des configurations multi-fichiers : inclusions en cache contre
+reparsing du document fusionné complet, après modification d'un seul fichier
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lxml import etree
+
+from benchmarks.generator import generate_config, split_config
+from includes import IncludeResolver
+
+
+def best_of(func, repeat):
+    """Meilleur temps (ms) sur repeat exécutions"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def canonical(xml_doc):
+    return etree.tostring(xml_doc, method='c14n', exclusive=True)
+
+
+def bench(environments, services, repeat):
+    """Retourne (ms document fusionné, ms xinclude lxml, ms inclusions en cache)"""
+    merged = generate_config(environments=environments, services=services).encode('utf-8')
+    with tempfile.TemporaryDirectory() as directory:
+        main = split_config(merged.decode('utf-8'), directory).encode('utf-8')
+        main_path = os.path.join(directory, 'main.xml')
+        with open(main_path, 'wb') as f:
+            f.write(main)
+        changed = os.path.join(directory, 'environments', f'env{environments // 2}.xml')
+        resolver = IncludeResolver()
+        mtimes = itertools.count(os.stat(changed).st_mtime_ns + 1)
+
+        def touch():
+            # Un seul fichier modifié entre deux régénérations
+            mtime = next(mtimes)
+            os.utime(changed, ns=(mtime, mtime))
+
+        def cached():
+            touch()
+            xml_doc = etree.fromstring(main).getroottree()
+            resolver.resolve(xml_doc, directory)
+            return xml_doc
+
+        def lxml_xinclude():
+            touch()
+            xml_doc = etree.parse(main_path)
+            xml_doc.xinclude()
+            return xml_doc
+
+        if canonical(cached()) != canonical(etree.fromstring(merged)):
+            raise SystemExit(f'Arbre résolu différent du document fusionné : {environments}x{services}')
+        merged_ms = best_of(lambda: etree.fromstring(merged), repeat)
+        xinclude_ms = best_of(lxml_xinclude, repeat)
+        parses = resolver.parses
+        cached_ms = best_of(cached, repeat)
+        if resolver.parses - parses != repeat:
+            raise SystemExit('Le cache a reparsé des fichiers inchangés')
+    return merged_ms, xinclude_ms, cached_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark inclusions en cache / document fusionné')
+    parser.add_argument('--environments', type=int, nargs='+', default=[30])
+    parser.add_argument('--services', type=int, nargs='+', default=[5, 20, 100])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'envs':>5} {'services':>9} {'fusionné ms':>12} {'xinclude ms':>12} {'cache ms':>10} {'gain':>6}")
+    for environments in args.environments:
+        for services in args.services:
+            merged_ms, xinclude_ms, cached_ms = bench(environments, services, args.repeat)
+            print(f'{environments:>5} {services:>9} {merged_ms:>12.3f} {xinclude_ms:>12.3f} {cached_ms:>10.3f}'
+                  f' {merged_ms / cached_ms:>5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark mémoire du modèle compact (model.py) contre l'arbre lxml gardé en vie
+
+Chaque mesure s'exécute dans un processus neuf. L'arbre lxml est alloué
+par libxml2, hors de portée de tracemalloc : il est mesuré par la mémoire
+résidente avant et après parsing. Le modèle est mesuré par tracemalloc,
+après libération de l'arbre (la mémoire rendue par libxml2 n'est pas
+toujours restituée au système, la mémoire résidente le surestimerait).
+"""
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import generate_config
+
+
+def resident_bytes():
+    """Mémoire résidente courante (Linux : /proc/self/statm)"""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def measure(mode, environments, services):
+    from lxml import etree
+    from model import build_config
+
+    xml_content = generate_config(environments=environments, services=services).encode('utf-8')
+    parser = etree.XMLParser(huge_tree=True)
+    gc.collect()
+    before = resident_bytes()
+    xml_doc = etree.fromstring(xml_content, parser).getroottree()
+    result = {'mode': mode, 'input_bytes': len(xml_content), 'bytes': resident_bytes() - before}
+    if mode == 'model':
+        start = time.perf_counter()
+        build_config(xml_doc)
+        result['ms'] = round((time.perf_counter() - start) * 1000, 1)
+        tracemalloc.start()
+        config = build_config(xml_doc)
+        del xml_doc
+        gc.collect()
+        result['bytes'] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert config.environments
+    return result
+
+
+def run(mode, environments, services):
+    """Mesure dans un sous-processus pour ne pas hériter de la mémoire déjà allouée"""
+    output = subprocess.check_output([
+        sys.executable, os.path.abspath(__file__), '--measure', mode,
+        '--environments', str(environments[0]), '--services', str(services[0])
+    ])
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark mémoire : modèle compact / arbre lxml')
+    parser.add_argument('--environments', type=int, nargs='+', default=[1, 5, 10])
+    parser.add_argument('--services', type=int, nargs='+', default=[1000, 5000])
+    parser.add_argument('--measure', choices=['tree', 'model'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.environments[0], args.services[0])))
+        return
+
+    print(f"{'envs':>5} {'services':>9} {'XML Mo':>8} {'arbre Mo':>9} {'modèle Mo':>10} {'ratio':>6} {'modèle ms':>10}")
+    for environments in args.environments:
+        for services in args.services:
+            tree = run('tree', [environments], [services])
+            model = run('model', [environments], [services])
+            print(f"{environments:>5} {services:>9} {tree['input_bytes'] / 1e6:>8.1f}"
+                  f" {tree['bytes'] / 1e6:>9.1f} {model['bytes'] / 1e6:>10.1f}"
+                  f" {tree['bytes'] / max(model['bytes'], 1):>5.1f}x {model['ms']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
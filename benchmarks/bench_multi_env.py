@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark du rendu multi-environnements : un passage XSLT contre N appels séparés
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import multi_env_renderer, parse_xml, transform_tree, TRANSFORM_TARGETS
+from benchmarks.generator import generate_config
+from multi_env import MULTI_ENV_TARGETS
+
+
+def best_of(func, repeat):
+    """Meilleur temps (ms) sur repeat exécutions"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench(target, environments, services, repeat):
+    """Retourne (ms N appels, ms un passage) pour tous les environnements d'une taille donnée"""
+    xml_doc = parse_xml(generate_config(environments=environments, services=services))
+    names = [f'env{index}' for index in range(environments)]
+
+    def separate():
+        return {name: transform_tree(xml_doc, TRANSFORM_TARGETS[target], name)['content'] for name in names}
+
+    if multi_env_renderer.render(xml_doc, target) != separate():
+        raise SystemExit(f'Sortie différente des appels séparés : {target} {environments}x{services}')
+    separate_ms = best_of(separate, repeat)
+    single_ms = best_of(lambda: multi_env_renderer.render(xml_doc, target), repeat)
+    return separate_ms, single_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark rendu multi-environnements / appels séparés')
+    parser.add_argument('--targets', nargs='+', default=list(MULTI_ENV_TARGETS), choices=MULTI_ENV_TARGETS)
+    parser.add_argument('--environments', type=int, nargs='+', default=[30])
+    parser.add_argument('--services', type=int, nargs='+', default=[5, 20, 100])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'cible':<15} {'envs':>5} {'services':>9} {'N appels ms':>12} {'1 passage ms':>13} {'gain':>6}")
+    for target in args.targets:
+        for environments in args.environments:
+            for services in args.services:
+                separate_ms, single_ms = bench(target, environments, services, args.repeat)
+                print(f'{target:<15} {environments:>5} {services:>9} {separate_ms:>12.3f} {single_ms:>13.3f}'
+                      f' {separate_ms / single_ms:>5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark du rendu kubernetes / docker-compose : feuille XSLT contre rendu natif
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import parse_xml, transform_tree, TRANSFORM_TARGETS
+from benchmarks.generator import generate_config
+from native_render import NATIVE_RENDERERS
+
+
+def best_of(func, repeat):
+    """Meilleur temps (ms) sur repeat exécutions"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench(target, environments, services, repeat):
+    """Retourne (ms XSLT, ms natif) pour le dernier environnement d'une taille donnée"""
+    xml_doc = parse_xml(generate_config(environments=environments, services=services))
+    environment = f'env{environments - 1}'
+    renderer = NATIVE_RENDERERS[target]
+    if renderer(xml_doc, environment) != transform_tree(xml_doc, TRANSFORM_TARGETS[target], environment)['content']:
+        raise SystemExit(f'Sortie différente de la feuille XSLT : {target} {environments}x{services}')
+    xslt_ms = best_of(lambda: transform_tree(xml_doc, TRANSFORM_TARGETS[target], environment), repeat)
+    native_ms = best_of(lambda: renderer(xml_doc, environment), repeat)
+    return xslt_ms, native_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark XSLT / rendu natif')
+    parser.add_argument('--targets', nargs='+', default=sorted(NATIVE_RENDERERS), choices=sorted(NATIVE_RENDERERS))
+    parser.add_argument('--environments', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--services', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'cible':<15} {'envs':>5} {'services':>9} {'xslt ms':>10} {'natif ms':>10} {'gain':>6}")
+    for target in args.targets:
+        for environments in args.environments:
+            for services in args.services:
+                xslt_ms, native_ms = bench(target, environments, services, args.repeat)
+                print(f'{target:<15} {environments:>5} {services:>9} {xslt_ms:>10.3f} {native_ms:>10.3f}'
+                      f' {xslt_ms / native_ms:>5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Générateur de configurations devops-config synthétiques (valides vis-à-vis du XSD)
+"""
+
+import os
+from xml.sax.saxutils import escape
+
+from lxml import etree
+
+XINCLUDE_NS = 'http://www.w3.org/2001/XInclude'
+
+
+def generate_config(environments=3, services=10, ports=1, volumes=1, variables=2,
+                    service_variables=1, secrets=1, depends_on=True, kubernetes=True):
+    """Génère un document XML devops-config de la taille demandée"""
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        '<devops-config version="1.0">\n',
+        '    <application>\n',
+        '        <name>bench-app</name>\n',
+        '        <version>1.0.0</version>\n',
+        '        <description>Configuration synthétique</description>\n',
+        '    </application>\n',
+        '    <environments>\n'
+    ]
+    for e in range(environments):
+        env_name = f'env{e}'
+        parts.append('        <environment>\n')
+        parts.append(f'            <name>{env_name}</name>\n')
+        parts.append('            <services>\n')
+        for s in range(services):
+            parts.append(_service(e, s, ports, volumes, service_variables, depends_on))
+        parts.append('            </services>\n')
+        if variables:
+            parts.append('            <variables>\n')
+            for v in range(variables):
+                parts.append(
+                    f'                <variable><name>VAR_{v}</name>'
+                    f'<value>{escape(f"value-{e}-{v}")}</value></variable>\n'
+                )
+            parts.append('            </variables>\n')
+        if secrets:
+            parts.append('            <secrets>\n')
+            for k in range(secrets):
+                parts.append(
+                    f'                <secret><name>SECRET_{k}</name>'
+                    f'<source>vault</source><key>key-{k}</key></secret>\n'
+                )
+            parts.append('            </secrets>\n')
+        if kubernetes:
+            parts.append(
+                '            <kubernetes>\n'
+                f'                <namespace>{env_name}</namespace>\n'
+                '                <resources>\n'
+                '                    <requests><cpu>100m</cpu><memory>128Mi</memory></requests>\n'
+                '                    <limits><cpu>500m</cpu><memory>512Mi</memory></limits>\n'
+                '                </resources>\n'
+                '                <service><type>ClusterIP</type></service>\n'
+                '            </kubernetes>\n'
+            )
+        parts.append('        </environment>\n')
+    parts.append('    </environments>\n')
+    parts.append('</devops-config>\n')
+    return ''.join(parts)
+
+
+def _service(e, s, ports, volumes, service_variables, depends_on):
+    lines = [
+        '                <service>\n',
+        f'                    <name>svc{s}</name>\n',
+        f'                    <image>registry.local/svc{s}</image>\n',
+        f'                    <tag>1.{e}.{s}</tag>\n'
+    ]
+    if ports:
+        lines.append('                    <ports>\n')
+        for p in range(ports):
+            lines.append(
+                f'                        <port><host>{10000 + s * ports + p}</host>'
+                f'<container>{8000 + p}</container><protocol>tcp</protocol></port>\n'
+            )
+        lines.append('                    </ports>\n')
+    if volumes:
+        lines.append('                    <volumes>\n')
+        for v in range(volumes):
+            lines.append(
+                f'                        <volume><host_path>./data/svc{s}/{v}</host_path>'
+                f'<container_path>/data/{v}</container_path><mode>rw</mode></volume>\n'
+            )
+        lines.append('                    </volumes>\n')
+    if service_variables:
+        lines.append('                    <environment>\n')
+        for v in range(service_variables):
+            lines.append(
+                f'                        <variable><name>SVC_VAR_{v}</name>'
+                f'<value>{s}-{v}</value></variable>\n'
+            )
+        lines.append('                    </environment>\n')
+    if depends_on and s > 0:
+        lines.append(
+            '                    <depends_on>\n'
+            f'                        <service>svc{s - 1}</service>\n'
+            '                    </depends_on>\n'
+        )
+    lines.append(f'                    <command>run --id {s}</command>\n')
+    lines.append(f'                    <replicas>{1 + s % 3}</replicas>\n')
+    lines.append('                </service>\n')
+    return ''.join(lines)
+
+
+def split_config(xml_content, directory):
+    """Répartit un document sur plusieurs fichiers : un fichier par environnement
+
+    Écrit environments/<nom>.xml sous directory et retourne le document
+    principal, dont chaque environnement est remplacé par un xi:include.
+    """
+    root = etree.fromstring(xml_content.encode('utf-8'))
+    os.makedirs(os.path.join(directory, 'environments'), exist_ok=True)
+    for env in root.findall('environments/environment'):
+        href = f"environments/{env.findtext('name')}.xml"
+        with open(os.path.join(directory, href), 'wb') as f:
+            f.write(etree.tostring(env, with_tail=False, xml_declaration=True, encoding='UTF-8'))
+        include = etree.Element(f'{{{XINCLUDE_NS}}}include', href=href, nsmap={'xi': XINCLUDE_NS})
+        include.tail = env.tail
+        env.getparent().replace(env, include)
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8').decode('utf-8')
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks : validation, transformations XSLT, export et comparaison
+
+Chaque cas est mesuré sur des configurations synthétiques de tailles
+croissantes (environnements × services). Les résultats (débit, p50, p99)
+sont écrits en JSON et peuvent être comparés à une référence : le script
+échoue si une latence p50 régresse au-delà du seuil.
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, model_cache, validate_xml, transform_xml
+from benchmarks.generator import generate_config
+
+XSLT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'xslt')
+
+DEFAULT_SIZES = ['1x10', '5x50', '20x200']
+
+
+def percentile(samples, pct):
+    """Percentile par rang le plus proche"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(func, iterations, warmup=1):
+    """Exécute func et retourne les durées en ms"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def uncached(func):
+    """func exécutée sans modèle en cache : chaque itération reparse et reconstruit le modèle"""
+    def run():
+        model_cache.clear()
+        return func()
+    return run
+
+
+def build_cases(xml_content, environments):
+    """Cas mesurés pour un document : {nom: fonction}"""
+    client = app.test_client()
+    first, last = environments[0], environments[-1]
+    cases = {'validate_xml': lambda: validate_xml(xml_content)}
+    for xslt_path in sorted(glob.glob(os.path.join(XSLT_DIR, '*.xslt'))):
+        name = os.path.splitext(os.path.basename(xslt_path))[0]
+        cases[f'transform_xml[{name}]'] = (
+            lambda path=xslt_path: transform_xml(xml_content, path, first)
+        )
+    cases['export_config'] = uncached(lambda: client.post('/api/export', json={'xml': xml_content}))
+    cases['compare_environments'] = uncached(lambda: client.post('/api/compare', json={
+        'xml': xml_content, 'environment1': first, 'environment2': last
+    }))
+    return cases
+
+
+def run_suite(sizes, iterations, ports, volumes, variables):
+    """Mesure tous les cas pour chaque taille ; retourne la liste des résultats"""
+    results = []
+    for size in sizes:
+        env_count, service_count = (int(part) for part in size.split('x'))
+        xml_content = generate_config(
+            environments=env_count,
+            services=service_count,
+            ports=ports,
+            volumes=volumes,
+            variables=variables
+        )
+        size_bytes = len(xml_content.encode('utf-8'))
+        environments = [f'env{i}' for i in range(env_count)]
+        for name, func in build_cases(xml_content, environments).items():
+            samples = measure(func, iterations)
+            total_s = sum(samples) / 1000
+            results.append({
+                'case': name,
+                'size': size,
+                'input_bytes': size_bytes,
+                'iterations': iterations,
+                'p50_ms': round(percentile(samples, 50), 4),
+                'p99_ms': round(percentile(samples, 99), 4),
+                'ops_per_s': round(iterations / total_s, 2) if total_s else None,
+                'mb_per_s': round(size_bytes * iterations / total_s / 1e6, 3) if total_s else None
+            })
+            print(f"{size:>8} {name:<34} p50 {results[-1]['p50_ms']:>10.3f} ms"
+                  f"  p99 {results[-1]['p99_ms']:>10.3f} ms  {results[-1]['ops_per_s']:>10} op/s")
+    return results
+
+
+def compare_to_baseline(results, baseline, threshold):
+    """Retourne les cas dont la latence p50 dépasse la référence de plus de threshold"""
+    reference = {(item['case'], item['size']): item for item in baseline.get('results', [])}
+    regressions = []
+    for item in results:
+        base = reference.get((item['case'], item['size']))
+        if base is None or not base['p50_ms']:
+            continue
+        ratio = item['p50_ms'] / base['p50_ms']
+        if ratio > 1 + threshold:
+            regressions.append({
+                'case': item['case'],
+                'size': item['size'],
+                'baseline_p50_ms': base['p50_ms'],
+                'p50_ms': item['p50_ms'],
+                'ratio': round(ratio, 3)
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks de DevOps Config Manager')
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES,
+                       help='Tailles ENVxSERVICES (défaut: %(default)s)')
+    parser.add_argument('--iterations', type=int, default=20, help='Mesures par cas')
+    parser.add_argument('--ports', type=int, default=2, help='Ports par service')
+    parser.add_argument('--volumes', type=int, default=1, help='Volumes par service')
+    parser.add_argument('--variables', type=int, default=5, help='Variables par environnement')
+    parser.add_argument('--output', '-o', help='Fichier JSON des résultats')
+    parser.add_argument('--baseline', help='Fichier JSON de référence à comparer')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                       help='Régression p50 tolérée (0.25 = +25%%)')
+
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, args.iterations, args.ports, args.volumes, args.variables)
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Résultats écrits: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} régression(s) au-delà de {args.threshold:.0%}:")
+            for item in regressions:
+                print(f"  {item['size']} {item['case']}: {item['baseline_p50_ms']} → {item['p50_ms']} ms (x{item['ratio']})")
+            sys.exit(1)
+        print(f"\n✅ Aucune régression au-delà de {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
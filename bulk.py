@@ -0,0 +1,350 @@
+"""
+Traitement en masse de fichiers de configuration XML
+
+Les entrées (fichiers, répertoires, globs) sont réparties sur un pool de
+processus ; chaque worker compile le schéma ou les feuilles XSLT une
+seule fois. En génération, un manifeste d'empreintes permet de sauter
+les fichiers inchangés depuis la dernière exécution.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from lxml import etree
+
+from json_export import JsonExporter
+from multi_env import MultiEnvironmentRenderer
+from registry import CompiledRegistry
+from targets import TARGET_FILENAMES, TRANSFORM_TARGETS, XSD_SCHEMA_PATH
+from validation import validate_document, validate_while_parsing
+
+MANIFEST_NAME = '.generate-manifest.json'
+
+
+def expand_inputs(patterns):
+    """Liste triée et sans doublon des fichiers XML désignés par des chemins, répertoires ou globs"""
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for directory, _, names in os.walk(pattern):
+                files.update(os.path.join(directory, name) for name in names if name.endswith('.xml'))
+        elif glob.has_magic(pattern):
+            files.update(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        else:
+            files.add(pattern)
+    return sorted(os.path.abspath(path) for path in files)
+
+
+def output_stems(paths):
+    """Nom relatif de chaque entrée (sans extension) sous le répertoire de sortie"""
+    if not paths:
+        return {}
+    root = os.path.commonpath([os.path.dirname(path) for path in paths])
+    return {path: os.path.splitext(os.path.relpath(path, root))[0] for path in paths}
+
+
+def run_pool(func, items, workers, initializer, initargs):
+    """Applique func(*item) dans un pool de processus ; produit les résultats au fil de l'eau
+
+    Avec un seul worker, tout s'exécute dans le processus courant.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(items))
+    if workers <= 1:
+        initializer(*initargs)
+        for item in items:
+            yield func(*item)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        futures = [pool.submit(func, *item) for item in items]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def toolchain_version(targets):
+    """Empreinte du schéma et des feuilles utilisées : un changement invalide le manifeste"""
+    digest = hashlib.sha256()
+    for path in [XSD_SCHEMA_PATH] + [TRANSFORM_TARGETS[target] for target in sorted(targets)]:
+        digest.update(os.path.basename(path).encode('utf-8'))
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class Manifest:
+    """Empreintes des entrées déjà traitées et fichiers produits"""
+
+    def __init__(self, path, version):
+        self.path = path
+        self.version = version
+        self.entries = {}
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == version:
+                self.entries = data.get('entries', {})
+
+    def is_current(self, path, options):
+        """Vrai si l'entrée est inchangée (mtime et taille, sinon empreinte) et ses sorties présentes"""
+        entry = self.entries.get(path)
+        if entry is None or entry.get('options') != options:
+            return False
+        if not all(os.path.exists(output) for output in entry.get('outputs', [])):
+            return False
+        st = os.stat(path)
+        if st.st_mtime_ns == entry['mtime'] and st.st_size == entry['size']:
+            return True
+        if file_digest(path) != entry['digest']:
+            return False
+        entry['mtime'], entry['size'] = st.st_mtime_ns, st.st_size
+        return True
+
+    def record(self, result, options):
+        self.entries[result['input']] = {
+            'digest': result['digest'],
+            'mtime': result['mtime'],
+            'size': result['size'],
+            'options': options,
+            'outputs': result['outputs']
+        }
+
+    def save(self):
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'entries': self.entries}, f, indent=2, sort_keys=True)
+        os.replace(temporary, self.path)
+
+
+# État d'un worker de génération : feuilles compilées une seule fois par processus
+_generator = None
+
+
+def init_generator(targets):
+    global _generator
+    registry = CompiledRegistry(XSD_SCHEMA_PATH, {target: TRANSFORM_TARGETS[target] for target in targets})
+    registry.warm_up()
+    _generator = {
+        'registry': registry,
+        'json': JsonExporter(XSD_SCHEMA_PATH),
+        'multi': MultiEnvironmentRenderer(registry, TRANSFORM_TARGETS)
+    }
+
+
+def render(xml_doc, target, environment):
+    """Contenu d'une cible pour un environnement (même rendu que l'API)"""
+    if target == 'json':
+        return json.dumps(_generator['json'].export(xml_doc, environment), indent=2)
+    with _generator['registry'].stylesheet(target) as xslt_transformer:
+        return str(xslt_transformer(xml_doc, environment=etree.XSLT.strparam(environment)))
+
+
+def environment_directory(output_dir, stem, environment):
+    """Répertoire de sortie d'un environnement, qui doit rester sous output_dir"""
+    if (not environment or environment in ('.', '..') or '\0' in environment
+            or any(sep in environment for sep in (os.sep, os.altsep) if sep)):
+        raise ValueError(f"Nom d'environnement invalide pour un répertoire: {environment!r}")
+    root = os.path.realpath(output_dir)
+    directory = os.path.realpath(os.path.join(root, stem, environment))
+    if os.path.commonpath([directory, root]) != root:
+        raise ValueError(f"Répertoire hors de {output_dir}: {environment!r}")
+    return directory
+
+
+def generate_file(path, output_dir, stem, targets, environments=None):
+    """Génère toutes les cibles de tous les environnements d'un fichier
+
+    Le fichier est d'abord validé contre le schéma XSD, comme dans l'API :
+    un fichier invalide est signalé en erreur sans rien écrire.
+    """
+    start = time.perf_counter()
+    st = os.stat(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    result = {
+        'input': path,
+        'digest': hashlib.sha256(data).hexdigest(),
+        'mtime': st.st_mtime_ns,
+        'size': st.st_size,
+        'outputs': [],
+        'error': None
+    }
+    try:
+        xml_doc = etree.fromstring(data, base_url=path).getroottree()
+        with _generator['registry'].schema() as xsd_schema:
+            valid, errors = validate_document(xml_doc, xsd_schema, max_errors=1)
+        if not valid:
+            error = errors[0]
+            raise ValueError(f"XML invalide selon le schéma XSD (ligne {error['line'] or '?'}): {error['message']}")
+        names = environments or xml_doc.xpath('/devops-config/environments/environment/name/text()')
+        directories = {environment: environment_directory(output_dir, stem, environment) for environment in names}
+        # kubernetes, docker-compose et helm : tous les environnements en un seul passage
+        rendered = {
+            target: _generator['multi'].render(xml_doc, target, names)
+            for target in targets if _generator['multi'].supports(target)
+        }
+        for environment in names:
+            directory = directories[environment]
+            os.makedirs(directory, exist_ok=True)
+            for target in targets:
+                output = os.path.join(directory, TARGET_FILENAMES[target])
+                content = rendered[target][environment] if target in rendered else render(xml_doc, target, environment)
+                with open(output, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                result['outputs'].append(output)
+    except Exception as e:
+        result['error'] = str(e)
+    result['duration_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+def generate_bulk(patterns, output_dir, targets=None, environments=None, workers=None,
+                  manifest_path=None, force=False, progress=None):
+    """Génère en masse ; retourne un résumé (fichiers générés, inchangés, en erreur)"""
+    start = time.perf_counter()
+    targets = list(targets or TRANSFORM_TARGETS)
+    paths = expand_inputs(patterns)
+    stems = output_stems(paths)
+    options = {'targets': targets, 'environments': environments, 'output_dir': os.path.abspath(output_dir)}
+    manifest = Manifest(manifest_path or os.path.join(output_dir, MANIFEST_NAME), toolchain_version(targets))
+
+    pending = [path for path in paths if force or not manifest.is_current(path, options)]
+    results = []
+    if pending:
+        os.makedirs(output_dir, exist_ok=True)
+        items = [(path, output_dir, stems[path], targets, environments) for path in pending]
+        for result in run_pool(generate_file, items, workers, init_generator, (targets,)):
+            results.append(result)
+            if progress:
+                progress(result)
+
+    for result in results:
+        if result['error'] is None:
+            manifest.record(result, options)
+    if results or not os.path.exists(manifest.path):
+        os.makedirs(os.path.dirname(os.path.abspath(manifest.path)), exist_ok=True)
+        manifest.save()
+
+    results.sort(key=lambda item: item['input'])
+    return {
+        'inputs': len(paths),
+        'generated': sum(1 for result in results if result['error'] is None),
+        'skipped': len(paths) - len(pending),
+        'failed': [result for result in results if result['error'] is not None],
+        'outputs': sum(len(result['outputs']) for result in results),
+        'duration_s': round(time.perf_counter() - start, 3),
+        'results': results
+    }
+
+
+# État d'un worker de validation : schéma compilé une seule fois par processus
+_validator = None
+
+
+def init_validator(xsd_path, streaming=False, max_errors=None, huge_tree=False):
+    global _validator
+    _validator = {
+        'schema': etree.XMLSchema(etree.parse(xsd_path)),
+        'streaming': streaming,
+        'max_errors': max_errors,
+        'huge_tree': huge_tree
+    }
+
+
+def validate_file(path):
+    """Valide un fichier ; status 'valid', 'invalid' (schéma) ou 'error' (syntaxe, lecture)"""
+    start = time.perf_counter()
+    schema = _validator['schema']
+    max_errors = _validator['max_errors']
+    result = {'file': path, 'mode': 'streaming' if _validator['streaming'] else 'tree'}
+    try:
+        if _validator['streaming']:
+            _, outcome = validate_while_parsing(
+                path, schema, max_errors=max_errors, huge_tree=_validator['huge_tree'], keep_tree=False
+            )
+            syntax_error = outcome['message'].startswith('Erreur de syntaxe XML')
+            status = 'valid' if outcome['valid'] else ('error' if syntax_error else 'invalid')
+            errors = outcome.get('errors', [])
+        else:
+            xml_doc = etree.parse(path, etree.XMLParser(huge_tree=_validator['huge_tree']))
+            valid, errors = validate_document(xml_doc, schema, max_errors)
+            status = 'valid' if valid else 'invalid'
+    except etree.XMLSyntaxError as e:
+        status = 'error'
+        errors = [{'line': e.lineno, 'message': f'Erreur de syntaxe XML: {e.msg}'}]
+    except OSError as e:
+        status = 'error'
+        errors = [{'line': None, 'message': str(e)}]
+    result.update(
+        valid=status == 'valid',
+        status=status,
+        errors=errors,
+        duration_ms=round((time.perf_counter() - start) * 1000, 3)
+    )
+    return result
+
+
+def validation_summary(results, duration_s, workers):
+    """Résumé agrégé d'une validation en masse"""
+    durations = sorted(result['duration_ms'] for result in results)
+    return {
+        'files': len(results),
+        'valid': sum(1 for result in results if result['status'] == 'valid'),
+        'invalid': sum(1 for result in results if result['status'] == 'invalid'),
+        'errors': sum(1 for result in results if result['status'] == 'error'),
+        'workers': workers,
+        'duration_s': round(duration_s, 3),
+        'total_file_ms': round(sum(durations), 3),
+        'p50_ms': durations[(len(durations) - 1) // 2] if durations else None,
+        'max_ms': durations[-1] if durations else None
+    }
+
+
+def validate_bulk(patterns, xsd_path=None, workers=None, streaming=False, max_errors=None,
+                  huge_tree=False, on_result=None):
+    """Valide en masse ; retourne (résultats triés par fichier, résumé)
+
+    on_result est appelé pour chaque fichier dès que son résultat est prêt.
+    """
+    start = time.perf_counter()
+    paths = expand_inputs(patterns)
+    workers = min(workers or os.cpu_count() or 1, max(len(paths), 1))
+    results = []
+    initargs = (xsd_path or XSD_SCHEMA_PATH, streaming, max_errors, huge_tree)
+    for result in run_pool(validate_file, [(path,) for path in paths], workers, init_validator, initargs):
+        results.append(result)
+        if on_result:
+            on_result(result)
+    results.sort(key=lambda item: item['file'])
+    return results, validation_summary(results, time.perf_counter() - start, workers)
+
+
+def junit_report(results, summary, suite_name='validate-xml'):
+    """Rapport JUnit XML (un testcase par fichier) ; retourne des bytes"""
+    failures = str(summary['invalid'])
+    errors = str(summary['errors'])
+    elapsed = f"{summary['duration_s']:.3f}"
+    suites = etree.Element('testsuites', tests=str(summary['files']), failures=failures, errors=errors, time=elapsed)
+    suite = etree.SubElement(
+        suites, 'testsuite', name=suite_name, tests=str(summary['files']), failures=failures, errors=errors, time=elapsed
+    )
+    for result in results:
+        case = etree.SubElement(
+            suite, 'testcase', classname=suite_name, name=result['file'], time=f"{result['duration_ms'] / 1000:.6f}"
+        )
+        if result['status'] == 'valid':
+            continue
+        tag = 'failure' if result['status'] == 'invalid' else 'error'
+        detail = etree.SubElement(case, tag, message=f"{len(result['errors'])} erreur(s)")
+        detail.text = '\n'.join(
+            f"Ligne {error['line'] if error.get('line') is not None else '?'}: {error['message']}"
+            for error in result['errors']
+        )
+    return etree.tostring(suites, xml_declaration=True, encoding='UTF-8', pretty_print=True)
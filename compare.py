@@ -0,0 +1,135 @@
+"""
+Comparaison détaillée de deux environnements d'une configuration
+
+Chaque environnement du modèle compact (model.py) est indexé en une
+seule passe (services par nom), puis tous les champs définis par le
+schéma sont comparés : le coût est linéaire en nombre de services et
+aucune requête XPath n'est construite à partir des noms (pas de problème
+de guillemets).
+"""
+
+from model import Config, build_config
+
+
+def _ports(service):
+    return [
+        f"{port.host or ''}:{port.container or ''}/{'tcp' if port.protocol is None else port.protocol}"
+        for port in service.ports
+    ]
+
+
+def _service_ports(kubernetes):
+    return [
+        f"{port.port or ''}:{port.target_port or ''}/{'TCP' if port.protocol is None else port.protocol}"
+        for port in kubernetes.service_ports
+    ]
+
+
+def _volumes(service):
+    return [
+        f"{volume.host_path or ''}:{volume.container_path or ''}:{'rw' if volume.mode is None else volume.mode}"
+        for volume in service.volumes
+    ]
+
+
+def _variables(variables):
+    return {variable.name or '': variable.value or '' for variable in variables}
+
+
+def service_snapshot(service):
+    """Valeurs comparables d'un service, indexées par champ"""
+    fields = {
+        'image': service.image or '',
+        'tag': service.tag,
+        'ports': _ports(service),
+        'volumes': _volumes(service),
+        'depends_on': list(service.depends_on),
+        'command': service.command,
+        'working_dir': service.working_dir,
+        'replicas': service.replicas
+    }
+    for name, value in _variables(service.variables).items():
+        fields[f'environment.{name}'] = value
+    return fields
+
+
+def environment_snapshot(env):
+    """Valeurs comparables propres à l'environnement (hors services)"""
+    fields = {}
+    for name, value in _variables(env.variables).items():
+        fields[f'variables.{name}'] = value
+    for secret in env.secrets:
+        fields[f"secrets.{secret.name or ''}"] = f"{secret.source or ''}:{secret.key or ''}"
+    kubernetes = env.kubernetes
+    if kubernetes is not None:
+        fields['kubernetes.namespace'] = kubernetes.namespace
+        for section in ('requests', 'limits'):
+            resources = getattr(kubernetes, section)
+            for resource in ('cpu', 'memory'):
+                fields[f'kubernetes.resources.{section}.{resource}'] = (
+                    getattr(resources, resource) if resources is not None else None
+                )
+        fields['kubernetes.service.type'] = kubernetes.service_type
+        fields['kubernetes.service.ports'] = _service_ports(kubernetes) or None
+    return {key: value for key, value in fields.items() if value is not None}
+
+
+def index_environments(config):
+    """Indexe les environnements par nom : {nom: (environnement, {service: service})}"""
+    index = {}
+    for env in config.environments:
+        services = {}
+        for service in env.services:
+            services.setdefault(service.name or '', service)
+        index.setdefault(env.name or '', (env, services))
+    return index
+
+
+def _diff(fields1, fields2, service=None):
+    differences = []
+    for field in list(fields1) + [f for f in fields2 if f not in fields1]:
+        value1 = fields1.get(field)
+        value2 = fields2.get(field)
+        if value1 != value2:
+            difference = {'field': field, 'env1_value': value1, 'env2_value': value2}
+            if service is not None:
+                difference = {'service': service, **difference}
+            differences.append(difference)
+    return differences
+
+
+def diff_environments(config, env1, env2):
+    """Compare deux environnements ; retourne la structure 'comparison' de /api/compare
+
+    config est un modèle (model.Config) ou un arbre lxml.
+    """
+    if not isinstance(config, Config):
+        config = build_config(config)
+    index = index_environments(config)
+    env1_element, env1_services = index.get(env1, (None, {}))
+    env2_element, env2_services = index.get(env2, (None, {}))
+
+    only_in_env1 = [name for name in env1_services if name not in env2_services]
+    only_in_env2 = [name for name in env2_services if name not in env1_services]
+    common = [name for name in env1_services if name in env2_services]
+
+    differences = []
+    for name in common:
+        differences.extend(_diff(
+            service_snapshot(env1_services[name]),
+            service_snapshot(env2_services[name]),
+            service=name
+        ))
+
+    environment_differences = _diff(
+        environment_snapshot(env1_element) if env1_element is not None else {},
+        environment_snapshot(env2_element) if env2_element is not None else {}
+    )
+
+    return {
+        'only_in_env1': only_in_env1,
+        'only_in_env2': only_in_env2,
+        'common': common,
+        'differences': differences,
+        'environment_differences': environment_differences
+    }
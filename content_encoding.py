@@ -0,0 +1,50 @@
+"""
+Compression des réponses négociée par Accept-Encoding
+
+gzip est toujours disponible ; zstd l'est si le module zstandard est
+installé. À qualité égale côté client, zstd est préféré : pour un taux
+comparable sur du YAML ou du JSON, il compresse nettement plus vite.
+
+La sortie est déterministe (pas d'horodatage dans l'en-tête gzip) : les
+octets compressés peuvent être mis en cache sous l'ETag de la réponse.
+"""
+
+import gzip
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Codages proposés, par ordre de préférence à qualité égale
+ENCODINGS = ('zstd', 'gzip') if zstandard is not None else ('gzip',)
+
+# Réponses textuelles : les artefacts générés sont très répétitifs
+COMPRESSIBLE_MIMETYPES = frozenset((
+    'application/json',
+    'application/x-ndjson',
+    'application/xml',
+    'application/x-yaml',
+    'text/plain',
+    'text/yaml',
+    'text/xml'
+))
+
+
+def negotiate(accept_encodings, encodings=ENCODINGS):
+    """Codage retenu d'après Accept-Encoding (werkzeug Accept), None pour identity"""
+    best, best_quality = None, 0
+    for encoding in encodings:
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding, level=None):
+    """Compresse des bytes ; level None : niveau par défaut du codage"""
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=6 if level is None else level, mtime=0)
+    if encoding == 'zstd' and zstandard is not None:
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress(data)
+    raise ValueError(f'Codage non supporté: {encoding}')
@@ -0,0 +1,172 @@
+"""
+Rendu incrémental par fragments (kubernetes, docker-compose)
+
+Le document d'un environnement est découpé en fragments : blocs propres
+à l'environnement (ConfigMap, Secret, en-tête) puis un fragment par
+service et par mode de template. Chaque fragment est mis en cache sous
+l'empreinte de son sous-arbre, du contexte d'environnement dont il
+dépend et de la version de la feuille XSLT. Seuls les fragments absents
+du cache sont rendus, en un seul appel XSLT, puis le document est
+réassemblé dans l'ordre de la feuille d'origine.
+
+La feuille de rendu par fragments est dérivée de la feuille de la cible :
+ses templates sont réutilisés tels quels, seul le template racine est
+remplacé, ce qui garantit une sortie identique octet pour octet.
+"""
+
+import copy
+import hashlib
+import threading
+import uuid
+
+from lxml import etree
+
+from cache import content_key
+
+XSL = '{http://www.w3.org/1999/XSL/Transform}'
+
+# Découpage de chaque cible : modes des blocs d'environnement, puis modes
+# appliqués à chaque service ('' = mode par défaut). L'ordre est celui de
+# la sortie de la feuille d'origine.
+FRAGMENT_LAYOUTS = {
+    'kubernetes': {'environment': ('configmap', 'secret'), 'service': ('deployment', 'service')},
+    'docker-compose': {'environment': ('header',), 'service': ('',)}
+}
+
+# Éléments de l'environnement dont dépendent tous les fragments
+CONTEXT_ELEMENTS = ('name', 'variables', 'secrets', 'kubernetes')
+
+_TEMPLATE_PARAMS = ('app-name', 'env-name', 'namespace')
+
+
+def _apply(parent, mode):
+    apply = etree.SubElement(parent, f'{XSL}apply-templates', select='.')
+    if mode:
+        apply.set('mode', mode)
+    for name in _TEMPLATE_PARAMS:
+        etree.SubElement(apply, f'{XSL}with-param', name=name, select=f'${name}')
+
+
+def _emit_marker(parent, label_expression):
+    etree.SubElement(parent, f'{XSL}value-of', select=f'concat($marker, {label_expression}, $marker)')
+
+
+def fragment_stylesheet(xslt_path, layout):
+    """Dérive la feuille de rendu par fragments d'une feuille de cible
+
+    Paramètres ajoutés : parts (' configmap deployment:3 ... ', fragments
+    à rendre) et marker (séparateur inséré avant chaque fragment).
+    """
+    document = copy.deepcopy(etree.parse(xslt_path))
+    root = document.getroot()
+    for template in root.findall(f'{XSL}template[@match="/"]'):
+        root.remove(template)
+    for name in ('parts', 'marker'):
+        etree.SubElement(root, f'{XSL}param', name=name, select="''")
+
+    template = etree.SubElement(root, f'{XSL}template', match='/')
+    for_env = etree.SubElement(
+        template, f'{XSL}for-each', select='devops-config/environments/environment[name=$environment]'
+    )
+    etree.SubElement(for_env, f'{XSL}variable', name='app-name', select='../../application/name')
+    etree.SubElement(for_env, f'{XSL}variable', name='env-name', select='name')
+    etree.SubElement(for_env, f'{XSL}variable', name='namespace', select='kubernetes/namespace')
+
+    for mode in layout['environment']:
+        block = etree.SubElement(for_env, f'{XSL}if', test=f"contains($parts, ' {mode} ')")
+        _emit_marker(block, f"'{mode}'")
+        _apply(block, mode)
+
+    for mode in layout['service']:
+        for_service = etree.SubElement(for_env, f'{XSL}for-each', select='services/service')
+        label = f"concat('{mode}:', position())"
+        block = etree.SubElement(
+            for_service, f'{XSL}if', test=f"contains($parts, concat(' ', {label}, ' '))"
+        )
+        _emit_marker(block, label)
+        _apply(block, mode)
+    return document
+
+
+def _digest(*elements):
+    hasher = hashlib.sha256()
+    for element in elements:
+        if element is None:
+            hasher.update(b'\0')
+        else:
+            hasher.update(etree.tostring(element, with_tail=False))
+    return hasher.hexdigest()
+
+
+class FragmentRenderer:
+    """Rend kubernetes et docker-compose en réutilisant les fragments en cache"""
+
+    def __init__(self, registry, cache, targets, layouts=None):
+        self.registry = registry
+        self.cache = cache
+        self.targets = targets
+        self.layouts = layouts or FRAGMENT_LAYOUTS
+        self._local = threading.local()
+
+    def supports(self, target):
+        return target in self.layouts
+
+    def _stylesheet(self, target, version):
+        # Une feuille dérivée par thread : une instance XSLT ne sert qu'un appel à la fois
+        cache = getattr(self._local, 'stylesheets', None)
+        if cache is None:
+            cache = self._local.stylesheets = {}
+        entry = cache.get(target)
+        if entry is None or entry[0] != version:
+            document = fragment_stylesheet(self.targets[target], self.layouts[target])
+            entry = cache[target] = (version, etree.XSLT(document))
+        return entry[1]
+
+    def render(self, xml_doc, target, environment='dev'):
+        """Retourne (contenu, statistiques) ; None si l'environnement est ambigu"""
+        root = xml_doc.getroot() if hasattr(xml_doc, 'getroot') else xml_doc
+        matches = [env for env in root.iterfind('environments/environment') if env.findtext('name') == environment]
+        if len(matches) != 1:
+            # Absent ou dupliqué : la feuille d'origine gère ces cas
+            return None
+        env = matches[0]
+        layout = self.layouts[target]
+        version = self.registry.version(target)
+
+        application = root.find('application/name')
+        context = _digest(application, *(env.find(tag) for tag in CONTEXT_ELEMENTS))
+        parts = [(mode, mode, context) for mode in layout['environment']]
+        services = env.findall('services/service')
+        service_digests = [_digest(service) for service in services]
+        for mode in layout['service']:
+            for position, digest in enumerate(service_digests, 1):
+                parts.append((f'{mode}:{position}', mode, context + digest))
+
+        fragments = {}
+        missing = []
+        for label, mode, digest in parts:
+            key = content_key(target, version, mode, digest)
+            body = self.cache.get(key)
+            if body is None:
+                missing.append((label, key))
+            else:
+                fragments[label] = body
+
+        if missing:
+            marker = f'@@fragment-{uuid.uuid4().hex}@@'
+            stylesheet = self._stylesheet(target, version)
+            result = stylesheet(
+                xml_doc,
+                environment=etree.XSLT.strparam(environment),
+                parts=etree.XSLT.strparam(' ' + ' '.join(label for label, _ in missing) + ' '),
+                marker=etree.XSLT.strparam(marker)
+            )
+            pieces = str(result).split(marker)
+            rendered = dict(zip(pieces[1::2], pieces[2::2]))
+            for label, key in missing:
+                body = rendered.get(label, '').encode('utf-8')
+                self.cache.put(key, body)
+                fragments[label] = body
+
+        content = b''.join(fragments[label] for label, _, _ in parts).decode('utf-8')
+        return content, {'fragments': len(parts), 'rendered': len(missing)}
@@ -0,0 +1,210 @@
+"""
+Configurations réparties sur plusieurs fichiers (XInclude)
+
+Un élément <xi:include href="..."/> (espace de noms XInclude) est
+remplacé par l'élément racine du fichier désigné. Le chemin est résolu
+relativement au fichier qui contient l'inclusion (à la racine configurée
+pour le document principal) et doit rester sous cette racine : ni URL,
+ni sortie par '..' ou par lien symbolique.
+
+Chaque fichier inclus est parsé une seule fois puis gardé en cache sous
+son chemin, invalidé par mtime et taille : après la modification d'un
+fichier, seul celui-ci est reparsé. Les inclusions sont résolues dans
+une copie de l'arbre en cache, qui n'est jamais modifié.
+
+Seules les inclusions XML sans xpointer sont prises en charge ;
+xi:fallback est utilisé si le fichier est absent.
+"""
+
+import copy
+import os
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from lxml import etree
+
+from cache import content_key
+
+XINCLUDE_NS = 'http://www.w3.org/2001/XInclude'
+INCLUDE = f'{{{XINCLUDE_NS}}}include'
+FALLBACK = f'{{{XINCLUDE_NS}}}fallback'
+
+
+class IncludeError(ValueError):
+    """Inclusion impossible : chemin hors de la racine, fichier absent, cycle..."""
+
+
+def uses_includes(xml_content):
+    """Test rapide sur le texte (str ou bytes) : l'espace de noms XInclude est-il déclaré ?"""
+    if isinstance(xml_content, str):
+        return XINCLUDE_NS in xml_content
+    return XINCLUDE_NS.encode('ascii') in xml_content
+
+
+def _includes(element):
+    """Inclusions de premier niveau sous element (pas celles d'un xi:fallback imbriqué)"""
+    found = []
+    for include in element.iter(INCLUDE):
+        parent = include.getparent()
+        while parent is not None and parent is not element and parent.tag != INCLUDE:
+            parent = parent.getparent()
+        if parent is None or parent is element:
+            found.append(include)
+    return found
+
+
+def _check(include):
+    if include.get('parse', 'xml') != 'xml' or include.get('xpointer') is not None:
+        raise IncludeError('Seules les inclusions XML sans xpointer sont prises en charge')
+
+
+class IncludeResolver:
+    """Résout les inclusions ; cache LRU des fichiers parsés, invalidé par mtime et taille"""
+
+    def __init__(self, max_entries=256, huge_tree=False):
+        self.max_entries = max_entries
+        self.huge_tree = huge_tree
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.parses = 0
+
+    def _path(self, href, base_dir, root):
+        """Chemin réel d'un href, qui doit rester sous root"""
+        if not href:
+            raise IncludeError('Inclusion sans attribut href')
+        url = urlparse(href)
+        if url.scheme == 'file' and not url.netloc:
+            href = url.path
+        elif url.scheme and len(url.scheme) > 1:
+            raise IncludeError(f'Inclusion distante refusée: {href}')
+        path = os.path.realpath(os.path.join(base_dir, href))
+        if os.path.commonpath([path, root]) != root:
+            raise IncludeError(f'Inclusion hors de la racine {root}: {href}')
+        return path
+
+    def _load(self, path):
+        """Élément racine du fichier, parsé une seule fois tant que mtime et taille ne changent pas"""
+        st = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+        parser = etree.XMLParser(huge_tree=self.huge_tree)
+        try:
+            element = etree.parse(path, parser).getroot()
+        except etree.XMLSyntaxError as e:
+            raise IncludeError(f'Erreur de syntaxe XML dans {path}: {e}')
+        # Drapeau : le fichier contient-il lui-même des inclusions ?
+        entry = (st.st_mtime_ns, st.st_size, element, next(element.iter(INCLUDE), None) is not None)
+        with self._lock:
+            self.parses += 1
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def resolve(self, xml_doc, root, base_dir=None):
+        """Remplace en place les inclusions de l'arbre ; retourne les chemins des fichiers inclus"""
+        root = os.path.realpath(root)
+        element = xml_doc.getroot() if hasattr(xml_doc, 'getroot') else xml_doc
+        if element.tag == INCLUDE:
+            raise IncludeError("L'élément racine ne peut pas être une inclusion")
+        files = []
+        self._expand(element, base_dir or root, root, (), files)
+        return files
+
+    def _expand(self, element, base_dir, root, stack, files):
+        for include in _includes(element):
+            _check(include)
+            path = self._path(include.get('href'), base_dir, root)
+            if path in stack:
+                raise IncludeError(f"Inclusion circulaire: {include.get('href')}")
+            try:
+                _, _, source, nested = self._load(path)
+            except FileNotFoundError:
+                self._fallback(include, base_dir, root, stack, files)
+                continue
+            except OSError as e:
+                raise IncludeError(f"Fichier inclus illisible: {include.get('href')}: {e.strerror}")
+            files.append(path)
+            with self._lock:
+                included = copy.deepcopy(source)
+            if included.tag == INCLUDE:
+                raise IncludeError(f"L'élément racine de {path} ne peut pas être une inclusion")
+            if nested:
+                self._expand(included, os.path.dirname(path), root, stack + (path,), files)
+            included.tail = include.tail
+            include.getparent().replace(include, included)
+
+    def _fallback(self, include, base_dir, root, stack, files):
+        """Remplace une inclusion de fichier absent par le contenu de son xi:fallback"""
+        fallback = include.find(FALLBACK)
+        if fallback is None:
+            raise IncludeError(f"Fichier inclus introuvable: {include.get('href')}")
+        self._expand(fallback, base_dir, root, stack, files)
+        replacement = [child for child in fallback if isinstance(child.tag, str)]
+        parent = include.getparent()
+        index = parent.index(include)
+        tail = include.tail
+        parent.remove(include)
+        for offset, element in enumerate(replacement):
+            parent.insert(index + offset, element)
+        if replacement:
+            replacement[-1].tail = tail
+        elif tail:
+            previous = parent[index - 1] if index else None
+            if previous is None:
+                parent.text = (parent.text or '') + tail
+            else:
+                previous.tail = (previous.tail or '') + tail
+
+    def fingerprint(self, xml_doc, root, base_dir=None):
+        """Empreinte (chemin, mtime, taille) des fichiers inclus, pour les clés de cache
+
+        Ne lève pas d'exception : une inclusion impossible entre dans
+        l'empreinte et sera signalée lors de la résolution.
+        """
+        root = os.path.realpath(root)
+        element = xml_doc.getroot() if hasattr(xml_doc, 'getroot') else xml_doc
+        parts = []
+        self._dependencies(element, base_dir or root, root, (), parts)
+        return content_key(*parts)
+
+    def _dependencies(self, element, base_dir, root, stack, parts):
+        for include in _includes(element):
+            try:
+                _check(include)
+                path = self._path(include.get('href'), base_dir, root)
+                if path in stack:
+                    raise IncludeError(f"Inclusion circulaire: {include.get('href')}")
+                mtime, size, source, nested = self._load(path)
+            except FileNotFoundError:
+                parts.append(f"absent:{include.get('href')}")
+                fallback = include.find(FALLBACK)
+                if fallback is not None:
+                    self._dependencies(fallback, base_dir, root, stack, parts)
+                continue
+            except (IncludeError, OSError) as e:
+                parts.append(f'erreur:{e}')
+                continue
+            parts.append(f'{path}:{mtime}:{size}')
+            if nested:
+                self._dependencies(source, os.path.dirname(path), root, stack + (path,), parts)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'parses': self.parses
+            }
@@ -0,0 +1,129 @@
+"""
+Export JSON natif : arbre XML → dict Python en une seule passe
+
+Produit la même structure que xslt/json.xslt, sans passer par du texte
+JSON intermédiaire. Les types numériques sont déduits du schéma XSD.
+"""
+
+from lxml import etree
+
+XS_NS = 'http://www.w3.org/2001/XMLSchema'
+
+# Types XSD convertis en entiers dans le JSON
+INTEGER_TYPES = {
+    'xs:integer', 'xs:int', 'xs:long', 'xs:short',
+    'xs:positiveInteger', 'xs:nonNegativeInteger', 'xs:negativeInteger', 'xs:nonPositiveInteger'
+}
+
+
+def load_integer_fields(xsd_path):
+    """Retourne {type complexe: {éléments entiers}} d'après le schéma XSD"""
+    xsd_doc = etree.parse(xsd_path)
+    fields = {}
+    for complex_type in xsd_doc.iterfind(f'{{{XS_NS}}}complexType'):
+        names = {
+            element.get('name')
+            for element in complex_type.iter(f'{{{XS_NS}}}element')
+            if element.get('type') in INTEGER_TYPES
+        }
+        if names:
+            fields[complex_type.get('name')] = names
+    return fields
+
+
+def _text(element, tag):
+    child = element.find(tag)
+    return None if child is None else (child.text or '')
+
+
+class JsonExporter:
+    """Convertit un document devops-config en dict pour un environnement"""
+
+    def __init__(self, xsd_path):
+        self.integer_fields = load_integer_fields(xsd_path)
+
+    def _value(self, type_name, tag, text):
+        if tag in self.integer_fields.get(type_name, ()):
+            try:
+                return int(text)
+            except ValueError:
+                return text
+        return text
+
+    def export(self, xml_doc, environment='dev'):
+        """Construit la structure JSON de l'environnement demandé"""
+        root = xml_doc.getroot() if hasattr(xml_doc, 'getroot') else xml_doc
+        application = root.find('application')
+        app_data = {}
+        if application is not None:
+            app_data['name'] = _text(application, 'name') or ''
+            app_data['version'] = _text(application, 'version') or ''
+            description = _text(application, 'description')
+            if description is not None:
+                app_data['description'] = description
+
+        data = {
+            'application': app_data,
+            'environment': environment,
+            'services': [],
+            'variables': [],
+            'secrets': []
+        }
+
+        for env in root.iterfind('environments/environment'):
+            if _text(env, 'name') != environment:
+                continue
+            for service in env.iterfind('services/service'):
+                data['services'].append(self._service(service))
+            for variable in env.iterfind('variables/variable'):
+                data['variables'].append({
+                    'name': _text(variable, 'name') or '',
+                    'value': _text(variable, 'value') or ''
+                })
+            for secret in env.iterfind('secrets/secret'):
+                secret_data = {
+                    'name': _text(secret, 'name') or '',
+                    'source': _text(secret, 'source') or ''
+                }
+                key = _text(secret, 'key')
+                if key is not None:
+                    secret_data['key'] = key
+                data['secrets'].append(secret_data)
+        return data
+
+    def _service(self, service):
+        result = {}
+        ports = []
+        variables = {}
+        for child in service:
+            tag = child.tag
+            if not isinstance(tag, str):
+                continue
+            if tag == 'ports':
+                for port in child.iterfind('port'):
+                    port_data = {
+                        'host': self._value('portType', 'host', _text(port, 'host')),
+                        'container': self._value('portType', 'container', _text(port, 'container'))
+                    }
+                    protocol = _text(port, 'protocol')
+                    if protocol is not None:
+                        port_data['protocol'] = protocol
+                    ports.append(port_data)
+            elif tag == 'environment':
+                for variable in child.iterfind('variable'):
+                    variables[_text(variable, 'name') or ''] = _text(variable, 'value') or ''
+            elif tag in ('name', 'image', 'tag', 'command', 'working_dir', 'replicas'):
+                result[tag] = self._value('serviceType', tag, child.text or '')
+
+        # Même ordre de clés que xslt/json.xslt
+        ordered = {'name': result.get('name', ''), 'image': result.get('image', '')}
+        if 'tag' in result:
+            ordered['tag'] = result['tag']
+        if ports:
+            ordered['ports'] = ports
+        if variables:
+            ordered['environment'] = variables
+        for key in ('command', 'working_dir', 'replicas'):
+            if key in result:
+                ordered[key] = result[key]
+        return ordered
@@ -0,0 +1,228 @@
+"""
+Métriques au format texte Prometheus
+
+Chaque thread écrit dans son propre fragment (compteurs et histogrammes) :
+l'enregistrement ne prend aucun verrou. Les fragments sont agrégés au
+moment de la lecture ; ceux des threads terminés sont fusionnés dans un
+total commun pour que leur nombre reste borné.
+"""
+
+import threading
+import time
+
+# Bornes des histogrammes de durée (secondes) et de taille (octets)
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+# Nombre de fragments au-delà duquel ceux des threads terminés sont fusionnés
+MAX_LIVE_SHARDS = 64
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=None):
+    pairs = list(key)
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    body = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + body + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Shard:
+    """Fragment de métriques propre à un thread"""
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+
+    def merge_into(self, other):
+        for key, value in list(self.counters.items()):
+            other.counters[key] = other.counters.get(key, 0) + value
+        for key, values in list(self.histograms.items()):
+            target = other.histograms.get(key)
+            if target is None:
+                other.histograms[key] = list(values)
+            else:
+                for i, value in enumerate(values):
+                    target[i] += value
+
+
+class _StageTimer:
+    """Chronomètre une étape et l'enregistre à la sortie du bloc with"""
+
+    __slots__ = ('_metrics', '_labels', '_start')
+
+    def __init__(self, metrics, labels):
+        self._metrics = metrics
+        self._labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrics.observe('stage_duration_seconds', time.perf_counter() - self._start, **self._labels)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """Compteurs, histogrammes et jauges exportés au format Prometheus"""
+
+    def __init__(self, namespace='devops', enabled=True):
+        self.namespace = namespace
+        self.enabled = enabled
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        self._retired = _Shard()
+        self._descriptions = {}
+        self._buckets = {}
+        self._collectors = []
+
+    def describe(self, name, description, buckets=None):
+        """Déclare le texte d'aide et, pour un histogramme, ses bornes"""
+        self._descriptions[name] = description
+        if buckets is not None:
+            self._buckets[name] = tuple(buckets)
+
+    def add_collector(self, collector):
+        """Ajoute une source de jauges lue à chaque export
+
+        collector() retourne des tuples (nom, description, [(labels, valeur)]).
+        """
+        self._collectors.append(collector)
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = _Shard()
+            self._local.shard = shard
+            with self._lock:
+                if len(self._shards) >= MAX_LIVE_SHARDS:
+                    self._retire_dead_shards()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _retire_dead_shards(self):
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                shard.merge_into(self._retired)
+        self._shards = live
+
+    def inc(self, name, value=1, **labels):
+        """Incrémente un compteur"""
+        if not self.enabled:
+            return
+        counters = self._shard().counters
+        key = (name, _labels_key(labels))
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """Ajoute une observation à un histogramme"""
+        if not self.enabled:
+            return
+        buckets = self._buckets.get(name, DURATION_BUCKETS)
+        histograms = self._shard().histograms
+        key = (name, _labels_key(labels))
+        values = histograms.get(key)
+        if values is None:
+            # Un compteur par borne, puis la somme et le nombre d'observations
+            values = histograms[key] = [0] * (len(buckets) + 2)
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                values[i] += 1
+                break
+        values[-2] += value
+        values[-1] += 1
+
+    def stage(self, stage, **labels):
+        """Chronomètre d'étape : with metrics.stage('xml_parse', endpoint=...)"""
+        if not self.enabled:
+            return _NULL_TIMER
+        labels['stage'] = stage
+        return _StageTimer(self, labels)
+
+    def snapshot(self):
+        """Agrège les fragments de tous les threads"""
+        total = _Shard()
+        with self._lock:
+            self._retire_dead_shards()
+            self._retired.merge_into(total)
+            shards = [shard for _, shard in self._shards]
+        for shard in shards:
+            shard.merge_into(total)
+        return total
+
+    def render(self):
+        """Exporte toutes les métriques au format texte Prometheus 0.0.4"""
+        total = self.snapshot()
+        lines = []
+        by_name = {}
+        for (name, key), value in total.counters.items():
+            by_name.setdefault(name, []).append((key, value))
+        for name in sorted(by_name):
+            full = f'{self.namespace}_{name}'
+            description = self._descriptions.get(name, name)
+            lines.append(f'# HELP {full} {description}')
+            lines.append(f'# TYPE {full} counter')
+            for key, value in sorted(by_name[name]):
+                lines.append(f'{full}{_format_labels(key)} {_format_value(value)}')
+
+        by_name = {}
+        for (name, key), values in total.histograms.items():
+            by_name.setdefault(name, []).append((key, values))
+        for name in sorted(by_name):
+            full = f'{self.namespace}_{name}'
+            buckets = self._buckets.get(name, DURATION_BUCKETS)
+            description = self._descriptions.get(name, name)
+            lines.append(f'# HELP {full} {description}')
+            lines.append(f'# TYPE {full} histogram')
+            for key, values in sorted(by_name[name]):
+                cumulative = 0
+                for bound, count in zip(buckets, values):
+                    cumulative += count
+                    lines.append(f'{full}_bucket{_format_labels(key, ("le", _format_value(float(bound))))} {cumulative}')
+                lines.append(f'{full}_bucket{_format_labels(key, ("le", "+Inf"))} {values[-1]}')
+                lines.append(f'{full}_sum{_format_labels(key)} {_format_value(values[-2])}')
+                lines.append(f'{full}_count{_format_labels(key)} {values[-1]}')
+
+        for collector in self._collectors:
+            for name, description, samples in collector():
+                full = f'{self.namespace}_{name}'
+                lines.append(f'# HELP {full} {description}')
+                lines.append(f'# TYPE {full} gauge')
+                for labels, value in samples:
+                    lines.append(f'{full}{_format_labels(_labels_key(labels))} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
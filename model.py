@@ -0,0 +1,264 @@
+"""
+Modèle compact d'une configuration devops-config
+
+Classes à __slots__ construites en un seul parcours de l'arbre lxml, qui
+peut ensuite être libéré : seules les chaînes utiles sont conservées.
+Utilisé par l'export, la comparaison et la liste des environnements ;
+partagé entre requêtes par le cache de modèles, il n'est jamais modifié
+après construction.
+
+Convention des valeurs : texte de l'élément ('' s'il est vide), None si
+l'élément est absent — comme findtext() sans valeur par défaut. Les
+listes sont des tuples, vides par défaut.
+"""
+
+import sys
+
+
+def _text(element):
+    # Noms, protocoles, modes, images... se répètent d'un service à l'autre
+    return sys.intern(element.text or '')
+
+
+class Port:
+    __slots__ = ('host', 'container', 'protocol')
+
+    def __init__(self, host=None, container=None, protocol=None):
+        self.host = host
+        self.container = container
+        self.protocol = protocol
+
+
+class Volume:
+    __slots__ = ('host_path', 'container_path', 'mode')
+
+    def __init__(self, host_path=None, container_path=None, mode=None):
+        self.host_path = host_path
+        self.container_path = container_path
+        self.mode = mode
+
+
+class Variable:
+    __slots__ = ('name', 'value')
+
+    def __init__(self, name=None, value=None):
+        self.name = name
+        self.value = value
+
+
+class Secret:
+    __slots__ = ('name', 'source', 'key')
+
+    def __init__(self, name=None, source=None, key=None):
+        self.name = name
+        self.source = source
+        self.key = key
+
+
+class Resources:
+    """Bloc requests ou limits des ressources Kubernetes"""
+    __slots__ = ('cpu', 'memory')
+
+    def __init__(self, cpu=None, memory=None):
+        self.cpu = cpu
+        self.memory = memory
+
+
+class ServicePort:
+    """Port du service Kubernetes d'un environnement"""
+    __slots__ = ('port', 'target_port', 'protocol')
+
+    def __init__(self, port=None, target_port=None, protocol=None):
+        self.port = port
+        self.target_port = target_port
+        self.protocol = protocol
+
+
+class Kubernetes:
+    __slots__ = ('namespace', 'requests', 'limits', 'service_type', 'service_ports')
+
+    def __init__(self, namespace=None, requests=None, limits=None, service_type=None, service_ports=()):
+        self.namespace = namespace
+        self.requests = requests
+        self.limits = limits
+        self.service_type = service_type
+        self.service_ports = service_ports
+
+
+class Service:
+    __slots__ = (
+        'name', 'image', 'tag', 'ports', 'volumes', 'variables',
+        'depends_on', 'command', 'working_dir', 'replicas'
+    )
+
+    def __init__(self, name=None, image=None, tag=None, ports=(), volumes=(), variables=(),
+                 depends_on=(), command=None, working_dir=None, replicas=None):
+        self.name = name
+        self.image = image
+        self.tag = tag
+        self.ports = ports
+        self.volumes = volumes
+        self.variables = variables
+        self.depends_on = depends_on
+        self.command = command
+        self.working_dir = working_dir
+        self.replicas = replicas
+
+
+class Environment:
+    __slots__ = ('name', 'services', 'variables', 'secrets', 'kubernetes')
+
+    def __init__(self):
+        self.name = None
+        self.services = ()
+        self.variables = ()
+        self.secrets = ()
+        self.kubernetes = None
+
+
+class Application:
+    __slots__ = ('name', 'version', 'description')
+
+    def __init__(self, name=None, version=None, description=None):
+        self.name = name
+        self.version = version
+        self.description = description
+
+
+class Config:
+    __slots__ = ('application', 'environments')
+
+    def __init__(self, application=None, environments=()):
+        self.application = application
+        self.environments = environments
+
+    def environment(self, name):
+        """Premier environnement portant ce nom, ou None"""
+        for env in self.environments:
+            if (env.name or '') == name:
+                return env
+        return None
+
+
+def _values(element):
+    """{nom: texte} du premier enfant de chaque nom"""
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag not in values:
+            values[tag] = _text(child)
+    return values
+
+
+def _port(element):
+    values = _values(element)
+    return Port(values.get('host'), values.get('container'), values.get('protocol'))
+
+
+def _volume(element):
+    values = _values(element)
+    return Volume(values.get('host_path'), values.get('container_path'), values.get('mode'))
+
+
+def _variable(element):
+    values = _values(element)
+    return Variable(values.get('name'), values.get('value'))
+
+
+def _secret(element):
+    values = _values(element)
+    return Secret(values.get('name'), values.get('source'), values.get('key'))
+
+
+def _service_port(element):
+    values = _values(element)
+    return ServicePort(values.get('port'), values.get('target_port'), values.get('protocol'))
+
+
+def _items(container, tag, build):
+    return tuple([build(item) for item in container if item.tag == tag])
+
+
+def _service(element):
+    values = {}
+    ports = volumes = variables = depends_on = ()
+    for child in element:
+        tag = child.tag
+        if tag == 'ports':
+            ports += _items(child, 'port', _port)
+        elif tag == 'volumes':
+            volumes += _items(child, 'volume', _volume)
+        elif tag == 'environment':
+            variables += _items(child, 'variable', _variable)
+        elif tag == 'depends_on':
+            depends_on += _items(child, 'service', _text)
+        elif tag not in values:
+            values[tag] = _text(child)
+    get = values.get
+    return Service(
+        get('name'), get('image'), get('tag'), ports, volumes, variables,
+        depends_on, get('command'), get('working_dir'), get('replicas')
+    )
+
+
+def _resources(kubernetes, section):
+    resources = getattr(kubernetes, section.tag)
+    if resources is None:
+        resources = Resources()
+        setattr(kubernetes, section.tag, resources)
+    for value in section:
+        if value.tag in ('cpu', 'memory') and getattr(resources, value.tag) is None:
+            setattr(resources, value.tag, _text(value))
+
+
+def _kubernetes(element):
+    # Sous-éléments répétés : première valeur de chaque champ dans l'ordre du document
+    kubernetes = Kubernetes()
+    for child in element:
+        tag = child.tag
+        if tag == 'namespace' and kubernetes.namespace is None:
+            kubernetes.namespace = _text(child)
+        elif tag == 'resources':
+            for section in child:
+                if section.tag in ('requests', 'limits'):
+                    _resources(kubernetes, section)
+        elif tag == 'service':
+            for field in child:
+                if field.tag == 'type' and kubernetes.service_type is None:
+                    kubernetes.service_type = _text(field)
+                elif field.tag == 'ports' and not kubernetes.service_ports:
+                    kubernetes.service_ports = _items(field, 'port', _service_port)
+    return kubernetes
+
+
+def _environment(element):
+    env = Environment()
+    for child in element:
+        tag = child.tag
+        if tag == 'name':
+            if env.name is None:
+                env.name = _text(child)
+        elif tag == 'services':
+            env.services += _items(child, 'service', _service)
+        elif tag == 'variables':
+            env.variables += _items(child, 'variable', _variable)
+        elif tag == 'secrets':
+            env.secrets += _items(child, 'secret', _secret)
+        elif tag == 'kubernetes' and env.kubernetes is None:
+            env.kubernetes = _kubernetes(child)
+    return env
+
+
+def build_config(xml_doc):
+    """Construit le modèle d'un document devops-config en un seul parcours"""
+    root = xml_doc.getroot() if hasattr(xml_doc, 'getroot') else xml_doc
+    config = Config()
+    if root.tag != 'devops-config':
+        return config
+    for child in root:
+        if child.tag == 'application' and config.application is None:
+            values = _values(child)
+            config.application = Application(values.get('name'), values.get('version'), values.get('description'))
+        elif child.tag == 'environments':
+            config.environments += _items(child, 'environment', _environment)
+    return config
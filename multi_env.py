@@ -0,0 +1,99 @@
+"""
+Rendu de plusieurs environnements en une seule transformation XSLT
+
+Les feuilles kubernetes, docker-compose et helm ne rendent qu'un
+environnement ($environment) : produire tous les environnements oblige à
+les appliquer N fois au même arbre. La feuille multi-environnements est
+dérivée de celle de la cible, comme pour le rendu par fragments : seul
+le template racine est remplacé par une boucle sur les noms demandés, et
+un marqueur est émis avant la sortie de chaque environnement. La sortie
+de chaque environnement est donc identique octet pour octet à celle d'un
+appel séparé.
+"""
+
+import copy
+import threading
+import uuid
+
+from lxml import etree
+
+from fragments import XSL
+
+MULTI_ENV_TARGETS = ('kubernetes', 'docker-compose', 'helm')
+
+
+def multi_environment_stylesheet(xslt_path):
+    """Dérive la feuille multi-environnements d'une feuille de cible
+
+    Paramètres ajoutés : marker (séparateur) et environments (noms
+    demandés, chacun entouré du marqueur ; '' pour tous).
+    """
+    document = copy.deepcopy(etree.parse(xslt_path))
+    root = document.getroot()
+    for template in root.findall(f'{XSL}template[@match="/"]'):
+        root.remove(template)
+    for name in ('environments', 'marker'):
+        etree.SubElement(root, f'{XSL}param', name=name, select="''")
+
+    # Un environnement est rendu pour chacun de ses noms demandés, comme
+    # le ferait le prédicat name=$environment d'un appel séparé
+    template = etree.SubElement(root, f'{XSL}template', match='/')
+    for_env = etree.SubElement(template, f'{XSL}for-each', select='devops-config/environments/environment')
+    for_name = etree.SubElement(
+        for_env, f'{XSL}for-each',
+        select="name[not(. = preceding-sibling::name)]"
+               "[$environments = '' or contains($environments, concat($marker, ., $marker))]"
+    )
+    etree.SubElement(for_name, f'{XSL}value-of', select='concat($marker, ., $marker)')
+    etree.SubElement(for_name, f'{XSL}apply-templates', select='..')
+    return document
+
+
+def yaml_stream(outputs):
+    """Flux YAML multi-documents : chaque environnement ouvre un nouveau document"""
+    parts = []
+    for environment, content in outputs.items():
+        if content.startswith('---\n'):
+            content = content[4:]
+        parts.append(f'---\n# environment: {environment}\n{content}')
+    return ''.join(parts)
+
+
+class MultiEnvironmentRenderer:
+    """Rend tous les environnements demandés d'une cible en un seul appel XSLT"""
+
+    def __init__(self, registry, targets):
+        self.registry = registry
+        self.targets = targets
+        self._local = threading.local()
+
+    def supports(self, target):
+        return target in MULTI_ENV_TARGETS and target in self.targets
+
+    def _stylesheet(self, target):
+        # Une feuille dérivée par thread : une instance XSLT ne sert qu'un appel à la fois
+        cache = getattr(self._local, 'stylesheets', None)
+        if cache is None:
+            cache = self._local.stylesheets = {}
+        version = self.registry.version(target)
+        entry = cache.get(target)
+        if entry is None or entry[0] != version:
+            entry = cache[target] = (version, etree.XSLT(multi_environment_stylesheet(self.targets[target])))
+        return entry[1]
+
+    def render(self, xml_doc, target, environments=None):
+        """{environnement: contenu} dans l'ordre demandé (None : tous, dans l'ordre du document)"""
+        marker = f'@@environment-{uuid.uuid4().hex}@@'
+        requested = ''
+        if environments:
+            requested = marker + marker.join(environments) + marker
+        result = self._stylesheet(target)(
+            xml_doc,
+            environments=etree.XSLT.strparam(requested),
+            marker=etree.XSLT.strparam(marker)
+        )
+        pieces = str(result).split(marker)
+        outputs = dict.fromkeys(environments or (), '')
+        for environment, content in zip(pieces[1::2], pieces[2::2]):
+            outputs[environment] = outputs.get(environment, '') + content
+        return outputs
@@ -0,0 +1,271 @@
+"""
+Rendu natif kubernetes et docker-compose
+
+Alternative Python aux feuilles xslt/kubernetes.xslt et
+xslt/docker-compose.xslt : l'arbre est parcouru une seule fois et la
+sortie est écrite dans un unique buffer. Le contexte d'environnement
+(variables, secrets, ressources) est lu une fois au lieu d'être
+recherché par ../../ pour chaque service.
+
+La sortie est identique octet pour octet à celle des feuilles XSLT : les
+règles XPath 1.0 sont reproduites (valeur textuelle du premier nœud,
+test d'existence d'un ensemble de nœuds, comparaison '!=' existentielle).
+"""
+
+_PROTOCOL = str.maketrans('tcp', 'TCP')
+
+
+def _string(element):
+    """Valeur textuelle XPath d'un élément (texte de tous ses descendants)"""
+    if element is None:
+        return ''
+    if not len(element):
+        return element.text or ''
+    return ''.join(element.itertext())
+
+
+def _value(element, path):
+    """Équivalent de xsl:value-of : valeur du premier nœud, '' si absent"""
+    return _string(element.find(path))
+
+
+def _environments(xml_doc, environment):
+    """Environnements sélectionnés par devops-config/environments/environment[name=$environment]"""
+    root = xml_doc.getroot() if hasattr(xml_doc, 'getroot') else xml_doc
+    if root.tag != 'devops-config':
+        return []
+    return [
+        env for env in root.iterfind('environments/environment')
+        if any(_string(name) == environment for name in env.iterfind('name'))
+    ]
+
+
+def _app_name(env):
+    """Équivalent de ../../application/name depuis un environnement"""
+    parent = env.getparent()
+    root = None if parent is None else parent.getparent()
+    return None if root is None else root.find('application/name')
+
+
+def _record(element, repeated=()):
+    """Valeur textuelle du premier enfant de chaque nom, en un seul parcours
+
+    Pour les noms de repeated, toutes les valeurs sont aussi gardées sous
+    'nom*' (comparaisons existentielles XPath).
+    """
+    fields = {}
+    for child in element:
+        tag = child.tag
+        if tag in repeated:
+            fields.setdefault(tag + '*', []).append(_string(child))
+        if tag not in fields:
+            fields[tag] = child.text or '' if not len(child) else ''.join(child.itertext())
+    return fields
+
+
+def _items(groups, group, tag):
+    """Enfants tag des conteneurs group d'un service, dans l'ordre du document"""
+    containers = groups.get(group)
+    if containers is None:
+        return ()
+    return [item for container in containers for item in container if item.tag == tag]
+
+
+def _pairs(items, first, second):
+    pairs = []
+    for item in items:
+        fields = _record(item)
+        pairs.append((fields.get(first, ''), fields.get(second, '')))
+    return pairs
+
+
+# Conteneurs de listes d'un service ; les autres enfants sont des valeurs simples
+_SERVICE_GROUPS = frozenset(('ports', 'volumes', 'environment', 'depends_on'))
+
+
+def _service(service):
+    """(valeurs simples, {conteneur: [éléments]}) d'un service, en un seul parcours"""
+    fields = {}
+    groups = {}
+    for child in service:
+        tag = child.tag
+        if tag in _SERVICE_GROUPS:
+            groups.setdefault(tag, []).append(child)
+        elif tag not in fields:
+            fields[tag] = child.text or '' if not len(child) else ''.join(child.itertext())
+    return fields, groups
+
+
+def render_kubernetes(xml_doc, environment='dev'):
+    """Manifestes Kubernetes d'un environnement (même sortie que kubernetes.xslt)"""
+    out = []
+    write = out.append
+    for env in _environments(xml_doc, environment):
+        _kubernetes_environment(env, write)
+    return ''.join(out)
+
+
+def _kubernetes_environment(env, write):
+    app_name = _string(_app_name(env))
+    env_name = _value(env, 'name')
+    namespace = env.find('kubernetes/namespace')
+    namespace_line = '' if namespace is None else f'  namespace: {_string(namespace)}\n'
+    variables = _pairs(env.iterfind('variables/variable'), 'name', 'value')
+    secrets = _pairs(env.iterfind('secrets/secret'), 'name', 'source')
+    config_name = f'{app_name}-config-{env_name}'
+    secret_name = f'{app_name}-secrets-{env_name}'
+
+    if variables:
+        write(f'---\napiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: {config_name}\n{namespace_line}data:\n')
+        for name, value in variables:
+            write(f'  {name}: "{value}"\n')
+        write('\n')
+    if secrets:
+        write(f'---\napiVersion: v1\nkind: Secret\nmetadata:\n  name: {secret_name}\n{namespace_line}'
+              'type: Opaque\nstringData:\n')
+        for name, source in secrets:
+            write(f'  {name}: "PLACEHOLDER_FROM_{source}"\n')
+        write('\n')
+
+    # Blocs communs à tous les services de l'environnement
+    shared_env = ''.join(
+        f'        - name: {name}\n          valueFrom:\n            configMapKeyRef:\n'
+        f'              name: {config_name}\n              key: {name}\n'
+        for name, _ in variables
+    ) + ''.join(
+        f'        - name: {name}\n          valueFrom:\n            secretKeyRef:\n'
+        f'              name: {secret_name}\n              key: {name}\n'
+        for name, _ in secrets
+    )
+    resources = ''
+    if env.find('kubernetes/resources') is not None:
+        resources = '        resources:\n'
+        for section in ('requests', 'limits'):
+            if env.find(f'kubernetes/resources/{section}') is not None:
+                resources += f'          {section}:\n'
+                for key in ('cpu', 'memory'):
+                    node = env.find(f'kubernetes/resources/{section}/{key}')
+                    if node is not None:
+                        resources += f'            {key}: {_string(node)}\n'
+    service_type = env.find('kubernetes/service/type')
+    service_type = 'ClusterIP' if service_type is None else _string(service_type)
+
+    services = []
+    for service in env.iterfind('services/service'):
+        fields, groups = _service(service)
+        ports = []
+        for port in _items(groups, 'ports', 'port'):
+            port_fields = _record(port)
+            ports.append((
+                port_fields.get('host', ''),
+                port_fields.get('container', ''),
+                port_fields.get('protocol', '').translate(_PROTOCOL)
+            ))
+        services.append((fields, groups, fields.get('name', ''), ports))
+
+    for fields, groups, name, ports in services:
+        image = fields.get('image', '')
+        if 'tag' in fields:
+            image = f"{image}:{fields['tag']}"
+        write(f'---\napiVersion: apps/v1\nkind: Deployment\nmetadata:\n  name: {name}-{env_name}\n{namespace_line}'
+              f'  labels:\n    app: {app_name}\n    environment: {env_name}\n'
+              f"spec:\n  replicas: {fields.get('replicas', '1')}\n"
+              f'  selector:\n    matchLabels:\n      app: {app_name}\n      component: {name}\n'
+              f'  template:\n    metadata:\n      labels:\n        app: {app_name}\n'
+              f'        component: {name}\n        environment: {env_name}\n'
+              f'    spec:\n      containers:\n      - name: {name}\n        image: {image}\n')
+        if ports:
+            write('        ports:\n')
+            for _, container, protocol in ports:
+                write(f'        - containerPort: {container}\n          protocol: {protocol}\n')
+        own = _pairs(_items(groups, 'environment', 'variable'), 'name', 'value')
+        if own or shared_env:
+            write('        env:\n')
+            write(shared_env)
+            for variable, value in own:
+                write(f'        - name: {variable}\n          value: "{value}"\n')
+        write(resources)
+        if 'command' in fields:
+            write('        command:\n')
+            for part in fields['command'].split(' '):
+                write(f'        - {part}\n')
+        if 'working_dir' in fields:
+            write(f"        workingDir: {fields['working_dir']}\n")
+        write('\n')
+
+    for _, _, name, ports in services:
+        if not ports:
+            continue
+        write(f'---\napiVersion: v1\nkind: Service\nmetadata:\n  name: {name}-service-{env_name}\n{namespace_line}'
+              f'  labels:\n    app: {app_name}\n    component: {name}\n'
+              f'spec:\n  type: {service_type}\n  selector:\n    app: {app_name}\n    component: {name}\n'
+              '  ports:\n')
+        for host, container, protocol in ports:
+            write(f'  - port: {host}\n    targetPort: {container}\n    protocol: {protocol}\n')
+        write('\n')
+
+
+def render_docker_compose(xml_doc, environment='dev'):
+    """Fichier docker-compose d'un environnement (même sortie que docker-compose.xslt)"""
+    out = []
+    write = out.append
+    for env in _environments(xml_doc, environment):
+        write("version: '3.8'\n\nservices:\n")
+        shared = ''.join(
+            f'      - {name}={value}\n'
+            for name, value in _pairs(env.iterfind('variables/variable'), 'name', 'value')
+        )
+        for service in env.iterfind('services/service'):
+            fields, groups = _service(service)
+            image = fields.get('image', '')
+            if 'tag' in fields:
+                image = f"{image}:{fields['tag']}"
+            write(f"  {fields.get('name', '')}:\n    image: {image}\n")
+
+            ports = _items(groups, 'ports', 'port')
+            if ports:
+                write('    ports:\n')
+                for port in ports:
+                    port_fields = _record(port, ('protocol',))
+                    suffix = ''
+                    if any(protocol != 'tcp' for protocol in port_fields.get('protocol*', ())):
+                        suffix = f"/{port_fields['protocol']}"
+                    write(f"      - \"{port_fields.get('host', '')}:{port_fields.get('container', '')}{suffix}\"\n")
+
+            volumes = _items(groups, 'volumes', 'volume')
+            if volumes:
+                write('    volumes:\n')
+                for volume in volumes:
+                    volume_fields = _record(volume, ('mode',))
+                    suffix = ''
+                    if any(mode != 'rw' for mode in volume_fields.get('mode*', ())):
+                        suffix = f":{volume_fields['mode']}"
+                    write(f"      - {volume_fields.get('host_path', '')}:{volume_fields.get('container_path', '')}{suffix}\n")
+
+            own = ''.join(
+                f'      - {name}={value}\n'
+                for name, value in _pairs(_items(groups, 'environment', 'variable'), 'name', 'value')
+            )
+            if own or shared:
+                write('    environment:\n')
+                write(shared)
+                write(own)
+
+            depends_on = _items(groups, 'depends_on', 'service')
+            if depends_on:
+                write('    depends_on:\n')
+                for dependency in depends_on:
+                    write(f'      - {_string(dependency)}\n')
+
+            if 'command' in fields:
+                write(f"    command: {fields['command']}\n")
+            if 'working_dir' in fields:
+                write(f"    working_dir: {fields['working_dir']}\n")
+            write('\n')
+    return ''.join(out)
+
+
+NATIVE_RENDERERS = {
+    'kubernetes': render_kubernetes,
+    'docker-compose': render_docker_compose
+}
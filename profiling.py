@@ -0,0 +1,175 @@
+"""
+Profilage à la demande d'une requête
+
+Une session enveloppe la requête dans cProfile et additionne les durées
+des étapes instrumentées (parsing lxml, validation XSD, XSLT). Le code
+natif de lxml n'apparaît pas dans cProfile : son temps est compté dans
+la fonction Python appelante, d'où la ventilation par étape en plus des
+points chauds.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+
+# Étapes du pipeline regroupées par catégorie ; le reste est du Python
+STAGE_CATEGORIES = {
+    'xml_parse': 'lxml_parse',
+    'parse_validation': 'xsd_validation',
+    'schema_validation': 'xsd_validation',
+    'xslt_transform': 'xslt'
+}
+
+_current = ContextVar('profile_session', default=None)
+
+# cProfile ne supporte qu'un profileur actif à la fois selon les versions
+_profiler_lock = threading.Lock()
+
+
+def active_session():
+    """Session de profilage de la requête courante, ou None"""
+    return _current.get()
+
+
+class _SessionStage:
+    """Mesure une étape pour la session tout en déléguant au chronomètre interne"""
+
+    __slots__ = ('_session', '_stage', '_inner', '_start')
+
+    def __init__(self, session, stage, inner):
+        self._session = session
+        self._stage = stage
+        self._inner = inner
+
+    def __enter__(self):
+        self._inner.__enter__()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self._start
+        self._session.add(self._stage, elapsed)
+        return self._inner.__exit__(*exc)
+
+
+class ProfileSession:
+    """Profil d'une requête : cProfile et durées cumulées par étape"""
+
+    def __init__(self, method, path):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.stages = {}
+        self._stages_lock = threading.Lock()
+        self._profiler = cProfile.Profile()
+        self._token = None
+        self._start = None
+        self._elapsed = None
+
+    @classmethod
+    def start(cls, method, path):
+        """Démarre une session ; None si un autre profilage est en cours"""
+        if not _profiler_lock.acquire(blocking=False):
+            return None
+        session = cls(method, path)
+        session._token = _current.set(session)
+        session._start = time.perf_counter()
+        try:
+            session._profiler.enable()
+        except ValueError:
+            _current.reset(session._token)
+            _profiler_lock.release()
+            return None
+        return session
+
+    def stop(self):
+        if self._elapsed is not None:
+            return
+        self._profiler.disable()
+        self._elapsed = time.perf_counter() - self._start
+        _current.reset(self._token)
+        _profiler_lock.release()
+
+    def stage(self, stage, inner):
+        return _SessionStage(self, stage, inner)
+
+    def add(self, stage, seconds):
+        # Les tâches d'une transformation en lot mesurent leurs étapes en parallèle
+        with self._stages_lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def report(self, status=None, top=20):
+        """Rapport sérialisable : ventilation par catégorie et top-N des fonctions"""
+        total_ms = self._elapsed * 1000
+        breakdown = {'python': 0.0, 'lxml_parse': 0.0, 'xsd_validation': 0.0, 'xslt': 0.0}
+        for stage, seconds in self.stages.items():
+            category = STAGE_CATEGORIES.get(stage, 'python')
+            breakdown[category] += seconds * 1000
+        breakdown['python'] += max(0.0, total_ms - sum(breakdown.values()))
+
+        stats = pstats.Stats(self._profiler)
+        hotspots = []
+        for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            hotspots.append({
+                'function': name if filename == '~' else f'{filename}:{line}({name})',
+                'calls': calls,
+                'tottime_ms': round(tottime * 1000, 3),
+                'cumtime_ms': round(cumtime * 1000, 3)
+            })
+        hotspots.sort(key=lambda item: item['tottime_ms'], reverse=True)
+
+        return {
+            'id': self.id,
+            'method': self.method,
+            'path': self.path,
+            'status': status,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'total_ms': round(total_ms, 3),
+            'breakdown_ms': {key: round(value, 3) for key, value in breakdown.items()},
+            'stages_ms': {key: round(value * 1000, 3) for key, value in self.stages.items()},
+            'hotspots': hotspots[:top]
+        }
+
+    def dump_stats(self, path):
+        """Écrit le profil brut (lisible par pstats, snakeviz...)"""
+        self._profiler.dump_stats(path)
+
+
+class ProfileStore:
+    """Derniers rapports en mémoire, et copie optionnelle dans un répertoire"""
+
+    def __init__(self, max_entries=50, directory=None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._reports = OrderedDict()
+
+    def save(self, session, report):
+        with self._lock:
+            self._reports[report['id']] = report
+            while len(self._reports) > self.max_entries:
+                self._reports.popitem(last=False)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, f"{report['id']}.json"), 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            session.dump_stats(os.path.join(self.directory, f"{report['id']}.prof"))
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._reports.get(profile_id)
+
+    def summaries(self):
+        """Résumé des rapports conservés, du plus récent au plus ancien"""
+        with self._lock:
+            reports = list(self._reports.values())
+        return [
+            {key: report[key] for key in ('id', 'method', 'path', 'status', 'created_at', 'total_ms', 'breakdown_ms')}
+            for report in reversed(reports)
+        ]
@@ -0,0 +1,175 @@
+"""
+Registre des schémas XSD et des feuilles XSLT compilés
+
+Chaque fichier est compilé une seule fois puis réutilisé tant que son
+contenu ne change pas (mtime puis empreinte SHA-256). Les objets lxml
+compilés ne sont pas partagés entre threads : chaque appel emprunte une
+instance dans un petit pool et la rend à la fin du bloc ``with``.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from lxml import etree
+
+
+class _Entry:
+    """État d'un fichier compilé (schéma ou feuille XSLT)"""
+
+    def __init__(self, name, path, kind):
+        self.name = name
+        self.path = os.path.abspath(path)
+        self.kind = kind
+        self.mtime = None
+        self.size = None
+        self.digest = None
+        self.document = None
+        self.generation = 0
+        self.pool = []
+        self.instances = 0
+        self.compile_count = 0
+        self.total_compile_ms = 0.0
+        self.last_compile_ms = None
+        self.last_compiled_at = None
+        self.hits = 0
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'kind': self.kind,
+            'version': self.digest,
+            'compile_count': self.compile_count,
+            'total_compile_ms': round(self.total_compile_ms, 3),
+            'last_compile_ms': None if self.last_compile_ms is None else round(self.last_compile_ms, 3),
+            'last_compiled_at': self.last_compiled_at,
+            'instances': self.instances,
+            'idle_instances': len(self.pool),
+            'hits': self.hits
+        }
+
+
+class CompiledRegistry:
+    """Compile et distribue le schéma XSD et les feuilles XSLT"""
+
+    def __init__(self, schema_path, stylesheets=None):
+        self._lock = threading.RLock()
+        self._schema = _Entry('schema', schema_path, 'schema')
+        self._stylesheets = {}
+        self._by_path = {}
+        for name, path in (stylesheets or {}).items():
+            self.register(name, path)
+
+    def register(self, name, path):
+        """Déclare une feuille XSLT sous un nom de cible"""
+        with self._lock:
+            entry = _Entry(name, path, 'xslt')
+            self._stylesheets[name] = entry
+            self._by_path[entry.path] = entry
+            return entry
+
+    @property
+    def targets(self):
+        return list(self._stylesheets)
+
+    def warm_up(self):
+        """Compile le schéma et toutes les feuilles déclarées"""
+        for entry in [self._schema] + list(self._stylesheets.values()):
+            if os.path.exists(entry.path):
+                self._refresh(entry)
+        return self.stats()
+
+    @contextmanager
+    def schema(self):
+        """Emprunte une instance de etree.XMLSchema"""
+        with self._borrow(self._schema) as instance:
+            yield instance
+
+    @contextmanager
+    def stylesheet(self, name_or_path):
+        """Emprunte une instance de etree.XSLT par nom de cible ou chemin"""
+        with self._borrow(self._resolve(name_or_path)) as instance:
+            yield instance
+
+    def version(self, name_or_path=None):
+        """Empreinte du fichier actuellement compilé (schéma par défaut)"""
+        entry = self._schema if name_or_path is None else self._resolve(name_or_path)
+        self._refresh(entry)
+        return entry.digest
+
+    def stats(self):
+        """Compteurs et durées de compilation par fichier"""
+        with self._lock:
+            return {
+                'schema': self._schema.stats(),
+                'stylesheets': {name: entry.stats() for name, entry in self._stylesheets.items()}
+            }
+
+    def _resolve(self, name_or_path):
+        entry = self._stylesheets.get(name_or_path)
+        if entry is not None:
+            return entry
+        path = os.path.abspath(name_or_path)
+        entry = self._by_path.get(path)
+        if entry is not None:
+            return entry
+        if not os.path.exists(path):
+            raise KeyError(f'Feuille XSLT inconnue: {name_or_path}')
+        return self.register(path, path)
+
+    def _refresh(self, entry):
+        """Recompile le fichier si son contenu a changé depuis la dernière compilation"""
+        st = os.stat(entry.path)
+        if entry.digest is not None and st.st_mtime_ns == entry.mtime and st.st_size == entry.size:
+            return
+        with self._lock:
+            if entry.digest is not None and st.st_mtime_ns == entry.mtime and st.st_size == entry.size:
+                return
+            with open(entry.path, 'rb') as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            entry.mtime = st.st_mtime_ns
+            entry.size = st.st_size
+            if digest == entry.digest:
+                # Fichier touché mais contenu identique : rien à recompiler
+                return
+            start = time.perf_counter()
+            document = etree.fromstring(data, base_url=entry.path).getroottree()
+            compiled = self._compile(entry, document)
+            elapsed = (time.perf_counter() - start) * 1000
+            entry.document = document
+            entry.digest = digest
+            entry.generation += 1
+            entry.pool = [compiled]
+            entry.instances = 1
+            entry.compile_count += 1
+            entry.total_compile_ms += elapsed
+            entry.last_compile_ms = elapsed
+            entry.last_compiled_at = time.time()
+
+    @staticmethod
+    def _compile(entry, document):
+        if entry.kind == 'schema':
+            return etree.XMLSchema(document)
+        return etree.XSLT(document)
+
+    @contextmanager
+    def _borrow(self, entry):
+        self._refresh(entry)
+        with self._lock:
+            entry.hits += 1
+            generation = entry.generation
+            if entry.pool:
+                instance = entry.pool.pop()
+            else:
+                # Toutes les instances sont occupées : on en compile une de plus
+                instance = self._compile(entry, entry.document)
+                entry.instances += 1
+        try:
+            yield instance
+        finally:
+            with self._lock:
+                if entry.generation == generation:
+                    entry.pool.append(instance)
@@ -1,6 +1,11 @@
 #!/usr/bin/env python3
 """
 Script pour générer des fichiers YAML depuis XML
+
+Mode simple : un fichier, une cible, un environnement.
+Mode en masse (--output-dir) : fichiers, répertoires ou globs, toutes les
+cibles et tous les environnements, en parallèle, en sautant les entrées
+inchangées depuis la dernière exécution.
 """
 
 import sys
@@ -8,6 +13,11 @@ import os
 import argparse
 from lxml import etree
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk import generate_bulk
+from targets import TRANSFORM_TARGETS
+
 def generate_yaml(xml_path, xslt_path, environment, output_path=None):
     """Génère un fichier YAML depuis XML en utilisant XSLT"""
     try:
@@ -45,32 +55,69 @@ def generate_yaml(xml_path, xslt_path, environment, output_path=None):
         traceback.print_exc()
         return 1
 
+def print_progress(result):
+    """Affiche le résultat d'un fichier en mode en masse"""
+    if result['error'] is None:
+        print(f"✓ {result['input']}: {len(result['outputs'])} fichier(s) ({result['duration_ms']:.1f} ms)")
+    else:
+        print(f"❌ {result['input']}: {result['error']}")
+
+
+def run_bulk(args):
+    """Mode en masse ; retourne le code de sortie"""
+    summary = generate_bulk(
+        args.inputs,
+        args.output_dir,
+        targets=args.targets,
+        environments=args.environments,
+        workers=args.workers,
+        manifest_path=args.manifest,
+        force=args.force,
+        progress=print_progress
+    )
+    print(f"\n{summary['inputs']} entrée(s): {summary['generated']} générée(s), "
+          f"{summary['skipped']} inchangée(s), {len(summary['failed'])} en erreur "
+          f"— {summary['outputs']} fichier(s) écrit(s) en {summary['duration_s']:.2f} s")
+    return 1 if summary['failed'] else 0
+
+
 def main():
     parser = argparse.ArgumentParser(description='Génère des fichiers YAML depuis XML')
-    parser.add_argument('xml_file', help='Fichier XML source')
-    parser.add_argument('--type', choices=['docker-compose', 'kubernetes'], 
-                       required=True, help='Type de fichier à générer')
+    parser.add_argument('inputs', nargs='+', metavar='xml_file',
+                       help='Fichier XML source (mode en masse : fichiers, répertoires ou globs)')
+    parser.add_argument('--type', choices=list(TRANSFORM_TARGETS),
+                       help='Type de fichier à générer (mode simple)')
     parser.add_argument('--environment', default='dev', 
                        help='Environnement cible (défaut: dev)')
     parser.add_argument('--output', '-o', help='Fichier de sortie (optionnel)')
+    parser.add_argument('--output-dir', help='Mode en masse : répertoire de sortie')
+    parser.add_argument('--targets', nargs='+', choices=list(TRANSFORM_TARGETS),
+                       help='Mode en masse : cibles (défaut: toutes)')
+    parser.add_argument('--environments', nargs='+',
+                       help='Mode en masse : environnements (défaut: tous ceux de chaque fichier)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Mode en masse : nombre de processus (défaut: nombre de CPU)')
+    parser.add_argument('--manifest', help='Mode en masse : manifeste des empreintes '
+                       '(défaut: <output-dir>/.generate-manifest.json)')
+    parser.add_argument('--force', action='store_true',
+                       help='Mode en masse : régénérer même les entrées inchangées')
     
     args = parser.parse_args()
     
+    if args.output_dir:
+        sys.exit(run_bulk(args))
+    
+    if len(args.inputs) != 1 or not args.type:
+        parser.error('le mode simple attend un seul fichier XML et --type (ou --output-dir pour le mode en masse)')
+    
     # Déterminer le chemin XSLT
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    if args.type == 'docker-compose':
-        xslt_file = os.path.join(script_dir, '..', 'xslt', 'docker-compose.xslt')
-    else:
-        xslt_file = os.path.join(script_dir, '..', 'xslt', 'kubernetes.xslt')
+    xslt_file = TRANSFORM_TARGETS[args.type]
     
     # Générer le nom de sortie par défaut
     if not args.output:
-        if args.type == 'docker-compose':
-            args.output = f'docker-compose-{args.environment}.yaml'
-        else:
-            args.output = f'kubernetes-{args.environment}.yaml'
+        args.output = f'{args.type}-{args.environment}.yaml'
     
-    exit_code = generate_yaml(args.xml_file, xslt_file, args.environment, args.output)
+    exit_code = generate_yaml(args.inputs[0], xslt_file, args.environment, args.output)
     sys.exit(exit_code)
 
 if __name__ == '__main__':
@@ -1,47 +1,75 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Script pour valider un fichier XML contre le schéma XSD
+Script pour valider un ou plusieurs fichiers XML contre le schéma XSD
+
+Plusieurs fichiers, répertoires ou globs : validation en parallèle, avec
+sortie texte, JSON Lines (une ligne par fichier au fil de l'eau puis le
+résumé) ou JUnit XML.
 """
 
 import sys
 import os
+import argparse
+import glob
+import json
+import time
 from lxml import etree
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk import junit_report, validate_bulk
+from validation import validate_while_parsing
+
 # Fix encoding pour Windows
 if sys.platform == 'win32':
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
-def validate_xml(xml_path, xsd_path=None):
+def default_xsd_path():
+    """Chemin du schéma XSD du projet"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, '..', 'schemas', 'config.xsd')
+
+
+def validate_xml(xml_path, xsd_path=None, streaming=False, max_errors=None, huge_tree=False):
     """Valide un fichier XML contre le schéma XSD"""
     if xsd_path is None:
         # Utiliser le schéma par défaut
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        xsd_path = os.path.join(script_dir, '..', 'schemas', 'config.xsd')
+        xsd_path = default_xsd_path()
     
     try:
-        # Parser le XML
-        xml_doc = etree.parse(xml_path)
-        print(f"✓ Fichier XML parsé: {xml_path}")
-        
         # Charger le schéma XSD
         xsd_doc = etree.parse(xsd_path)
         xsd_schema = etree.XMLSchema(xsd_doc)
         print(f"✓ Schéma XSD chargé: {xsd_path}")
         
+        if streaming:
+            return validate_streaming(xml_path, xsd_schema, max_errors, huge_tree)
+        
+        # Parser le XML
+        start = time.perf_counter()
+        xml_doc = etree.parse(xml_path, etree.XMLParser(huge_tree=huge_tree))
+        parse_ms = (time.perf_counter() - start) * 1000
+        print(f"✓ Fichier XML parsé: {xml_path} ({parse_ms:.1f} ms)")
+        
         # Valider
+        start = time.perf_counter()
         is_valid = xsd_schema.validate(xml_doc)
+        validation_ms = (time.perf_counter() - start) * 1000
         
         if is_valid:
-            print("✅ Validation réussie: Le fichier XML est valide")
+            print(f"✅ Validation réussie: Le fichier XML est valide ({validation_ms:.1f} ms)")
             return 0
         else:
-            print("❌ Validation échouée: Le fichier XML contient des erreurs")
+            print(f"❌ Validation échouée: Le fichier XML contient des erreurs ({validation_ms:.1f} ms)")
             print("\nErreurs détectées:")
-            for error in xsd_schema.error_log:
+            for count, error in enumerate(xsd_schema.error_log, 1):
                 print(f"  Ligne {error.line}: {error.message}")
+                if max_errors and count >= max_errors:
+                    print(f"  ... arrêt après {max_errors} erreur(s)")
+                    break
             return 1
             
     except etree.XMLSyntaxError as e:
@@ -54,14 +82,116 @@ def validate_xml(xml_path, xsd_path=None):
         print(f"❌ Erreur: {e}")
         return 1
 
-if __name__ == '__main__':
-    if len(sys.argv) < 2:
-        print("Usage: python validate-xml.py <fichier-xml> [fichier-xsd]")
-        print("Exemple: python validate-xml.py examples/sample-config.xml")
-        sys.exit(1)
+def validate_streaming(xml_path, xsd_schema, max_errors=None, huge_tree=False):
+    """Valide pendant le parsing, sans garder l'arbre en mémoire"""
+    _, result = validate_while_parsing(
+        xml_path,
+        xsd_schema,
+        max_errors=max_errors,
+        huge_tree=huge_tree,
+        keep_tree=False
+    )
+    elapsed = result['timings']['parse_validation_ms']
     
-    xml_file = sys.argv[1]
-    xsd_file = sys.argv[2] if len(sys.argv) > 2 else None
+    if result['valid']:
+        print(f"✅ Validation réussie: Le fichier XML est valide ({elapsed:.1f} ms, parsing + validation)")
+        return 0
     
-    exit_code = validate_xml(xml_file, xsd_file)
+    print(f"❌ Validation échouée: {result['message']} ({elapsed:.1f} ms, parsing + validation)")
+    print("\nErreurs détectées:")
+    for error in result['errors']:
+        line = error['line'] if error['line'] is not None else '?'
+        print(f"  Ligne {line}: {error['message']}")
+    if result.get('truncated'):
+        print(f"  ... arrêt après {max_errors} erreur(s)")
+    return 1
+
+
+def print_result(result, stream):
+    """Ligne de progression d'un fichier en sortie texte"""
+    status = {'valid': '✅', 'invalid': '❌', 'error': '⚠️'}[result['status']]
+    print(f"{status} {result['file']} ({result['duration_ms']:.1f} ms)", file=stream)
+    for error in result['errors']:
+        line = error['line'] if error.get('line') is not None else '?'
+        print(f"    Ligne {line}: {error['message']}", file=stream)
+
+
+def run_bulk(args, inputs, stream):
+    """Valide en masse ; retourne le code de sortie"""
+    if args.format == 'jsonl':
+        def on_result(result):
+            stream.write(json.dumps(dict(result, type='file'), ensure_ascii=False) + '\n')
+            stream.flush()
+    elif args.format == 'text':
+        def on_result(result):
+            print_result(result, stream)
+    else:
+        on_result = None
+
+    results, summary = validate_bulk(
+        inputs,
+        xsd_path=args.xsd_file,
+        workers=args.workers,
+        streaming=args.streaming,
+        max_errors=args.max_errors,
+        huge_tree=args.huge_tree,
+        on_result=on_result
+    )
+
+    if args.format == 'jsonl':
+        stream.write(json.dumps(dict(summary, type='summary'), ensure_ascii=False) + '\n')
+    elif args.format == 'junit':
+        stream.write(junit_report(results, summary).decode('utf-8'))
+    else:
+        print(f"\n{summary['files']} fichier(s): {summary['valid']} valide(s), "
+              f"{summary['invalid']} invalide(s), {summary['errors']} en erreur "
+              f"en {summary['duration_s']:.2f} s ({summary['workers']} worker(s), "
+              f"p50 {summary['p50_ms'] or 0:.1f} ms, max {summary['max_ms'] or 0:.1f} ms)", file=stream)
+    return 0 if summary['files'] and summary['valid'] == summary['files'] else 1
+
+
+def is_bulk(args, inputs):
+    if args.format != 'text' or args.workers or len(inputs) > 1:
+        return True
+    return os.path.isdir(inputs[0]) or glob.has_magic(inputs[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Valide des fichiers XML contre le schéma XSD')
+    parser.add_argument('inputs', nargs='+', metavar='xml_file',
+                       help='Fichiers, répertoires ou globs à valider (un .xsd en dernier désigne le schéma)')
+    parser.add_argument('--xsd', dest='xsd_file', default=None,
+                       help='Schéma XSD (défaut: schemas/config.xsd)')
+    parser.add_argument('--format', choices=['text', 'jsonl', 'junit'], default='text',
+                       help='Format de sortie (jsonl et junit : validation en masse)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Processus de validation en parallèle (défaut: nombre de CPU)')
+    parser.add_argument('-o', '--output', default=None,
+                       help='Fichier du rapport (défaut: sortie standard)')
+    parser.add_argument('--streaming', action='store_true',
+                       help='Valider pendant le parsing (mémoire bornée)')
+    parser.add_argument('--max-errors', type=int, default=None,
+                       help='Arrêter après N erreurs')
+    parser.add_argument('--huge-tree', action='store_true',
+                       help='Lever les limites de libxml2 pour les très gros fichiers')
+    
+    args = parser.parse_args()
+    inputs = list(args.inputs)
+    # Compatibilité : validate-xml.py fichier.xml schema.xsd
+    if len(inputs) > 1 and inputs[-1].endswith('.xsd') and args.xsd_file is None:
+        args.xsd_file = inputs.pop()
+    
+    if not is_bulk(args, inputs):
+        exit_code = validate_xml(inputs[0], args.xsd_file, args.streaming, args.max_errors, args.huge_tree)
+        sys.exit(exit_code)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as stream:
+            exit_code = run_bulk(args, inputs, stream)
+    else:
+        exit_code = run_bulk(args, inputs, sys.stdout)
     sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
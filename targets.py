@@ -0,0 +1,38 @@
+"""
+Chemins du schéma et des feuilles XSLT, cibles de transformation
+
+Partagé par l'API et les scripts (génération et validation en masse).
+"""
+
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+XSD_SCHEMA_PATH = os.path.join(BASE_DIR, 'schemas', 'config.xsd')
+DOCKER_COMPOSE_XSLT = os.path.join(BASE_DIR, 'xslt', 'docker-compose.xslt')
+KUBERNETES_XSLT = os.path.join(BASE_DIR, 'xslt', 'kubernetes.xslt')
+HELM_XSLT = os.path.join(BASE_DIR, 'xslt', 'helm.xslt')
+JSON_XSLT = os.path.join(BASE_DIR, 'xslt', 'json.xslt')
+GITHUB_ACTIONS_XSLT = os.path.join(BASE_DIR, 'xslt', 'github-actions.xslt')
+JENKINS_XSLT = os.path.join(BASE_DIR, 'xslt', 'jenkins.xslt')
+EXAMPLES_DIR = os.path.join(BASE_DIR, 'examples')
+
+# Cibles de transformation et feuilles XSLT associées
+TRANSFORM_TARGETS = {
+    'docker-compose': DOCKER_COMPOSE_XSLT,
+    'kubernetes': KUBERNETES_XSLT,
+    'helm': HELM_XSLT,
+    'json': JSON_XSLT,
+    'github-actions': GITHUB_ACTIONS_XSLT,
+    'jenkins': JENKINS_XSLT
+}
+
+# Nom de fichier de chaque cible dans une archive ou un répertoire de sortie
+TARGET_FILENAMES = {
+    'docker-compose': 'docker-compose.yaml',
+    'kubernetes': 'kubernetes.yaml',
+    'helm': 'helm.yaml',
+    'json': 'config.json',
+    'github-actions': 'github-actions.yml',
+    'jenkins': 'Jenkinsfile'
+}
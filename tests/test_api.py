@@ -0,0 +1,570 @@
+"""
+Tests des endpoints de l'API Flask
+"""
+
+import unittest
+import sys
+import os
+import gzip
+import json
+import zipfile
+from io import BytesIO
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from app import app
+
+
+VALID_XML = '''<?xml version="1.0" encoding="UTF-8"?>
+<devops-config version="1.0">
+    <application>
+        <name>test-app</name>
+        <version>1.0.0</version>
+    </application>
+    <environments>
+        <environment>
+            <name>dev</name>
+            <services>
+                <service>
+                    <name>web</name>
+                    <image>nginx</image>
+                    <tag>alpine</tag>
+                    <ports>
+                        <port>
+                            <host>8080</host>
+                            <container>80</container>
+                        </port>
+                    </ports>
+                </service>
+            </services>
+            <variables>
+                <variable>
+                    <name>LOG_LEVEL</name>
+                    <value>debug</value>
+                </variable>
+            </variables>
+        </environment>
+    </environments>
+</devops-config>'''
+
+
+class TestTransformEndpoints(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+        app_module.result_cache.clear()
+
+    def post(self, url, payload):
+        return self.client.post(url, data=json.dumps(payload), content_type='application/json')
+
+    def test_all_targets(self):
+        """Test des six cibles via le pipeline commun"""
+        expected = {
+            'docker-compose': 'services:',
+            'kubernetes': 'kind: Deployment',
+            'helm': 'apiVersion: v2',
+            'json': '"application"',
+            'github-actions': 'jobs:',
+            'jenkins': 'pipeline {'
+        }
+        for target, marker in expected.items():
+            response = self.post(f'/api/transform/{target}', {'xml': VALID_XML, 'environment': 'dev'})
+            self.assertEqual(response.status_code, 200, target)
+            body = response.get_json()
+            self.assertTrue(body['success'], target)
+            self.assertIn(marker, body['content'], target)
+
+    def test_json_target_returns_data(self):
+        """Test de la structure renvoyée pour la cible JSON"""
+        body = self.post('/api/transform/json', {'xml': VALID_XML, 'include_data': True}).get_json()
+        self.assertEqual(body['data']['application']['name'], 'test-app')
+        self.assertEqual(json.loads(body['content']), body['data'])
+
+        body = self.post('/api/transform/json', {'xml': VALID_XML, 'compact': True}).get_json()
+        self.assertNotIn('data', body)
+        self.assertNotIn('\n', body['content'])
+
+    def test_parse_once(self):
+        """Test d'un seul parsing par requête de transformation"""
+        with mock.patch.object(app_module, 'parse_xml', wraps=app_module.parse_xml) as parse:
+            response = self.post('/api/transform/kubernetes', {'xml': VALID_XML})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(parse.call_count, 1)
+
+    def test_invalid_xml(self):
+        """Test d'un XML invalide"""
+        response = self.post('/api/transform/docker-compose', {'xml': '<devops-config>'})
+        self.assertEqual(response.status_code, 400)
+        body = response.get_json()
+        self.assertFalse(body['success'])
+        self.assertTrue(body['validation_errors'])
+
+    def test_missing_xml(self):
+        """Test sans contenu XML"""
+        response = self.post('/api/transform/kubernetes', {'xml': ''})
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_target(self):
+        """Test d'une cible inconnue"""
+        response = self.post('/api/transform/ansible', {'xml': VALID_XML})
+        self.assertEqual(response.status_code, 404)
+
+
+class TestValidateEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def post(self, payload):
+        return self.client.post('/api/validate', data=json.dumps(payload), content_type='application/json')
+
+    def test_streaming_mode(self):
+        """Test du mode de validation pendant le parsing"""
+        body = self.post({'xml': VALID_XML, 'mode': 'streaming'}).get_json()
+        self.assertTrue(body['valid'])
+        self.assertEqual(body['mode'], 'streaming')
+
+    def test_unknown_mode(self):
+        """Test d'un mode de validation inconnu"""
+        response = self.post({'xml': VALID_XML, 'mode': 'lazy'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_max_errors(self):
+        """Test 400 pour max_errors non entier ou négatif dans un corps JSON"""
+        for max_errors in ('abc', -1, 1.5, True, [1]):
+            response = self.post({'xml': VALID_XML, 'max_errors': max_errors})
+            self.assertEqual(response.status_code, 400, max_errors)
+            self.assertIn('max_errors', response.get_json()['message'])
+        for max_errors in (None, 0, 2):
+            self.assertTrue(self.post({'xml': VALID_XML, 'max_errors': max_errors}).get_json()['valid'])
+
+
+class TestXmlBody(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+        app_module.result_cache.clear()
+        self.body = VALID_XML.encode('utf-8')
+
+    def post_xml(self, url, body, **headers):
+        return self.client.post(url, data=body, content_type='application/xml', headers=headers)
+
+    def test_transform_raw_xml(self):
+        """Test corps XML brut, environnement en query string : même contenu qu'en JSON"""
+        expected = self.client.post(
+            '/api/transform/kubernetes', data=json.dumps({'xml': VALID_XML, 'environment': 'dev'}),
+            content_type='application/json'
+        )
+        response = self.post_xml('/api/transform/kubernetes?environment=dev', self.body)
+        body = response.get_json()
+        self.assertTrue(body['success'])
+        self.assertEqual(body['content'], expected.get_json()['content'])
+        self.assertEqual(response.headers['ETag'], expected.headers['ETag'])
+
+    def test_gzip_xml(self):
+        """Test corps XML compressé (Content-Encoding: gzip)"""
+        response = self.post_xml('/api/validate?mode=streaming', gzip.compress(self.body), **{'Content-Encoding': 'gzip'})
+        body = response.get_json()
+        self.assertTrue(body['valid'])
+        self.assertEqual(body['mode'], 'streaming')
+
+    def test_gzip_json(self):
+        """Test corps JSON compressé"""
+        payload = gzip.compress(json.dumps({'xml': VALID_XML}).encode('utf-8'))
+        response = self.client.post(
+            '/api/environments', data=payload, content_type='application/json', headers={'Content-Encoding': 'gzip'}
+        )
+        self.assertEqual(response.get_json()['environments'], ['dev'])
+
+    def test_batch_list_params(self):
+        """Test listes de cibles et d'environnements en query string"""
+        response = self.post_xml('/api/transform/batch?targets=kubernetes,docker-compose&environments=dev', self.body)
+        body = response.get_json()
+        self.assertTrue(body['success'])
+        self.assertEqual(
+            sorted((item['target'], item['environment']) for item in body['results']),
+            [('docker-compose', 'dev'), ('kubernetes', 'dev')]
+        )
+
+    def test_too_large(self):
+        """Test 413 au-delà de MAX_CONTENT_LENGTH, y compris après décompression"""
+        with mock.patch.dict(app.config, {'MAX_CONTENT_LENGTH': 1024}):
+            response = self.post_xml('/api/validate', self.body + b' ' * 2048)
+            self.assertEqual(response.status_code, 413)
+            self.assertFalse(response.get_json()['success'])
+            bomb = gzip.compress(self.body + b' ' * 100000)
+            self.assertLess(len(bomb), 1024)
+            response = self.post_xml('/api/validate', bomb, **{'Content-Encoding': 'gzip'})
+            self.assertEqual(response.status_code, 413)
+
+    def test_invalid_gzip(self):
+        """Test 400 pour un corps annoncé gzip mais non compressé"""
+        for url in ('/api/validate', '/api/transform/kubernetes'):
+            response = self.post_xml(url, self.body, **{'Content-Encoding': 'gzip'})
+            self.assertEqual(response.status_code, 400)
+            self.assertFalse(response.get_json()['success'])
+        response = self.client.post(
+            '/api/environments', data=self.body, content_type='application/json', headers={'Content-Encoding': 'gzip'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_int_param(self):
+        """Test 400 pour un paramètre entier invalide en query string"""
+        response = self.post_xml('/api/validate?max_errors=abc', self.body)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('max_errors', response.get_json()['message'])
+
+    def test_stream_flag(self):
+        """Test stream=1/true en query string : artefact brut ; stream=0 : réponse JSON"""
+        expected = self.post_xml('/api/transform/kubernetes?environment=dev', self.body).get_json()['content']
+        for value in ('1', 'true', 'yes'):
+            response = self.post_xml(f'/api/transform/kubernetes?environment=dev&stream={value}', self.body)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_streamed)
+            self.assertEqual(response.get_data(as_text=True), expected)
+        response = self.post_xml('/api/transform/kubernetes?environment=dev&stream=0', self.body)
+        self.assertEqual(response.get_json()['content'], expected)
+
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+        app_module.result_cache.clear()
+        with open(os.path.join(app_module.EXAMPLES_DIR, 'sample-config.xml'), encoding='utf-8') as f:
+            self.payload = json.dumps({'xml': f.read(), 'environment': 'prod'})
+
+    def post(self, accept_encoding=None, headers=None):
+        headers = dict(headers or {})
+        if accept_encoding is not None:
+            headers['Accept-Encoding'] = accept_encoding
+        return self.client.post(
+            '/api/transform/kubernetes', data=self.payload, content_type='application/json', headers=headers
+        )
+
+    def test_gzip_negotiated(self):
+        """Test réponse gzip identique une fois décompressée"""
+        plain = self.post()
+        compressed = self.post('gzip, deflate')
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertEqual(compressed.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', compressed.headers['Vary'])
+        self.assertLess(len(compressed.get_data()), len(plain.get_data()))
+        self.assertEqual(gzip.decompress(compressed.get_data()), plain.get_data())
+        self.assertEqual(compressed.headers['ETag'], f'W/{plain.headers["ETag"]}')
+
+    def test_refused_encodings(self):
+        """Test qualité nulle ou codage inconnu : réponse non compressée"""
+        for header in ('gzip;q=0', 'br', 'identity'):
+            self.assertNotIn('Content-Encoding', self.post(header).headers)
+
+    def test_threshold(self):
+        """Test réponse sous le seuil envoyée telle quelle"""
+        with mock.patch.dict(app.config, {'COMPRESSION_MIN_SIZE': 10 ** 9}):
+            self.assertNotIn('Content-Encoding', self.post('gzip').headers)
+
+    def test_compressed_bytes_cached(self):
+        """Test réponse chaude servie sans recompression"""
+        first = self.post('gzip')
+        with mock.patch.object(app_module, 'compress') as compress:
+            second = self.post('gzip')
+        compress.assert_not_called()
+        self.assertEqual(first.get_data(), second.get_data())
+
+    def test_not_modified_with_weak_etag(self):
+        """Test 304 sur l'ETag faible renvoyé par le client"""
+        etag = self.post('gzip').headers['ETag']
+        self.assertEqual(self.post('gzip', {'If-None-Match': etag}).status_code, 304)
+
+    def test_negotiate(self):
+        """Test préférence serveur à qualité égale, qualité client sinon"""
+        from werkzeug.datastructures import Accept
+        from content_encoding import negotiate
+        encodings = ('zstd', 'gzip')
+        self.assertEqual(negotiate(Accept([('gzip', 1), ('zstd', 1)]), encodings), 'zstd')
+        self.assertEqual(negotiate(Accept([('gzip', 1), ('zstd', 0.5)]), encodings), 'gzip')
+        self.assertEqual(negotiate(Accept([('*', 1)]), encodings), 'zstd')
+        self.assertIsNone(negotiate(Accept([('br', 1)]), encodings))
+
+
+class TestTransformCache(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+        app_module.result_cache.clear()
+
+    def post(self, payload, headers=None):
+        return self.client.post('/api/transform/kubernetes', data=json.dumps(payload),
+                                content_type='application/json', headers=headers or {})
+
+    def test_etag_and_not_modified(self):
+        """Test ETag fort et réponse 304 sur If-None-Match"""
+        first = self.post({'xml': VALID_XML})
+        etag = first.headers['ETag']
+        self.assertFalse(etag.startswith('W/'))
+
+        with mock.patch.object(app_module, 'run_transform_pipeline') as pipeline:
+            second = self.post({'xml': VALID_XML}, {'If-None-Match': etag})
+        self.assertEqual(second.status_code, 304)
+        pipeline.assert_not_called()
+
+    def test_cache_hit(self):
+        """Test réponse servie depuis le cache sans nouveau rendu"""
+        hits = app_module.result_cache.stats()['hits']
+        first = self.post({'xml': VALID_XML})
+        with mock.patch.object(app_module, 'run_transform_pipeline') as pipeline:
+            second = self.post({'xml': VALID_XML})
+        pipeline.assert_not_called()
+        self.assertEqual(first.get_data(), second.get_data())
+        self.assertEqual(first.headers['ETag'], second.headers['ETag'])
+        self.assertEqual(app_module.result_cache.stats()['hits'], hits + 1)
+
+    def test_key_depends_on_environment(self):
+        """Test clé différente selon l'environnement"""
+        dev = self.post({'xml': VALID_XML, 'environment': 'dev'})
+        prod = self.post({'xml': VALID_XML, 'environment': 'prod'})
+        self.assertNotEqual(dev.headers['ETag'], prod.headers['ETag'])
+
+    def test_errors_not_cached(self):
+        """Test absence de mise en cache des erreurs"""
+        self.post({'xml': '<devops-config>'})
+        self.assertEqual(app_module.result_cache.stats()['entries'], 0)
+
+
+class TestStreamingTransform(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+        with open(os.path.join(app_module.EXAMPLES_DIR, 'sample-config.xml'), encoding='utf-8') as f:
+            self.sample_xml = f.read()
+
+    def post(self, url, payload):
+        return self.client.post(url, data=json.dumps(payload), content_type='application/json')
+
+    def test_raw_stream(self):
+        """Test d'un artefact envoyé brut, en morceaux"""
+        app.config['STREAM_CHUNK_SIZE'] = 512
+        try:
+            response = self.post('/api/transform/kubernetes',
+                                 {'xml': self.sample_xml, 'environment': 'prod', 'stream': 'raw'})
+            self.assertTrue(response.is_streamed)
+            self.assertEqual(response.mimetype, 'text/yaml')
+            chunks = list(response.response)
+        finally:
+            app.config['STREAM_CHUNK_SIZE'] = 64 * 1024
+        self.assertTrue(all(len(chunk) <= 512 for chunk in chunks))
+        expected = self.post('/api/transform/kubernetes',
+                             {'xml': self.sample_xml, 'environment': 'prod'}).get_json()['content']
+        self.assertEqual(b''.join(chunks).decode('utf-8'), expected)
+
+    def test_ndjson_one_line_per_environment(self):
+        """Test d'une ligne NDJSON par environnement"""
+        response = self.post('/api/transform/docker-compose?stream=ndjson', {'xml': self.sample_xml, 'environment': '*'})
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = [json.loads(line) for line in response.get_data().splitlines()]
+        self.assertEqual([line['environment'] for line in lines], ['dev', 'prod'])
+        self.assertTrue(all(line['success'] and 'services:' in line['content'] for line in lines))
+
+    def test_invalid_xml_before_streaming(self):
+        """Test d'une erreur de validation renvoyée avant le streaming"""
+        response = self.post('/api/transform/kubernetes', {'xml': '<devops-config>', 'stream': 'raw'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.get_json()['success'])
+
+    def test_unknown_stream_mode(self):
+        """Test d'un mode de streaming inconnu"""
+        response = self.post('/api/transform/kubernetes', {'xml': self.sample_xml, 'stream': 'sse'})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestBatchEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+        with open(os.path.join(app_module.EXAMPLES_DIR, 'sample-config.xml'), encoding='utf-8') as f:
+            self.sample_xml = f.read()
+
+    def post(self, payload):
+        return self.client.post('/api/transform/batch', data=json.dumps(payload), content_type='application/json')
+
+    def test_all_targets_all_environments(self):
+        """Test du lot complet : toutes les cibles pour tous les environnements"""
+        response = self.post({'xml': self.sample_xml})
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertTrue(body['success'])
+        environments = {item['environment'] for item in body['results']}
+        self.assertEqual(len(body['results']), len(app_module.TRANSFORM_TARGETS) * len(environments))
+        for item in body['results']:
+            self.assertIn('duration_ms', item)
+
+    def test_matches_single_endpoint(self):
+        """Test d'une sortie identique à l'endpoint unitaire"""
+        body = self.post({'xml': self.sample_xml, 'targets': ['kubernetes'], 'environments': ['prod']}).get_json()
+        single = self.client.post('/api/transform/kubernetes', data=json.dumps(
+            {'xml': self.sample_xml, 'environment': 'prod'}), content_type='application/json').get_json()
+        self.assertEqual(body['results'][0]['content'], single['content'])
+
+    def test_unknown_environment(self):
+        """Test d'un environnement absent du document"""
+        response = self.post({'xml': self.sample_xml, 'environments': ['qa']})
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_target(self):
+        """Test d'une cible inconnue dans le lot"""
+        response = self.post({'xml': self.sample_xml, 'targets': ['ansible']})
+        self.assertEqual(response.status_code, 404)
+
+    def test_string_lists(self):
+        """Test cibles et environnements en chaîne : un nom ou une liste séparée par des virgules"""
+        body = self.post({'xml': self.sample_xml, 'targets': 'kubernetes,helm', 'environments': 'prod'}).get_json()
+        self.assertTrue(body['success'])
+        self.assertEqual(
+            sorted((item['target'], item['environment']) for item in body['results']),
+            [('helm', 'prod'), ('kubernetes', 'prod')]
+        )
+        for payload in ({'targets': {'kubernetes': 1}}, {'environments': 3}):
+            response = self.post({'xml': self.sample_xml, **payload})
+            self.assertEqual(response.status_code, 400, payload)
+            self.assertFalse(response.get_json()['success'])
+
+
+class TestDownloadEndpoints(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def post(self, url, payload):
+        return self.client.post(url, data=json.dumps(payload), content_type='application/json')
+
+    def test_download_from_memory(self):
+        """Test téléchargement servi sans fichier temporaire"""
+        with mock.patch('tempfile.NamedTemporaryFile') as temp_file:
+            response = self.post('/api/download/kubernetes', {'content': 'kind: Service\n', 'environment': 'prod'})
+        temp_file.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_data(), b'kind: Service\n')
+        self.assertIn('config-prod.yaml', response.headers['Content-Disposition'])
+
+    def test_bundle(self):
+        """Test archive zip de plusieurs cibles et environnements"""
+        response = self.post('/api/download/bundle', {
+            'xml': VALID_XML,
+            'targets': ['docker-compose', 'kubernetes'],
+            'filename': 'release'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/zip')
+        self.assertIn('release.zip', response.headers['Content-Disposition'])
+        archive = zipfile.ZipFile(BytesIO(response.get_data()))
+        self.assertEqual(archive.namelist(), ['dev/docker-compose.yaml', 'dev/kubernetes.yaml'])
+        self.assertIn(b'kind: Deployment', archive.read('dev/kubernetes.yaml'))
+
+    def test_bundle_invalid_xml(self):
+        """Test archive refusée pour un XML invalide"""
+        response = self.post('/api/download/bundle', {'xml': '<devops-config>'})
+        self.assertEqual(response.status_code, 400)
+
+
+    def test_bundle_unsafe_environment_names(self):
+        """Test archive refusée pour des noms d'environnement qui sortiraient du répertoire d'extraction"""
+        for name in ('../../evil', '..', 'a\\b'):
+            xml_content = VALID_XML.replace('<name>dev</name>', f'<name>{name}</name>')
+            response = self.post('/api/download/bundle', {'xml': xml_content, 'targets': ['docker-compose']})
+            self.assertEqual(response.status_code, 400, name)
+            self.assertFalse(response.get_json()['success'])
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+        app_module.result_cache.clear()
+
+    def post(self, url, payload):
+        return self.client.post(url, data=json.dumps(payload), content_type='application/json')
+
+    def test_metrics_after_transform(self):
+        """Test compteurs, étapes et jauges exposés au format Prometheus"""
+        self.post('/api/transform/kubernetes', {'xml': VALID_XML, 'environment': 'dev'})
+        self.post('/api/transform/kubernetes', {'xml': ''})
+        response = self.client.get('/api/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/plain')
+        text = response.get_data(as_text=True)
+
+        self.assertIn('# TYPE devops_requests_total counter', text)
+        self.assertIn('devops_requests_total{endpoint="/api/transform/<target>",method="POST",status="200"}', text)
+        self.assertIn('devops_request_errors_total{endpoint="/api/transform/<target>"}', text)
+        for stage in ('json_decode', 'xml_parse', 'schema_validation', 'xslt_transform', 'serialization'):
+            self.assertIn(f'stage="{stage}"', text)
+        self.assertIn('devops_request_size_bytes_count{endpoint="/api/transform/<target>"}', text)
+        self.assertIn('devops_response_size_bytes_bucket{endpoint="/api/transform/<target>",le="+Inf"}', text)
+        self.assertIn('devops_result_cache_entries 1', text)
+        self.assertIn('devops_compiled_compile_count{kind="xslt",name="kubernetes"}', text)
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+        app_module.result_cache.clear()
+        app.config['PROFILING_ENABLED'] = True
+
+    def tearDown(self):
+        app.config['PROFILING_ENABLED'] = False
+        app.config['PROFILING_DIR'] = None
+
+    def post(self, url, payload, **kwargs):
+        return self.client.post(url, data=json.dumps(payload), content_type='application/json', **kwargs)
+
+    def test_profile_header(self):
+        """Test profil d'une transformation récupérable par son identifiant"""
+        response = self.post('/api/transform/kubernetes', {'xml': VALID_XML}, headers={'X-Profile': '1'})
+        self.assertEqual(response.status_code, 200)
+        profile_id = response.headers['X-Profile-Id']
+
+        report = self.client.get(f'/api/profiles/{profile_id}').get_json()
+        self.assertEqual(report['path'], '/api/transform/kubernetes')
+        self.assertEqual(set(report['breakdown_ms']), {'python', 'lxml_parse', 'xsd_validation', 'xslt'})
+        self.assertIn('xslt_transform', report['stages_ms'])
+        self.assertTrue(report['hotspots'])
+        listed = self.client.get('/api/profiles').get_json()['profiles']
+        self.assertEqual(listed[0]['id'], profile_id)
+
+    def test_profile_batch(self):
+        """Test étapes des tâches d'un lot comptées dans le profil de la requête"""
+        response = self.post('/api/transform/batch', {
+            'xml': VALID_XML, 'targets': ['kubernetes', 'docker-compose']
+        }, headers={'X-Profile': '1'})
+        self.assertTrue(response.get_json()['success'])
+        report = self.client.get(f"/api/profiles/{response.headers['X-Profile-Id']}").get_json()
+        self.assertIn('xslt_transform', report['stages_ms'])
+        self.assertGreater(report['breakdown_ms']['xslt'], 0.0)
+
+    def test_profile_query_flag_written_to_directory(self):
+        """Test rapport et profil brut écrits dans PROFILING_DIR"""
+        import tempfile
+        with tempfile.TemporaryDirectory() as directory:
+            app.config['PROFILING_DIR'] = directory
+            response = self.post('/api/validate?profile=1', {'xml': VALID_XML})
+            profile_id = response.headers['X-Profile-Id']
+            self.assertEqual(
+                sorted(os.listdir(directory)),
+                [f'{profile_id}.json', f'{profile_id}.prof']
+            )
+
+    def test_not_profiled_without_flag_or_when_disabled(self):
+        """Test aucun profil sans drapeau ou quand le profilage est désactivé"""
+        response = self.post('/api/validate', {'xml': VALID_XML})
+        self.assertNotIn('X-Profile-Id', response.headers)
+        app.config['PROFILING_ENABLED'] = False
+        response = self.post('/api/validate', {'xml': VALID_XML}, headers={'X-Profile': '1'})
+        self.assertNotIn('X-Profile-Id', response.headers)
+        self.assertEqual(self.client.get('/api/profiles').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+Tests du mode de service ASGI
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from app import app
+from asgi import AsgiApplication
+
+XML_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples', 'sample-config.xml')
+
+
+def call(application, method, path, body=b'', query=b'', chunk_size=None, headers=None):
+    """Exécute une requête ASGI ; retourne (statut, en-têtes, corps, nombre de messages de corps)"""
+    chunk_size = chunk_size or max(len(body), 1)
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] or [b'']
+    messages = [
+        {'type': 'http.request', 'body': chunk, 'more_body': i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    ]
+    sent = []
+
+    async def receive():
+        await asyncio.sleep(0)
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'path': path,
+        'query_string': query,
+        'headers': [(b'content-type', b'application/json')] + (headers or []),
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 1234)
+    }
+    asyncio.run(application(scope, receive, send))
+    start = sent[0]
+    body_messages = [message for message in sent[1:] if message['type'] == 'http.response.body']
+    return (
+        start['status'],
+        dict((name.decode(), value.decode()) for name, value in start['headers']),
+        b''.join(message.get('body', b'') for message in body_messages),
+        len(body_messages)
+    )
+
+
+class TestAsgiApplication(unittest.TestCase):
+
+    def setUp(self):
+        self.application = AsgiApplication(app, cpu_workers=2, max_connections=10)
+        app_module.result_cache.clear()
+        with open(XML_FILE, encoding='utf-8') as f:
+            self.xml = f.read()
+
+    def test_same_contract_as_wsgi(self):
+        """Test réponse identique à celle du serveur WSGI, corps reçu en morceaux"""
+        payload = json.dumps({'xml': self.xml, 'environment': 'prod'}).encode('utf-8')
+        status, headers, body, _ = call(
+            self.application, 'POST', '/api/transform/kubernetes', payload, chunk_size=256
+        )
+        expected = app.test_client().post('/api/transform/kubernetes', data=payload, content_type='application/json')
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['content-type'], 'application/json')
+        self.assertEqual(json.loads(body), expected.get_json())
+
+    def test_streamed_response_sent_in_chunks(self):
+        """Test réponse NDJSON envoyée au fil du rendu"""
+        payload = json.dumps({'xml': self.xml, 'environments': '*'}).encode('utf-8')
+        status, headers, body, messages = call(
+            self.application, 'POST', '/api/transform/docker-compose', payload, query=b'stream=ndjson'
+        )
+        self.assertEqual(status, 200)
+        lines = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([line['environment'] for line in lines], ['dev', 'prod'])
+        self.assertGreaterEqual(messages, 3)
+
+    def test_connection_limit(self):
+        """Test 503 au-delà du nombre de connexions simultanées"""
+        self.application.active = 10
+        status, headers, body, _ = call(self.application, 'GET', '/api/health')
+        self.assertEqual(status, 503)
+        self.assertEqual(headers['retry-after'], '1')
+        self.assertEqual(self.application.stats()['rejected'], 1)
+
+    def test_body_too_large(self):
+        """Test 413 sur Content-Length puis pendant la lecture d'un corps sans longueur annoncée"""
+        application = AsgiApplication(app, cpu_workers=1, max_connections=10, max_content_length=100)
+        body = b'x' * 200
+        status, _, payload, _ = call(
+            application, 'POST', '/api/validate', body, headers=[(b'content-length', b'200')]
+        )
+        self.assertEqual(status, 413)
+        self.assertFalse(json.loads(payload)['success'])
+        status, _, _, _ = call(application, 'POST', '/api/validate', body, chunk_size=64)
+        self.assertEqual(status, 413)
+        self.assertEqual(application.active, 0)
+
+    def test_lifespan(self):
+        """Test démarrage et arrêt du pool CPU"""
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        call(self.application, 'GET', '/api/health')
+        asyncio.run(self.application({'type': 'lifespan'}, receive, send))
+        self.assertEqual(sent, ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Tests unitaires pour le générateur et la suite de benchmarks
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import model_cache, validate_xml, parse_xml
+from benchmarks.generator import generate_config
+from benchmarks.run_benchmarks import build_cases, percentile, compare_to_baseline
+
+
+class TestGenerator(unittest.TestCase):
+
+    def test_generated_config_is_valid(self):
+        """Test de la validité XSD des configurations générées"""
+        for kwargs in (
+            {'environments': 1, 'services': 1},
+            {'environments': 3, 'services': 7, 'ports': 3, 'volumes': 2, 'variables': 4},
+            {'environments': 2, 'services': 2, 'ports': 0, 'volumes': 0, 'variables': 0,
+             'service_variables': 0, 'secrets': 0, 'depends_on': False, 'kubernetes': False}
+        ):
+            self.assertTrue(validate_xml(generate_config(**kwargs))['valid'], kwargs)
+
+    def test_generated_size(self):
+        """Test du nombre d'environnements et de services"""
+        xml_doc = parse_xml(generate_config(environments=4, services=6))
+        self.assertEqual(len(xml_doc.xpath('//environments/environment')), 4)
+        self.assertEqual(len(xml_doc.xpath('//services/service')), 24)
+
+
+class TestBenchmarkReport(unittest.TestCase):
+
+    def test_percentile(self):
+        """Test des percentiles par rang"""
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 99), 99)
+        self.assertEqual(percentile([3.0], 99), 3.0)
+
+    def test_regression_threshold(self):
+        """Test de la détection de régression par rapport à la référence"""
+        baseline = {'results': [
+            {'case': 'validate_xml', 'size': '1x10', 'p50_ms': 1.0},
+            {'case': 'export_config', 'size': '1x10', 'p50_ms': 2.0}
+        ]}
+        results = [
+            {'case': 'validate_xml', 'size': '1x10', 'p50_ms': 1.5},
+            {'case': 'export_config', 'size': '1x10', 'p50_ms': 2.1},
+            {'case': 'compare_environments', 'size': '1x10', 'p50_ms': 9.0}
+        ]
+        regressions = compare_to_baseline(results, baseline, 0.25)
+        self.assertEqual([item['case'] for item in regressions], ['validate_xml'])
+
+    def test_model_rebuilt_each_iteration(self):
+        """Test export et comparaison mesurés sans le cache de modèles"""
+        cases = build_cases(generate_config(environments=2, services=2), ['env0', 'env1'])
+        for name in ('export_config', 'compare_environments'):
+            for _ in range(2):
+                misses = model_cache.stats()['misses']
+                self.assertEqual(cases[name]().status_code, 200)
+                self.assertEqual(model_cache.stats()['misses'], misses + 1, name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+"""
+Tests du traitement en masse (génération, manifeste d'empreintes, validation)
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from lxml import etree
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import parse_xml, transform_tree, TRANSFORM_TARGETS, EXAMPLES_DIR
+from benchmarks.generator import generate_config
+from bulk import expand_inputs, generate_bulk, junit_report, validate_bulk
+
+
+class TestBulkGeneration(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.inputs = os.path.join(self.directory, 'configs')
+        self.output = os.path.join(self.directory, 'out')
+        os.makedirs(os.path.join(self.inputs, 'team'))
+        shutil.copy(os.path.join(EXAMPLES_DIR, 'sample-config.xml'), self.inputs)
+        for i in range(3):
+            with open(os.path.join(self.inputs, 'team', f'app{i}.xml'), 'w', encoding='utf-8') as f:
+                f.write(generate_config(environments=2, services=2))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_expand_inputs(self):
+        """Test répertoires, globs et fichiers sans doublon"""
+        paths = expand_inputs([
+            self.inputs,
+            os.path.join(self.inputs, '**', 'app*.xml'),
+            os.path.join(self.inputs, 'sample-config.xml')
+        ])
+        self.assertEqual(len(paths), 4)
+
+    def test_all_targets_and_environments(self):
+        """Test toutes les cibles de tous les environnements, identiques à l'API"""
+        summary = generate_bulk([self.inputs], self.output, workers=1)
+        self.assertEqual(summary['generated'], 4)
+        self.assertFalse(summary['failed'])
+        self.assertEqual(summary['outputs'], (2 + 3 * 2) * len(TRANSFORM_TARGETS))
+
+        with open(os.path.join(EXAMPLES_DIR, 'sample-config.xml'), encoding='utf-8') as f:
+            xml_doc = parse_xml(f.read())
+        with open(os.path.join(self.output, 'sample-config', 'prod', 'kubernetes.yaml'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), transform_tree(xml_doc, TRANSFORM_TARGETS['kubernetes'], 'prod')['content'])
+        self.assertTrue(os.path.exists(os.path.join(self.output, 'team', 'app0', 'env1', 'Jenkinsfile')))
+
+    def test_unchanged_inputs_skipped(self):
+        """Test le manifeste saute les entrées inchangées"""
+        generate_bulk([self.inputs], self.output, targets=['docker-compose'], workers=2)
+        summary = generate_bulk([self.inputs], self.output, targets=['docker-compose'], workers=2)
+        self.assertEqual((summary['generated'], summary['skipped']), (0, 4))
+
+        changed = os.path.join(self.inputs, 'team', 'app1.xml')
+        with open(changed, 'a', encoding='utf-8') as f:
+            f.write('<!-- modifié -->\n')
+        summary = generate_bulk([self.inputs], self.output, targets=['docker-compose'], workers=1)
+        self.assertEqual([result['input'] for result in summary['results']], [os.path.abspath(changed)])
+
+        # D'autres cibles demandées : tout est régénéré
+        summary = generate_bulk([self.inputs], self.output, targets=['helm'], workers=1)
+        self.assertEqual(summary['generated'], 4)
+
+    def test_error_reported(self):
+        """Test fichier mal formé signalé sans interrompre le lot"""
+        with open(os.path.join(self.inputs, 'broken.xml'), 'w', encoding='utf-8') as f:
+            f.write('<devops-config>')
+        summary = generate_bulk([self.inputs], self.output, targets=['json'], workers=1)
+        self.assertEqual(summary['generated'], 4)
+        self.assertEqual(len(summary['failed']), 1)
+        summary = generate_bulk([self.inputs], self.output, targets=['json'], workers=1)
+        self.assertEqual(summary['skipped'], 4)
+
+    def test_invalid_schema_not_generated(self):
+        """Test fichier non conforme au schéma XSD signalé, sans sortie"""
+        with open(os.path.join(self.inputs, 'invalid.xml'), 'w', encoding='utf-8') as f:
+            f.write('<devops-config version="1.0"><unknown/></devops-config>')
+        summary = generate_bulk([self.inputs], self.output, targets=['json'], workers=1)
+        self.assertEqual([os.path.basename(result['input']) for result in summary['failed']], ['invalid.xml'])
+        self.assertIn('XSD', summary['failed'][0]['error'])
+        self.assertFalse(os.path.exists(os.path.join(self.output, 'invalid')))
+
+    def test_unsafe_environment_names(self):
+        """Test noms d'environnement vides ou sortant du répertoire de sortie refusés"""
+        config = generate_config(environments=2, services=1)
+        for name in ('../../escaped', '..'):
+            with self.subTest(name=name):
+                with open(os.path.join(self.inputs, 'team', 'app0.xml'), 'w', encoding='utf-8') as f:
+                    f.write(config.replace('<name>env0</name>', f'<name>{name}</name>'))
+                summary = generate_bulk([self.inputs], self.output, targets=['json'], workers=1, force=True)
+                self.assertEqual([os.path.basename(result['input']) for result in summary['failed']], ['app0.xml'])
+                self.assertEqual(summary['failed'][0]['outputs'], [])
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'escaped')))
+        self.assertFalse(os.path.exists(os.path.join(self.output, 'team', 'app0')))
+        for environments in (['../x'], ['']):
+            summary = generate_bulk([self.inputs], self.output, targets=['json'], environments=environments, workers=1)
+            self.assertEqual(len(summary['failed']), 4)
+            self.assertEqual(summary['outputs'], 0)
+
+
+
+class TestBulkValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        shutil.copy(os.path.join(EXAMPLES_DIR, 'sample-config.xml'), self.directory)
+        with open(os.path.join(self.directory, 'invalid.xml'), 'w', encoding='utf-8') as f:
+            f.write('<devops-config version="1.0"><unknown/></devops-config>')
+        with open(os.path.join(self.directory, 'broken.xml'), 'w', encoding='utf-8') as f:
+            f.write('<devops-config>')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_results_and_summary(self):
+        """Test un résultat par fichier, publié au fil de l'eau, et le résumé agrégé"""
+        for streaming in (False, True):
+            streamed = []
+            results, summary = validate_bulk([self.directory], workers=2, streaming=streaming,
+                                             on_result=streamed.append)
+            self.assertEqual(len(streamed), 3)
+            statuses = {os.path.basename(result['file']): result['status'] for result in results}
+            self.assertEqual(statuses, {'broken.xml': 'error', 'invalid.xml': 'invalid', 'sample-config.xml': 'valid'})
+            self.assertEqual((summary['files'], summary['valid'], summary['invalid'], summary['errors']), (3, 1, 1, 1))
+            self.assertTrue(all(result['duration_ms'] >= 0 for result in results))
+            self.assertEqual(summary['max_ms'], max(result['duration_ms'] for result in results))
+
+    def test_junit_report(self):
+        """Test le rapport JUnit : un testcase par fichier, échecs et erreurs distingués"""
+        results, summary = validate_bulk([self.directory], workers=1)
+        suite = etree.fromstring(junit_report(results, summary)).find('testsuite')
+        self.assertEqual((suite.get('tests'), suite.get('failures'), suite.get('errors')), ('3', '1', '1'))
+        cases = {os.path.basename(case.get('name')): case for case in suite.iter('testcase')}
+        self.assertIsNotNone(cases['invalid.xml'].find('failure'))
+        self.assertIsNotNone(cases['broken.xml'].find('error'))
+        self.assertEqual(len(cases['sample-config.xml']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Tests unitaires pour le cache LRU des résultats
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import ResultCache, content_key
+
+
+class TestResultCache(unittest.TestCase):
+
+    def test_lru_eviction_by_bytes(self):
+        """Test éviction des entrées les moins récentes au-delà du budget"""
+        cache = ResultCache(max_bytes=10)
+        cache.put('a', b'1234')
+        cache.put('b', b'1234')
+        cache.get('a')
+        cache.put('c', b'1234')
+
+        self.assertEqual(cache.get('a'), b'1234')
+        self.assertIsNone(cache.get('b'))
+        stats = cache.stats()
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['bytes'], 8)
+
+    def test_oversized_value_rejected(self):
+        """Test refus d'une valeur plus grande que le budget"""
+        cache = ResultCache(max_bytes=4)
+        self.assertFalse(cache.put('a', b'12345'))
+        self.assertEqual(cache.stats()['rejected'], 1)
+
+    def test_replace_updates_size(self):
+        """Test remplacement d'une entrée existante"""
+        cache = ResultCache(max_bytes=100)
+        cache.put('a', b'1234')
+        cache.put('a', b'12')
+        self.assertEqual(cache.stats()['bytes'], 2)
+
+    def test_content_key(self):
+        """Test empreinte insensible au type mais sensible au découpage"""
+        self.assertEqual(content_key('ab', 'c'), content_key(b'ab', b'c'))
+        self.assertNotEqual(content_key('ab', 'c'), content_key('a', 'bc'))
+
+
+if __name__ == '__main__':
+    unittest.main()
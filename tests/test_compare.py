@@ -0,0 +1,107 @@
+"""
+Tests unitaires pour la comparaison d'environnements
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import parse_xml, EXAMPLES_DIR
+from compare import diff_environments
+
+
+XML = '''<devops-config version="1.0">
+    <application><name>app</name><version>1</version></application>
+    <environments>
+        <environment>
+            <name>dev</name>
+            <services>
+                <service>
+                    <name>web</name><image>nginx</image><tag>alpine</tag>
+                    <ports><port><host>8080</host><container>80</container></port></ports>
+                    <environment><variable><name>MODE</name><value>debug</value></variable></environment>
+                </service>
+                <service><name>a"b</name><image>busybox</image></service>
+                <service><name>worker</name><image>python</image></service>
+            </services>
+            <kubernetes><resources><limits><cpu>250m</cpu></limits></resources></kubernetes>
+        </environment>
+        <environment>
+            <name>it's-prod</name>
+            <services>
+                <service>
+                    <name>web</name><image>nginx</image><tag>1.25</tag>
+                    <ports><port><host>80</host><container>80</container></port></ports>
+                    <depends_on><service>db</service></depends_on>
+                    <replicas>3</replicas>
+                </service>
+                <service><name>a"b</name><image>busybox</image></service>
+                <service><name>db</name><image>postgres</image></service>
+            </services>
+            <kubernetes><resources><limits><cpu>1</cpu></limits></resources></kubernetes>
+        </environment>
+    </environments>
+</devops-config>'''
+
+
+class TestCompare(unittest.TestCase):
+
+    def setUp(self):
+        self.comparison = diff_environments(parse_xml(XML), 'dev', "it's-prod")
+
+    def fields(self, service):
+        return {d['field']: (d['env1_value'], d['env2_value'])
+                for d in self.comparison['differences'] if d['service'] == service}
+
+    def test_service_sets(self):
+        """Test des services propres et communs, noms avec guillemets"""
+        self.assertEqual(self.comparison['only_in_env1'], ['worker'])
+        self.assertEqual(self.comparison['only_in_env2'], ['db'])
+        self.assertEqual(self.comparison['common'], ['web', 'a"b'])
+
+    def test_all_service_fields(self):
+        """Test de la comparaison de tous les champs d'un service"""
+        fields = self.fields('web')
+        self.assertEqual(fields['tag'], ('alpine', '1.25'))
+        self.assertEqual(fields['ports'], (['8080:80/tcp'], ['80:80/tcp']))
+        self.assertEqual(fields['depends_on'], ([], ['db']))
+        self.assertEqual(fields['replicas'], (None, '3'))
+        self.assertEqual(fields['environment.MODE'], ('debug', None))
+        self.assertNotIn('image', fields)
+        self.assertEqual(self.fields('a"b'), {})
+
+    def test_kubernetes_resources(self):
+        """Test de la comparaison des ressources Kubernetes"""
+        differences = {d['field']: (d['env1_value'], d['env2_value'])
+                       for d in self.comparison['environment_differences']}
+        self.assertEqual(differences['kubernetes.resources.limits.cpu'], ('250m', '1'))
+
+    def test_kubernetes_service_ports(self):
+        """Test de la comparaison du type et des ports du service Kubernetes"""
+        def service(service_type, port, protocol=''):
+            return (f'<service><type>{service_type}</type><ports><port><port>{port}</port>'
+                    f'<target_port>8080</target_port>{protocol}</port></ports></service>')
+        xml = XML.replace(
+            '<limits><cpu>250m</cpu></limits></resources>',
+            '<limits><cpu>250m</cpu></limits></resources>' + service('ClusterIP', 80)
+        ).replace(
+            '<limits><cpu>1</cpu></limits></resources>',
+            '<limits><cpu>1</cpu></limits></resources>' + service('ClusterIP', 443, '<protocol>UDP</protocol>')
+        )
+        comparison = diff_environments(parse_xml(xml), 'dev', "it's-prod")
+        differences = {d['field']: (d['env1_value'], d['env2_value']) for d in comparison['environment_differences']}
+        self.assertEqual(differences['kubernetes.service.ports'], (['80:8080/TCP'], ['443:8080/UDP']))
+        self.assertNotIn('kubernetes.service.type', differences)
+
+    def test_identical_environment(self):
+        """Test d'un environnement comparé à lui-même"""
+        with open(os.path.join(EXAMPLES_DIR, 'sample-config.xml'), encoding='utf-8') as f:
+            comparison = diff_environments(parse_xml(f.read()), 'prod', 'prod')
+        self.assertEqual(comparison['differences'], [])
+        self.assertEqual(comparison['environment_differences'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Tests unitaires pour l'export de configuration (/api/export)
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import parse_xml, export_tree, EXAMPLES_DIR
+from benchmarks.generator import generate_config
+
+
+def legacy_export(xml_doc):
+    """Ancienne implémentation de l'export, conservée comme référence"""
+    config = {
+        'application': {
+            'name': xml_doc.xpath('//application/name/text()')[0] if xml_doc.xpath('//application/name/text()') else '',
+            'version': xml_doc.xpath('//application/version/text()')[0] if xml_doc.xpath('//application/version/text()') else '',
+            'description': xml_doc.xpath('//application/description/text()')[0] if xml_doc.xpath('//application/description/text()') else ''
+        },
+        'environments': []
+    }
+    for env in xml_doc.xpath('//environment'):
+        env_config = {'name': env.xpath('name/text()')[0], 'services': [], 'variables': []}
+        for service in env.xpath('.//service'):
+            env_config['services'].append({
+                'name': service.xpath('name/text()')[0] if service.xpath('name/text()') else '',
+                'image': service.xpath('image/text()')[0] if service.xpath('image/text()') else '',
+                'tag': service.xpath('tag/text()')[0] if service.xpath('tag/text()') else ''
+            })
+        for var in env.xpath('.//variables/variable'):
+            env_config['variables'].append({
+                'name': var.xpath('name/text()')[0] if var.xpath('name/text()') else '',
+                'value': var.xpath('value/text()')[0] if var.xpath('value/text()') else ''
+            })
+        config['environments'].append(env_config)
+    return config
+
+
+class TestExport(unittest.TestCase):
+
+    def test_same_output_as_legacy(self):
+        """Test d'une sortie identique à l'ancienne implémentation"""
+        xml_doc = parse_xml(generate_config(
+            environments=4, services=12, service_variables=0, depends_on=False, kubernetes=False
+        ))
+        self.assertEqual(export_tree(xml_doc), legacy_export(xml_doc))
+
+    def test_service_level_environment(self):
+        """Test des variables propres aux services (l'ancienne version échouait)"""
+        with open(os.path.join(EXAMPLES_DIR, 'sample-config.xml'), encoding='utf-8') as f:
+            config = export_tree(parse_xml(f.read()))
+        names = [env['name'] for env in config['environments']]
+        self.assertEqual(names, ['dev', 'prod'])
+        for env in config['environments']:
+            self.assertTrue(all(service['name'] for service in env['services']))
+
+    def test_depends_on_not_exported_as_service(self):
+        """Test que depends_on/service n'est pas pris pour un service"""
+        config = export_tree(parse_xml(generate_config(environments=1, services=3)))
+        self.assertEqual([s['name'] for s in config['environments'][0]['services']], ['svc0', 'svc1', 'svc2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Tests du rendu incrémental par fragments (kubernetes, docker-compose)
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, parse_xml, transform_tree, render_target, registry, TRANSFORM_TARGETS, EXAMPLES_DIR
+from benchmarks.generator import generate_config
+from cache import ResultCache
+from fragments import FragmentRenderer
+
+
+class TestFragmentRenderer(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResultCache(8 * 1024 * 1024)
+        self.renderer = FragmentRenderer(registry, self.cache, TRANSFORM_TARGETS)
+        self.xml = generate_config(environments=2, services=8, ports=2, variables=3, secrets=2)
+
+    def test_identical_to_full_render(self):
+        """Test sortie identique octet pour octet à la feuille d'origine"""
+        documents = [self.xml]
+        for filename in ('sample-config.xml', 'annotated-config.xml'):
+            with open(os.path.join(EXAMPLES_DIR, filename), encoding='utf-8') as f:
+                documents.append(f.read())
+        for xml_content in documents:
+            xml_doc = parse_xml(xml_content)
+            for environment in xml_doc.xpath('/devops-config/environments/environment/name/text()'):
+                for target in ('kubernetes', 'docker-compose'):
+                    expected = transform_tree(xml_doc, TRANSFORM_TARGETS[target], environment)['content']
+                    for _ in range(2):
+                        content, _ = self.renderer.render(xml_doc, target, environment)
+                        self.assertEqual(content, expected, f'{target} {environment}')
+
+    def test_only_edited_service_rendered(self):
+        """Test une modification de service ne rend que ses fragments"""
+        self.renderer.render(parse_xml(self.xml), 'kubernetes', 'env0')
+        edited = parse_xml(self.xml.replace('<name>svc3</name>', '<name>svc3-bis</name>', 1))
+        content, stats = self.renderer.render(edited, 'kubernetes', 'env0')
+        self.assertEqual(stats, {'fragments': 2 + 2 * 8, 'rendered': 2})
+        self.assertIn('name: svc3-bis-env0', content)
+        self.assertEqual(content, transform_tree(edited, TRANSFORM_TARGETS['kubernetes'], 'env0')['content'])
+
+    def test_environment_context_invalidates_services(self):
+        """Test une variable d'environnement modifiée rend à nouveau tous les fragments"""
+        self.renderer.render(parse_xml(self.xml), 'docker-compose', 'env0')
+        edited = parse_xml(self.xml.replace('<value>value-0-0</value>', '<value>changed</value>', 1))
+        content, stats = self.renderer.render(edited, 'docker-compose', 'env0')
+        self.assertEqual(stats['rendered'], stats['fragments'])
+        self.assertIn('changed', content)
+
+    def test_unknown_or_duplicate_environment(self):
+        """Test repli sur la feuille d'origine si l'environnement est absent ou dupliqué"""
+        self.assertIsNone(self.renderer.render(parse_xml(self.xml), 'kubernetes', 'missing'))
+        duplicated = self.xml.replace('<name>env1</name>', '<name>env0</name>')
+        self.assertIsNone(self.renderer.render(parse_xml(duplicated), 'kubernetes', 'env0'))
+
+    def test_api_mode(self):
+        """Test INCREMENTAL_RENDERING dans le pipeline de l'API"""
+        app.config['INCREMENTAL_RENDERING'] = True
+        try:
+            xml_doc = parse_xml(self.xml)
+            payload, status = render_target(xml_doc, 'kubernetes', 'env1')
+        finally:
+            app.config['INCREMENTAL_RENDERING'] = False
+        self.assertEqual(status, 200)
+        self.assertEqual(payload['content'], transform_tree(xml_doc, TRANSFORM_TARGETS['kubernetes'], 'env1')['content'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+"""
+Tests des configurations multi-fichiers (XInclude) et du cache des fichiers inclus
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+from lxml import etree
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from app import app
+from benchmarks.generator import generate_config, split_config
+from includes import IncludeError, IncludeResolver
+
+XI = 'xmlns:xi="http://www.w3.org/2001/XInclude"'
+
+
+def canonical(xml_doc):
+    return etree.tostring(xml_doc, method='c14n', exclusive=True)
+
+
+class TestIncludeResolver(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        self.resolver = IncludeResolver()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def resolve(self, xml_content):
+        xml_doc = etree.fromstring(xml_content.encode('utf-8')).getroottree()
+        self.resolver.resolve(xml_doc, self.root)
+        return xml_doc
+
+    def test_same_tree_as_merged_document(self):
+        """Test arbre résolu identique au document d'un seul tenant"""
+        merged = generate_config(environments=3, services=4)
+        main = split_config(merged, self.root)
+        self.assertEqual(canonical(self.resolve(main)), canonical(etree.fromstring(merged.encode('utf-8'))))
+
+    def test_only_changed_file_reparsed(self):
+        """Test seul le fichier modifié est reparsé ; l'empreinte change avec lui"""
+        main = split_config(generate_config(environments=3, services=2), self.root)
+        self.resolve(main)
+        before = self.resolver.fingerprint(etree.fromstring(main.encode('utf-8')), self.root)
+        self.assertEqual(self.resolver.stats()['parses'], 3)
+
+        path = os.path.join(self.root, 'environments', 'env1.xml')
+        with open(path, encoding='utf-8') as f:
+            content = f.read().replace('value-1-0', 'changed')
+        self.write('environments/env1.xml', content)
+        os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1))
+
+        xml_doc = self.resolve(main)
+        self.assertEqual(self.resolver.stats()['parses'], 4)
+        self.assertEqual(xml_doc.xpath("string(//environment[name='env1']/variables/variable/value)"), 'changed')
+        self.assertNotEqual(self.resolver.fingerprint(etree.fromstring(main.encode('utf-8')), self.root), before)
+
+    def test_nested_relative_includes(self):
+        """Test chemins relatifs au fichier qui contient l'inclusion"""
+        self.write('envs/dev.xml', f'<environment {XI}><name>dev</name><xi:include href="services.xml"/></environment>')
+        self.write('envs/services.xml', '<services><service><name>web</name><image>nginx</image></service></services>')
+        xml_doc = self.resolve(
+            f'<devops-config {XI}><environments><xi:include href="envs/dev.xml"/></environments></devops-config>'
+        )
+        self.assertEqual(xml_doc.xpath('string(//environment/services/service/name)'), 'web')
+        self.assertEqual(xml_doc.xpath('count(//*[local-name()="include"])'), 0)
+
+    def test_fallback(self):
+        """Test xi:fallback utilisé si le fichier est absent"""
+        xml_doc = self.resolve(
+            f'<devops-config {XI}><environments><xi:include href="missing.xml">'
+            '<xi:fallback><environment><name>default</name></environment></xi:fallback>'
+            '</xi:include></environments></devops-config>'
+        )
+        self.assertEqual(xml_doc.xpath('string(//environment/name)'), 'default')
+
+    def test_rejected_includes(self):
+        """Test inclusions refusées : hors racine, distante, circulaire, absente, xpointer"""
+        self.write('loop.xml', f'<environment {XI}><xi:include href="loop.xml"/></environment>')
+        for href, attributes in (
+            ('../outside.xml', ''),
+            ('/etc/hostname', ''),
+            ('http://example.com/env.xml', ''),
+            ('loop.xml', ''),
+            ('missing.xml', ''),
+            ('loop.xml', ' xpointer="xpointer(/)"')
+        ):
+            with self.subTest(href=href):
+                with self.assertRaises(IncludeError):
+                    self.resolve(f'<devops-config {XI}><xi:include href="{href}"{attributes}/></devops-config>')
+
+
+class TestIncludeApi(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.merged = generate_config(environments=2, services=2)
+        self.main = split_config(self.merged, self.directory.name)
+        self.client = app.test_client()
+        app.config['INCLUDE_ROOT'] = self.directory.name
+
+    def tearDown(self):
+        app.config['INCLUDE_ROOT'] = ''
+        self.directory.cleanup()
+
+    def post(self, url, payload):
+        return self.client.post(url, json=payload).get_json()
+
+    def test_transform_and_validate(self):
+        """Test sortie identique au document fusionné, dans tous les modes de validation"""
+        expected = self.post('/api/transform/kubernetes', {'xml': self.merged, 'environment': 'env1'})
+        actual = self.post('/api/transform/kubernetes', {'xml': self.main, 'environment': 'env1'})
+        self.assertEqual(actual['content'], expected['content'])
+        for mode in ('tree', 'streaming', 'incremental'):
+            self.assertTrue(self.post('/api/validate', {'xml': self.main, 'mode': mode})['valid'], mode)
+
+    def test_cache_follows_included_files(self):
+        """Test réponse en cache invalidée quand un fichier inclus change"""
+        first = self.post('/api/transform/docker-compose', {'xml': self.main, 'environment': 'env0'})
+        path = os.path.join(self.directory.name, 'environments', 'env0.xml')
+        with open(path, encoding='utf-8') as f:
+            content = f.read().replace('value-0-0', 'changed')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        second = self.post('/api/transform/docker-compose', {'xml': self.main, 'environment': 'env0'})
+        self.assertNotIn('changed', first['content'])
+        self.assertIn('VAR_0=changed', second['content'])
+        self.assertGreaterEqual(app_module.include_resolver.stats()['parses'], 3)
+
+    def test_main_document_parsed_once(self):
+        """Test document principal parsé une seule fois pour la clé de cache et le rendu"""
+        app_module.result_cache.clear()
+        app_module.model_cache.clear()
+        main = self.main.encode('utf-8')
+        for url, payload in (
+            ('/api/transform/kubernetes', {'xml': self.main, 'environment': 'env0'}),
+            ('/api/export', {'xml': self.main})
+        ):
+            with mock.patch.object(etree, 'fromstring', wraps=etree.fromstring) as fromstring:
+                self.assertTrue(self.post(url, payload)['success'], url)
+            self.assertEqual(sum(1 for call in fromstring.call_args_list if call.args[0] == main), 1, url)
+
+    def test_disabled_or_invalid(self):
+        """Test inclusions désactivées (XML invalide) ou hors racine (erreur explicite)"""
+        outside = self.main.replace('environments/env0.xml', '../env0.xml')
+        body = self.post('/api/validate', {'xml': outside})
+        self.assertFalse(body['valid'])
+        self.assertIn('hors de la racine', body['message'])
+        app.config['INCLUDE_ROOT'] = ''
+        self.assertFalse(self.post('/api/validate', {'xml': self.main})['valid'])
+
+
+
+class TestIncludeProcessMode(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.main = split_config(generate_config(environments=2, services=2), cls.directory.name)
+        if app_module._worker_pool is not None:
+            app_module._worker_pool.shutdown()
+            app_module._worker_pool = None
+        app.config.update(
+            WORKER_MODE='process', WORKER_PROCESSES=1, WORKER_QUEUE_SIZE=1, INCLUDE_ROOT=cls.directory.name
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        app.config.update(WORKER_MODE='thread', INCLUDE_ROOT='')
+        if app_module._worker_pool is not None:
+            app_module._worker_pool.shutdown()
+            app_module._worker_pool = None
+        cls.directory.cleanup()
+
+    def test_validate_and_transform_in_worker(self):
+        """Test inclusions résolues dans les processus du pool"""
+        client = app.test_client()
+        self.assertTrue(client.post('/api/validate', json={'xml': self.main}).get_json()['valid'])
+        body = client.post('/api/transform/docker-compose', json={'xml': self.main, 'environment': 'env1'}).get_json()
+        self.assertTrue(body['success'])
+        self.assertIn('VAR_0=value-1-0', body['content'])
+
+
+if __name__ == '__main__':
+    unittest.main()
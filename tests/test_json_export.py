@@ -0,0 +1,52 @@
+"""
+Tests unitaires pour l'export JSON natif
+"""
+
+import unittest
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import parse_xml, transform_xml, json_exporter, EXAMPLES_DIR, JSON_XSLT
+
+
+class TestJsonExport(unittest.TestCase):
+
+    def test_matches_xslt_output(self):
+        """Test d'une structure identique à xslt/json.xslt sur les exemples"""
+        for filename in ('sample-config.xml', 'annotated-config.xml'):
+            with open(os.path.join(EXAMPLES_DIR, filename), encoding='utf-8') as f:
+                xml_content = f.read()
+            xml_doc = parse_xml(xml_content)
+            for environment in xml_doc.xpath('//environment/name/text()'):
+                expected = json.loads(transform_xml(xml_content, JSON_XSLT, environment)['content'])
+                actual = json_exporter.export(xml_doc, environment)
+                self.assertEqual(actual, expected, f'{filename} / {environment}')
+                self.assertEqual(list(actual), list(expected))
+
+    def test_integer_fields_from_schema(self):
+        """Test des types entiers déduits du schéma"""
+        self.assertIn('host', json_exporter.integer_fields['portType'])
+        self.assertIn('replicas', json_exporter.integer_fields['serviceType'])
+        self.assertNotIn('name', json_exporter.integer_fields['serviceType'])
+
+    def test_special_characters(self):
+        """Test des guillemets, que json.xslt n'échappe pas"""
+        xml_doc = parse_xml('''<devops-config version="1.0">
+    <application><name>app</name><version>1</version></application>
+    <environments>
+        <environment>
+            <name>dev</name>
+            <services><service><name>web</name><image>nginx</image>
+                <command>sh -c "echo ok"</command></service></services>
+        </environment>
+    </environments>
+</devops-config>''')
+        data = json_exporter.export(xml_doc, 'dev')
+        self.assertEqual(data['services'][0]['command'], 'sh -c "echo ok"')
+
+
+if __name__ == '__main__':
+    unittest.main()
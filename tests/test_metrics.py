@@ -0,0 +1,74 @@
+"""
+Tests unitaires pour les métriques Prometheus
+"""
+
+import unittest
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics as metrics_module
+from metrics import MetricsRegistry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def test_counter_and_histogram_text(self):
+        """Test rendu des compteurs et histogrammes cumulés"""
+        registry = MetricsRegistry('test')
+        registry.describe('latency_seconds', 'Latence', buckets=(0.1, 1))
+        registry.inc('hits_total', endpoint='/a')
+        registry.inc('hits_total', 2, endpoint='/a')
+        registry.observe('latency_seconds', 0.05)
+        registry.observe('latency_seconds', 0.5)
+        registry.observe('latency_seconds', 3)
+
+        text = registry.render()
+        self.assertIn('test_hits_total{endpoint="/a"} 3', text)
+        self.assertIn('# TYPE test_latency_seconds histogram', text)
+        self.assertIn('test_latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('test_latency_seconds_bucket{le="1"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn('test_latency_seconds_sum 3.55', text)
+        self.assertIn('test_latency_seconds_count 3', text)
+
+    def test_threads_aggregated(self):
+        """Test agrégation des fragments de threads terminés ou actifs"""
+        registry = MetricsRegistry('test')
+
+        def work():
+            for _ in range(100):
+                registry.inc('ops_total')
+
+        threads = [threading.Thread(target=work) for _ in range(metrics_module.MAX_LIVE_SHARDS + 10)]
+        for thread in threads:
+            thread.start()
+            thread.join()
+        self.assertLessEqual(len(registry._shards), metrics_module.MAX_LIVE_SHARDS)
+        self.assertIn(f'test_ops_total {100 * len(threads)}', registry.render())
+
+    def test_stage_timer_and_collector(self):
+        """Test chronomètre d'étape et jauges fournies par un collecteur"""
+        registry = MetricsRegistry('test')
+        registry.add_collector(lambda: [('cache_bytes', 'Octets', [({}, 42)])])
+        with registry.stage('xml_parse', endpoint='/x'):
+            pass
+
+        text = registry.render()
+        self.assertIn('test_stage_duration_seconds_count{endpoint="/x",stage="xml_parse"} 1', text)
+        self.assertIn('# TYPE test_cache_bytes gauge', text)
+        self.assertIn('test_cache_bytes 42', text)
+
+    def test_disabled(self):
+        """Test aucun enregistrement quand les métriques sont désactivées"""
+        registry = MetricsRegistry('test', enabled=False)
+        registry.inc('hits_total')
+        with registry.stage('xml_parse'):
+            pass
+        self.assertEqual(registry.render(), '\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
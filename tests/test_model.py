@@ -0,0 +1,98 @@
+"""
+Tests du modèle compact de configuration
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, parse_xml, model_cache, EXAMPLES_DIR
+from model import build_config, Service
+
+
+XML = '''<devops-config version="1.0">
+    <application><name>app</name><version>1</version></application>
+    <environments>
+        <environment>
+            <name>dev</name>
+            <services>
+                <service>
+                    <name>web</name><image>nginx</image><tag></tag>
+                    <ports><port><host>80</host><container>8080</container></port></ports>
+                    <volumes><volume><host_path>/a</host_path><container_path>/b</container_path><mode>ro</mode></volume></volumes>
+                    <environment><variable><name>MODE</name><value>debug</value></variable></environment>
+                    <depends_on><service>db</service><service>cache</service></depends_on>
+                </service>
+            </services>
+            <secrets><secret><name>TOKEN</name><source>vault</source></secret></secrets>
+            <kubernetes>
+                <namespace>dev</namespace>
+                <resources><requests><memory>64Mi</memory></requests><requests><cpu>100m</cpu></requests></resources>
+            </kubernetes>
+        </environment>
+    </environments>
+</devops-config>'''
+
+
+class TestModel(unittest.TestCase):
+
+    def setUp(self):
+        self.config = build_config(parse_xml(XML))
+        self.env = self.config.environment('dev')
+
+    def test_structure(self):
+        """Test des entités construites en un seul parcours"""
+        self.assertEqual((self.config.application.name, self.config.application.description), ('app', None))
+        service = self.env.services[0]
+        self.assertEqual((service.name, service.image), ('web', 'nginx'))
+        self.assertEqual([(p.host, p.container, p.protocol) for p in service.ports], [('80', '8080', None)])
+        self.assertEqual(service.volumes[0].mode, 'ro')
+        self.assertEqual([(v.name, v.value) for v in service.variables], [('MODE', 'debug')])
+        self.assertEqual(service.depends_on, ('db', 'cache'))
+        self.assertEqual((self.env.secrets[0].source, self.env.secrets[0].key), ('vault', None))
+        self.assertIsNone(self.config.environment('prod'))
+
+    def test_absent_and_empty_values(self):
+        """Test '' pour un élément vide, None pour un élément absent"""
+        service = self.env.services[0]
+        self.assertEqual(service.tag, '')
+        self.assertIsNone(service.command)
+        self.assertEqual(self.env.variables, ())
+
+    def test_kubernetes_first_values(self):
+        """Test des ressources : première valeur de chaque champ dans l'ordre du document"""
+        kubernetes = self.env.kubernetes
+        self.assertEqual(kubernetes.namespace, 'dev')
+        self.assertEqual((kubernetes.requests.cpu, kubernetes.requests.memory), ('100m', '64Mi'))
+        self.assertIsNone(kubernetes.limits)
+        self.assertIsNone(kubernetes.service_type)
+        self.assertEqual(kubernetes.service_ports, ())
+
+    def test_slots(self):
+        """Test des classes compactes (pas de __dict__ par instance)"""
+        self.assertFalse(hasattr(Service(), '__dict__'))
+
+    def test_shared_by_endpoints(self):
+        """Test d'un seul modèle construit pour environments, compare et export"""
+        with open(os.path.join(EXAMPLES_DIR, 'sample-config.xml'), encoding='utf-8') as f:
+            xml_content = f.read()
+        model_cache.clear()
+        before = model_cache.stats()
+        client = app.test_client()
+        environments = client.post('/api/environments', json={'xml': xml_content}).get_json()['environments']
+        self.assertEqual(environments, ['dev', 'prod'])
+        comparison = client.post('/api/compare', json={
+            'xml': xml_content, 'environment1': 'dev', 'environment2': 'prod'
+        }).get_json()
+        self.assertTrue(comparison['success'])
+        export = client.post('/api/export', json={'xml': xml_content}).get_json()
+        self.assertEqual(export['config']['application']['name'], 'my-web-app')
+        stats = model_cache.stats()
+        self.assertEqual(stats['misses'] - before['misses'], 1)
+        self.assertEqual(stats['hits'] - before['hits'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
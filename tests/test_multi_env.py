@@ -0,0 +1,84 @@
+"""
+Tests du rendu multi-environnements : un passage XSLT, sortie identique aux appels séparés
+"""
+
+import unittest
+import sys
+import os
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, multi_env_renderer, transform_tree, TRANSFORM_TARGETS, EXAMPLES_DIR
+from multi_env import MULTI_ENV_TARGETS
+from tests.test_native_render import corpus
+
+
+class TestMultiEnvironmentRender(unittest.TestCase):
+
+    def test_identical_to_separate_calls(self):
+        """Test d'une sortie identique, environnement par environnement, à N appels séparés"""
+        for name, xml_doc in corpus():
+            environments = list(dict.fromkeys(xml_doc.xpath('/devops-config/environments/environment/name/text()')))
+            for target in MULTI_ENV_TARGETS:
+                expected = {
+                    environment: transform_tree(xml_doc, TRANSFORM_TARGETS[target], environment)['content']
+                    for environment in environments
+                }
+                self.assertEqual(multi_env_renderer.render(xml_doc, target), expected, f'{target} / {name}')
+                requested = environments[::-1] + ['missing']
+                outputs = multi_env_renderer.render(xml_doc, target, requested)
+                self.assertEqual(list(outputs), requested)
+                self.assertEqual(outputs['missing'], '')
+
+    def test_api(self):
+        """Test environment="*", liste d'environnements et formats de sortie"""
+        with open(os.path.join(EXAMPLES_DIR, 'sample-config.xml'), encoding='utf-8') as f:
+            xml_content = f.read()
+        client = app.test_client()
+        body = client.post('/api/transform/kubernetes', json={
+            'xml': xml_content, 'environment': ['prod', 'dev'], 'format': 'map'
+        }).get_json()
+        self.assertTrue(body['success'])
+        self.assertEqual(body['environments'], ['prod', 'dev'])
+        self.assertEqual(sorted(body['content']), ['dev', 'prod'])
+        single = client.post('/api/transform/kubernetes', json={'xml': xml_content, 'environment': 'prod'}).get_json()
+        self.assertEqual(body['content']['prod'], single['content'])
+
+        for engine in ('xslt', 'native'):
+            body = client.post('/api/transform/docker-compose', json={
+                'xml': xml_content, 'environment': '*', 'engine': engine
+            }).get_json()
+            documents = [document for document in yaml.safe_load_all(body['content']) if document]
+            self.assertEqual(len(documents), len(body['environments']))
+            self.assertTrue(all('services' in document for document in documents))
+
+        response = client.post('/api/transform/helm', json={'xml': xml_content, 'environment': '*', 'format': 'zip'})
+        self.assertEqual(response.status_code, 400)
+
+        for environments, expected in (('dev', ['dev']), ('prod,dev', ['prod', 'dev'])):
+            body = client.post('/api/transform/kubernetes', json={
+                'xml': xml_content, 'environments': environments, 'format': 'map'
+            }).get_json()
+            self.assertEqual(body['environments'], expected)
+            self.assertTrue(all(body['content'].values()))
+        for environments in (['nope'], [1], {'dev': True}):
+            response = client.post('/api/transform/kubernetes', json={'xml': xml_content, 'environments': environments})
+            self.assertEqual(response.status_code, 400, environments)
+            self.assertFalse(response.get_json()['success'])
+        response = client.post('/api/transform/kubernetes?stream=ndjson', json={
+            'xml': xml_content, 'environments': ['nope']
+        })
+        self.assertEqual(response.status_code, 400)
+
+        for target in ('json', 'github-actions', 'jenkins'):
+            for environment in ('*', ['dev', 'prod']):
+                response = client.post(f'/api/transform/{target}', json={'xml': xml_content, 'environment': environment})
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.get_json()['success'])
+                self.assertIn(target, response.get_json()['message'])
+
+
+if __name__ == '__main__':
+    unittest.main()
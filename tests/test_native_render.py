@@ -0,0 +1,103 @@
+"""
+Tests du rendu natif kubernetes / docker-compose : sortie identique aux feuilles XSLT
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, parse_xml, transform_tree, TRANSFORM_TARGETS, EXAMPLES_DIR
+from benchmarks.generator import generate_config
+from native_render import NATIVE_RENDERERS
+
+# Cas limites des règles XPath : commentaires dans les valeurs, éléments
+# vides ou répétés, environnement dupliqué, espaces multiples dans command
+EDGE_CASES = '''<devops-config version="1.0">
+    <application><name>ed<!-- c -->ge</name><version>1</version></application>
+    <environments>
+        <environment>
+            <name>dev</name>
+            <services>
+                <service><name>web</name><image>nginx</image><tag/><replicas></replicas>
+                    <ports>
+                        <port><host>53</host><container>53</container><protocol>tcp</protocol><protocol>udp</protocol></port>
+                        <port><host>80</host><container>8080</container></port>
+                    </ports>
+                    <volumes>
+                        <volume><host_path>/a</host_path><container_path>/b</container_path><mode>rw</mode></volume>
+                        <volume><host_path>/c</host_path><container_path>/d</container_path><mode>ro</mode></volume>
+                    </volumes>
+                    <environment><variable><name>ONLY_NAME</name></variable></environment>
+                    <depends_on><service>db<?pi x?>1</service></depends_on>
+                    <command>run  --flag value </command><working_dir/>
+                </service>
+                <service><image>anonymous</image><command/></service>
+            </services>
+            <secrets><secret><name>TOKEN</name></secret></secrets>
+            <kubernetes><namespace/><resources><limits><memory>1Gi</memory></limits></resources></kubernetes>
+        </environment>
+        <environment><name>dev</name><variables><variable><name>V</name><value>1</value></variable></variables></environment>
+        <environment><name>empty</name></environment>
+    </environments>
+</devops-config>'''
+
+
+def corpus():
+    """(nom, document) : exemples du dépôt, configurations générées, cas limites"""
+    documents = []
+    for filename in ('sample-config.xml', 'annotated-config.xml'):
+        with open(os.path.join(EXAMPLES_DIR, filename), encoding='utf-8') as f:
+            documents.append((filename, parse_xml(f.read())))
+    shapes = [
+        {'environments': 3, 'services': 5},
+        {'environments': 2, 'services': 3, 'ports': 0, 'volumes': 0, 'service_variables': 0},
+        {'environments': 2, 'services': 3, 'variables': 0, 'secrets': 0, 'kubernetes': False, 'depends_on': False},
+        {'environments': 1, 'services': 4, 'ports': 3, 'volumes': 2, 'variables': 5, 'secrets': 3}
+    ]
+    for shape in shapes:
+        documents.append((f'generated {shape}', parse_xml(generate_config(**shape))))
+    documents.append(('edge cases', parse_xml(EDGE_CASES)))
+    return documents
+
+
+class TestNativeRender(unittest.TestCase):
+
+    def test_byte_identical_to_xslt(self):
+        """Test d'une sortie identique octet pour octet sur tout le corpus"""
+        for name, xml_doc in corpus():
+            environments = xml_doc.xpath('/devops-config/environments/environment/name/text()')
+            for environment in set(environments) | {'missing'}:
+                for target, renderer in NATIVE_RENDERERS.items():
+                    expected = transform_tree(xml_doc, TRANSFORM_TARGETS[target], environment)['content']
+                    actual = renderer(xml_doc, environment)
+                    self.assertEqual(
+                        actual.encode('utf-8'), expected.encode('utf-8'), f'{target} / {name} / {environment}'
+                    )
+
+    def test_engine_switch(self):
+        """Test du choix du moteur par option de requête et par configuration"""
+        with open(os.path.join(EXAMPLES_DIR, 'sample-config.xml'), encoding='utf-8') as f:
+            xml_content = f.read()
+        client = app.test_client()
+        contents = {}
+        for engine in ('xslt', 'native'):
+            response = client.post('/api/transform/kubernetes', json={
+                'xml': xml_content, 'environment': 'prod', 'engine': engine
+            })
+            self.assertEqual(response.status_code, 200)
+            contents[engine] = response.get_json()['content']
+        self.assertEqual(contents['native'], contents['xslt'])
+
+        app.config['RENDER_ENGINE'] = 'native'
+        try:
+            response = client.post('/api/transform/docker-compose', json={'xml': xml_content, 'environment': 'dev'})
+        finally:
+            app.config['RENDER_ENGINE'] = 'xslt'
+        self.assertTrue(response.get_json()['success'])
+        self.assertIn('services:', response.get_json()['content'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Tests unitaires pour le registre des schémas et feuilles XSLT compilés
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lxml import etree
+from registry import CompiledRegistry
+from app import XSD_SCHEMA_PATH, KUBERNETES_XSLT, TRANSFORM_TARGETS
+
+
+XML = b'''<devops-config version="1.0">
+    <application><name>app</name><version>1</version></application>
+    <environments>
+        <environment>
+            <name>dev</name>
+            <services><service><name>web</name><image>nginx</image></service></services>
+        </environment>
+    </environments>
+</devops-config>'''
+
+
+class TestCompiledRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.xslt_path = os.path.join(self.tmpdir, 'kubernetes.xslt')
+        shutil.copy(KUBERNETES_XSLT, self.xslt_path)
+        self.registry = CompiledRegistry(XSD_SCHEMA_PATH, {'kubernetes': self.xslt_path})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_warm_up_compiles_once(self):
+        """Test compilation unique au démarrage"""
+        self.registry.warm_up()
+        for _ in range(5):
+            with self.registry.schema() as schema:
+                self.assertTrue(schema.validate(etree.fromstring(XML)))
+            with self.registry.stylesheet('kubernetes') as xslt:
+                self.assertIn('kind: Deployment', str(xslt(etree.fromstring(XML))))
+        stats = self.registry.stats()
+        self.assertEqual(stats['schema']['compile_count'], 1)
+        self.assertEqual(stats['stylesheets']['kubernetes']['compile_count'], 1)
+        self.assertEqual(stats['stylesheets']['kubernetes']['hits'], 5)
+
+    def test_recompile_on_content_change(self):
+        """Test recompilation uniquement si le contenu change"""
+        version = self.registry.version('kubernetes')
+
+        # Même contenu, mtime différent : pas de recompilation
+        os.utime(self.xslt_path, ns=(0, 0))
+        self.assertEqual(self.registry.version('kubernetes'), version)
+        self.assertEqual(self.registry.stats()['stylesheets']['kubernetes']['compile_count'], 1)
+
+        with open(self.xslt_path, 'a', encoding='utf-8') as f:
+            f.write('\n<!-- modifié -->\n')
+        self.assertNotEqual(self.registry.version('kubernetes'), version)
+        self.assertEqual(self.registry.stats()['stylesheets']['kubernetes']['compile_count'], 2)
+
+    def test_lookup_by_path(self):
+        """Test résolution par chemin de fichier"""
+        with self.registry.stylesheet(self.xslt_path) as xslt:
+            self.assertIsInstance(xslt, etree.XSLT)
+        self.assertEqual(self.registry.targets, ['kubernetes'])
+
+    def test_concurrent_borrow(self):
+        """Test emprunts concurrents depuis plusieurs threads"""
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(20):
+                    with self.registry.stylesheet('kubernetes') as xslt:
+                        result = str(xslt(etree.fromstring(XML)))
+                    if 'name: web-dev' not in result:
+                        errors.append(result)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        stats = self.registry.stats()['stylesheets']['kubernetes']
+        self.assertEqual(stats['compile_count'], 1)
+        self.assertEqual(stats['instances'], stats['idle_instances'])
+
+    def test_app_registry_targets(self):
+        """Test déclaration de toutes les cibles dans l'application"""
+        self.assertEqual(set(TRANSFORM_TARGETS), {
+            'docker-compose', 'kubernetes', 'helm', 'json', 'github-actions', 'jenkins'
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,11 +5,15 @@ Tests unitaires pour la validation XML
 import unittest
 import sys
 import os
+import re
 
 # Ajouter le répertoire parent au path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app import validate_xml
+from app import validate_xml, validate_streaming, XSD_SCHEMA_PATH
+from lxml import etree
+from validation import IncrementalValidator
+from benchmarks.generator import generate_config
 
 
 class TestValidation(unittest.TestCase):
@@ -82,5 +86,108 @@ class TestValidation(unittest.TestCase):
         self.assertFalse(result['valid'])
 
 
+class TestStreamingValidation(unittest.TestCase):
+
+    def test_valid_document(self):
+        """Test validation pendant le parsing d'un document valide"""
+        xml_doc, result = validate_streaming(generate_config(environments=2, services=3), keep_tree=True)
+        self.assertTrue(result['valid'])
+        self.assertEqual(result['mode'], 'streaming')
+        self.assertIn('parse_validation_ms', result['timings'])
+        self.assertEqual(xml_doc.getroot().tag, 'devops-config')
+
+    def test_stop_at_first_errors(self):
+        """Test arrêt après les N premières erreurs"""
+        xml_content = generate_config(environments=5, services=500).replace('<image>', '<img>').replace('</image>', '</img>')
+        result = validate_xml(xml_content, mode='streaming', max_errors=3)
+        self.assertFalse(result['valid'])
+        self.assertEqual(len(result['errors']), 3)
+        self.assertTrue(result['truncated'])
+
+    def test_syntax_error(self):
+        """Test erreur de syntaxe en mode streaming"""
+        result = validate_xml('<devops-config><application><name>test</name></application>', mode='streaming')
+        self.assertFalse(result['valid'])
+        self.assertTrue(result['message'].startswith('Erreur de syntaxe XML'))
+
+        result = validate_xml('<devops-config version="1"><application></devops-config>', mode='streaming')
+        self.assertFalse(result['valid'])
+        self.assertEqual(result['errors'][-1]['line'], 1)
+
+    def test_same_verdict_as_tree_mode(self):
+        """Test verdict identique aux deux modes"""
+        for xml_content in (
+            generate_config(environments=1, services=2),
+            generate_config(environments=1, services=2).replace('<tag>', '<label>').replace('</tag>', '</label>')
+        ):
+            tree = validate_xml(xml_content, mode='tree')
+            streaming = validate_xml(xml_content, mode='streaming')
+            self.assertEqual(tree['valid'], streaming['valid'])
+            self.assertIn('parse_ms', tree['timings'])
+            self.assertIn('validation_ms', tree['timings'])
+
+
+class TestIncrementalValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.validator = IncrementalValidator(XSD_SCHEMA_PATH)
+        self.xml = generate_config(environments=4, services=3)
+
+    def validate(self, xml_content):
+        source = xml_content.encode('utf-8')
+        return self.validator.validate(etree.fromstring(source).getroottree(), 'v1', source=source)
+
+    def test_only_changed_environment_revalidated(self):
+        """Test seuls les environnements modifiés sont revalidés"""
+        valid, errors, stats = self.validate(self.xml)
+        self.assertTrue(valid)
+        self.assertEqual(stats, {'environments': 4, 'revalidated': 4})
+
+        edited = self.xml.replace('<name>svc1</name>', '<name>svc1-bis</name>', 1)
+        valid, errors, stats = self.validate(edited)
+        self.assertTrue(valid)
+        self.assertEqual(stats['revalidated'], 1)
+
+    def test_errors_and_lines_match_tree_mode(self):
+        """Test erreurs et lignes identiques au mode tree, y compris après décalage"""
+        invalid = self.xml.replace('<tag>', '<label>', 1).replace('</tag>', '</label>', 1)
+        invalid = invalid.replace('<devops-config version="1.0">', '<devops-config>')
+        for xml_content in (invalid, invalid.replace('<devops-config>', '<!--\n\n-->\n<devops-config>')):
+            expected = validate_xml(xml_content, mode='tree')
+            valid, errors, _ = self.validate(xml_content)
+            self.assertFalse(valid)
+            self.assertEqual(errors, expected['errors'])
+        self.assertEqual(self.validator.stats()['hits'], 4)
+
+    def test_minified_document(self):
+        """Test environnements sur une même ligne : chacun validé, erreur détectée"""
+        minified = re.sub(r'>\s+<', '><', generate_config(environments=3, services=2))
+        start = minified.index('<name>env1</name>')
+        end = minified.index('</environment>', start)
+        invalid = minified[:start] + minified[start:end].replace('<image>', '<img>').replace('</image>', '</img>') + minified[end:]
+        self.assertTrue(self.validate(minified)[0])
+        expected = validate_xml(invalid, mode='tree')
+        self.assertFalse(expected['valid'])
+        valid, errors, stats = self.validate(invalid)
+        self.assertFalse(valid)
+        self.assertEqual(errors, expected['errors'])
+        self.assertFalse(validate_xml(invalid, mode='incremental')['valid'])
+
+    def test_without_source(self):
+        """Test empreintes calculées sur l'arbre sans texte source"""
+        xml_doc = etree.fromstring(self.xml.encode('utf-8')).getroottree()
+        self.validator.validate(xml_doc, 'v1')
+        _, _, stats = self.validator.validate(xml_doc, 'v1')
+        self.assertEqual(stats['revalidated'], 0)
+        _, _, stats = self.validator.validate(xml_doc, 'v2')
+        self.assertEqual(stats['revalidated'], 4)
+
+    def test_api_mode(self):
+        """Test mode 'incremental' de validate_xml"""
+        result = validate_xml(self.xml, mode='incremental')
+        self.assertTrue(result['valid'])
+        self.assertEqual(result['incremental']['environments'], 4)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,108 @@
+"""
+Tests du pool de processus (file bornée, délais, mode 'process' de l'API)
+"""
+
+import unittest
+import sys
+import os
+import json
+import signal
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from app import app
+from workers import JobTimeout, PoolBusy, WorkerPool
+
+XML_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples', 'sample-config.xml')
+
+
+class TestWorkerPool(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = WorkerPool(processes=1, max_queue=1, timeout=5, retry_after=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def test_queue_full_raises_busy(self):
+        """Test rejet immédiat quand workers et file sont occupés"""
+        running = self.pool.submit(time.sleep, 0.5)
+        queued = self.pool.submit(time.sleep, 0)
+        with self.assertRaises(PoolBusy) as context:
+            self.pool.submit(time.sleep, 0)
+        self.assertEqual(context.exception.retry_after, 3)
+        running.result()
+        queued.result()
+        self.assertGreaterEqual(self.pool.stats()['rejected'], 1)
+        self.assertIsNone(self.pool.run(time.sleep, 0))
+
+    def test_job_timeout(self):
+        """Test délai dépassé : le worker bloqué est arrêté et sa place libérée"""
+        recycled = self.pool.stats()['recycled']
+        with self.assertRaises(JobTimeout):
+            self.pool.run(time.sleep, 60, timeout=0.1)
+        self.assertEqual(self.pool.stats()['pending'], 0)
+        self.assertEqual(self.pool.stats()['recycled'], recycled + 1)
+        self.assertIsNone(self.pool.run(time.sleep, 0))
+
+    def test_killed_worker(self):
+        """Test pool reconstruit après la mort d'un worker"""
+        os.kill(self.pool.run(os.getpid), signal.SIGKILL)
+        time.sleep(0.2)
+        self.assertNotEqual(self.pool.run(os.getpid), os.getpid())
+        self.assertEqual(self.pool.stats()['pending'], 0)
+
+
+class TestProcessWorkerMode(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        app.config.update(WORKER_MODE='process', WORKER_PROCESSES=1, WORKER_QUEUE_SIZE=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        app.config['WORKER_MODE'] = 'thread'
+        if app_module._worker_pool is not None:
+            app_module._worker_pool.shutdown()
+            app_module._worker_pool = None
+
+    def setUp(self):
+        self.client = app.test_client()
+        app_module.result_cache.clear()
+        with open(XML_FILE, encoding='utf-8') as f:
+            self.xml = f.read()
+
+    def post(self, url, payload):
+        return self.client.post(url, data=json.dumps(payload), content_type='application/json')
+
+    def test_transform_and_validate_in_worker(self):
+        """Test réponses identiques au mode en ligne"""
+        response = self.post('/api/transform/kubernetes', {'xml': self.xml, 'environment': 'prod'})
+        self.assertEqual(response.status_code, 200)
+        expected = app_module.run_transform_pipeline('kubernetes', self.xml, 'prod')[0]
+        self.assertEqual(response.get_json()['content'], expected['content'])
+
+        response = self.post('/api/validate', {'xml': self.xml})
+        self.assertTrue(response.get_json()['valid'])
+
+    def test_worker_metrics_disabled(self):
+        """Test métriques désactivées dans les workers (elles ne sont pas exportées)"""
+        self.assertTrue(app_module.metrics.enabled)
+        self.assertFalse(app_module.get_worker_pool().run(eval, "__import__('app').metrics.enabled"))
+
+    def test_busy_returns_429(self):
+        """Test 429 avec Retry-After quand la file est pleine"""
+        pool = app_module.get_worker_pool()
+        running = pool.submit(time.sleep, 0.5)
+        response = self.post('/api/validate', {'xml': self.xml})
+        running.result()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers['Retry-After'], '1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,325 @@
+"""
+Validation XSD des configurations
+
+Trois modes :
+- 'tree' : parsing complet puis validation de l'arbre (mode historique) ;
+- 'streaming' : le schéma compilé est attaché au parser, la validation se
+  fait pendant la lecture et peut s'arrêter dès les N premières erreurs ;
+- 'incremental' : chaque environnement est validé séparément et son
+  résultat mis en cache selon l'empreinte de son sous-arbre.
+"""
+
+import copy
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+
+from lxml import etree
+
+VALIDATION_MODES = ('tree', 'streaming', 'incremental')
+
+# Taille des lectures en mode streaming : plus petit = arrêt plus précoce
+DEFAULT_READ_SIZE = 16 * 1024
+
+
+class _ChunkedReader:
+    """Limite la taille de chaque lecture faite par iterparse"""
+
+    def __init__(self, source, read_size):
+        self._source = source
+        self._read_size = read_size
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self._read_size:
+            size = self._read_size
+        return self._source.read(size)
+
+
+def error_entry(error):
+    """Convertit une entrée de error_log lxml en dict sérialisable
+
+    libxml2 ne fournit pas de numéro de ligne pour les erreurs détectées
+    pendant le parsing : 'line' vaut alors None.
+    """
+    return {
+        'line': error.line or None,
+        'message': error.message,
+        'level': error.level_name,
+        'column': getattr(error, 'column', None)
+    }
+
+
+def validate_document(xml_doc, xsd_schema, max_errors=None):
+    """Valide un arbre déjà parsé ; retourne (valide, erreurs)"""
+    if xsd_schema.validate(xml_doc):
+        return True, []
+    errors = []
+    for error in xsd_schema.error_log:
+        errors.append(error_entry(error))
+        if max_errors and len(errors) >= max_errors:
+            break
+    return False, errors
+
+
+def _open_source(source):
+    if isinstance(source, str) and not source.lstrip().startswith('<') and os.path.exists(source):
+        return open(source, 'rb')
+    if isinstance(source, str):
+        source = source.encode('utf-8')
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return BytesIO(source)
+    return source
+
+
+def validate_while_parsing(source, xsd_schema, max_errors=None, huge_tree=False,
+                           keep_tree=True, read_size=DEFAULT_READ_SIZE):
+    """Parse et valide en une passe ; retourne (arbre ou None, résultat)
+
+    source : contenu XML (str ou bytes), chemin de fichier ou objet fichier.
+    max_errors : arrête la lecture dès que ce nombre d'erreurs est atteint.
+    Les erreurs de validité n'ont pas de numéro de ligne dans ce mode.
+    keep_tree : si False, les éléments sont libérés au fil de la lecture
+    (mémoire bornée, utile pour valider de très gros fichiers).
+    """
+    stream = _open_source(source)
+    start = time.perf_counter()
+    events = etree.iterparse(
+        _ChunkedReader(stream, read_size),
+        events=('end',),
+        schema=xsd_schema,
+        huge_tree=huge_tree
+    )
+    truncated = False
+    syntax_error = None
+    root_closed = False
+    try:
+        for _, element in events:
+            root_closed = element.getparent() is None
+            if max_errors and len(events.error_log) >= max_errors:
+                truncated = True
+                break
+            if not keep_tree and element.getparent() is not None:
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+    except etree.XMLSyntaxError as e:
+        syntax_error = e
+    finally:
+        if stream is not source:
+            stream.close()
+    elapsed = (time.perf_counter() - start) * 1000
+
+    # Les erreurs de validité remontent aussi sous forme de XMLSyntaxError,
+    # levée à la fermeture du parser une fois l'élément racine refermé
+    schema_errors = [
+        error_entry(error) for error in events.error_log
+        if error.domain_name == 'SCHEMASV'
+    ]
+    if syntax_error is not None and schema_errors and root_closed:
+        syntax_error = None
+    if max_errors and len(schema_errors) > max_errors:
+        truncated = True
+        schema_errors = schema_errors[:max_errors]
+    timings = {'parse_validation_ms': round(elapsed, 3)}
+
+    if syntax_error is not None:
+        message = str(syntax_error)
+        if schema_errors and message.startswith(schema_errors[0]['message']):
+            # lxml réutilise alors le message de la première erreur de validité
+            message = 'Document XML mal formé ou incomplet'
+        return None, {
+            'valid': False,
+            'mode': 'streaming',
+            'message': f'Erreur de syntaxe XML: {message}',
+            'errors': schema_errors + [{
+                'line': syntax_error.lineno or None,
+                'message': message,
+                'column': syntax_error.offset
+            }],
+            'timings': timings
+        }
+
+    if schema_errors:
+        return None, {
+            'valid': False,
+            'mode': 'streaming',
+            'message': 'Le fichier XML contient des erreurs',
+            'errors': schema_errors,
+            'truncated': truncated,
+            'timings': timings
+        }
+
+    tree = events.root.getroottree() if keep_tree else None
+    return tree, {
+        'valid': True,
+        'mode': 'streaming',
+        'message': 'Le fichier XML est valide',
+        'timings': timings
+    }
+
+
+
+XS = '{http://www.w3.org/2001/XMLSchema}'
+
+
+def fragment_schemas(xsd_path):
+    """Dérive du schéma deux schémas compilés : (squelette, environnement)
+
+    Le squelette valide le document en ignorant le contenu des
+    environnements ; le second déclare 'environment' (environmentType)
+    comme élément global pour valider chaque environnement en place.
+    """
+    xsd_doc = etree.parse(xsd_path)
+
+    environment_doc = copy.deepcopy(xsd_doc)
+    environment_doc.getroot().append(
+        etree.Element(f'{XS}element', name='environment', type='environmentType')
+    )
+
+    skeleton_doc = copy.deepcopy(xsd_doc)
+    skeleton = skeleton_doc.getroot()
+    for element in skeleton.iterfind(f'{XS}complexType[@name="environmentsType"]//{XS}element[@name="environment"]'):
+        element.set('type', 'opaqueEnvironmentType')
+    opaque = etree.SubElement(skeleton, f'{XS}complexType', name='opaqueEnvironmentType')
+    etree.SubElement(
+        etree.SubElement(opaque, f'{XS}sequence'), f'{XS}any',
+        processContents='skip', minOccurs='0', maxOccurs='unbounded'
+    )
+    etree.SubElement(opaque, f'{XS}anyAttribute', processContents='skip')
+
+    return etree.XMLSchema(skeleton_doc), etree.XMLSchema(environment_doc)
+
+
+def _sort_key(error):
+    return (error['line'] is None, error['line'] or 0)
+
+
+def fragment_spans(source, environments):
+    """Plages d'octets du texte source couvrant chaque environnement, ou None
+
+    La plage d'un environnement va du début de sa ligne d'ouverture à la
+    fin de la ligne d'ouverture du suivant : elle contient tout son texte
+    sans dépendre de la position des fins de balises. Retourne None si
+    les positions ne peuvent pas être retrouvées (plusieurs environnements
+    sur une même ligne, numéros de ligne saturés...).
+    """
+    starts = []
+    position = 0
+    line = 1
+    for env in environments:
+        target = env.sourceline
+        while True:
+            found = source.find(b'<environment', position)
+            if found < 0:
+                return None
+            line += source.count(b'\n', position, found)
+            position = found + 1
+            if line == target:
+                break
+            if line > target:
+                return None
+        start = source.rfind(b'\n', 0, found) + 1
+        if starts and start == starts[-1]:
+            # Deux environnements sur une même ligne : plages confondues
+            return None
+        starts.append(start)
+
+    spans = []
+    for start, next_start in zip(starts, starts[1:] + [None]):
+        end = len(source) if next_start is None else source.find(b'\n', next_start)
+        spans.append((start, len(source) if end < 0 else end))
+    return spans
+
+
+class IncrementalValidator:
+    """Validation par environnement, résultats en cache par empreinte de sous-arbre
+
+    L'empreinte est calculée sur le texte source de l'environnement quand
+    il est fourni (bien moins coûteux que de resérialiser le sous-arbre).
+    Les erreurs sont conservées avec une ligne relative au début de
+    l'environnement : un environnement inchangé mais déplacé dans le
+    document réutilise son résultat avec des lignes recalculées.
+    """
+    def __init__(self, xsd_path, max_entries=4096):
+        self.xsd_path = xsd_path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _schemas(self, version):
+        # Un jeu de schémas par thread : un XMLSchema ne valide qu'un document à la fois
+        schemas = getattr(self._local, 'schemas', None)
+        if schemas is None or schemas[0] != version:
+            schemas = (version,) + fragment_schemas(self.xsd_path)
+            self._local.schemas = schemas
+        return schemas[1], schemas[2]
+
+    def _lookup(self, key):
+        with self._lock:
+            errors = self._results.get(key)
+            if errors is None:
+                self.misses += 1
+            else:
+                self._results.move_to_end(key)
+                self.hits += 1
+            return errors
+
+    def _store(self, key, errors):
+        with self._lock:
+            self._results[key] = errors
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def validate(self, xml_doc, version='', max_errors=None, source=None):
+        """Valide l'arbre ; retourne (valide, erreurs, statistiques)
+
+        version : version du schéma source (invalide le cache si elle change).
+        source : octets dont l'arbre est issu, pour calculer les empreintes.
+        """
+        skeleton_schema, environment_schema = self._schemas(version)
+        _, errors = validate_document(xml_doc, skeleton_schema)
+        root = xml_doc.getroot() if hasattr(xml_doc, 'getroot') else xml_doc
+
+        environments = root.findall('environments/environment')
+        spans = fragment_spans(source, environments) if source is not None else None
+        revalidated = 0
+        for index, env in enumerate(environments):
+            if spans is not None:
+                start, end = spans[index]
+                key = 'source:' + hashlib.sha256(memoryview(source)[start:end]).hexdigest()
+            else:
+                key = 'tree:' + hashlib.sha256(etree.tostring(env, with_tail=False)).hexdigest()
+            key = f'{version}:{key}'
+            relative = self._lookup(key)
+            if relative is None:
+                revalidated += 1
+                _, env_errors = validate_document(env, environment_schema)
+                relative = [
+                    dict(error, line=None if error['line'] is None else error['line'] - env.sourceline)
+                    for error in env_errors
+                ]
+                self._store(key, relative)
+            errors.extend(
+                dict(error, line=None if error['line'] is None else error['line'] + env.sourceline)
+                for error in relative
+            )
+
+        errors.sort(key=_sort_key)
+        if max_errors:
+            errors = errors[:max_errors]
+        return not errors, errors, {'environments': len(environments), 'revalidated': revalidated}
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._results),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses
+            }
@@ -0,0 +1,165 @@
+"""
+Pool de processus pour la validation et les transformations
+
+Les processus sont démarrés à la création du pool (méthode 'spawn') et
+compilent le schéma et les feuilles XSLT une fois pour toutes. La file
+d'attente est bornée : au-delà, submit() lève PoolBusy et l'API répond
+429 avec Retry-After au lieu d'accumuler du retard.
+
+Un worker mort (OOM, signal) casse tout le ProcessPoolExecutor, et un
+traitement bloqué garde son worker indéfiniment : dans les deux cas le
+pool est recyclé (processus restants arrêtés, nouveaux processus
+démarrés), ce qui libère aussi les places des traitements interrompus.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+# Modes d'exécution des traitements CPU de l'API
+WORKER_MODES = ('thread', 'process')
+
+
+class PoolBusy(Exception):
+    """La file d'attente du pool est pleine"""
+
+    def __init__(self, retry_after):
+        super().__init__('File d\'attente des workers pleine')
+        self.retry_after = retry_after
+
+
+class JobTimeout(Exception):
+    """Un traitement a dépassé le délai imparti"""
+
+
+def _init_worker(config):
+    """Initialise un worker : configuration de l'API et compilations"""
+    import app as app_module
+    app_module.app.config.update(config)
+    # Objets construits à l'import de app.py avec la configuration par défaut
+    app_module.include_resolver.max_entries = app_module.app.config['INCLUDE_CACHE_SIZE']
+    app_module.include_resolver.huge_tree = app_module.app.config['XML_HUGE_TREE']
+    app_module.metrics.enabled = app_module.app.config['METRICS_ENABLED']
+    app_module.registry.warm_up()
+
+
+def _ping():
+    return True
+
+
+def run_job(name, *args):
+    """Exécute dans le worker une fonction du pipeline de app.py"""
+    import app as app_module
+    return getattr(app_module, name)(*args)
+
+
+class WorkerPool:
+    """Processus préforkés avec file bornée et délai par traitement"""
+
+    def __init__(self, processes, max_queue, timeout=30, config=None, retry_after=1):
+        self.processes = processes
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        # Traitements en cours + en attente : au plus un par worker plus la file
+        self._slots = threading.BoundedSemaphore(processes + max_queue)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.recycled = 0
+        self._config = dict(config or {})
+        # Distinct de _lock : les callbacks de fin de traitement prennent _lock pendant un recyclage
+        self._executor_lock = threading.Lock()
+        self._executor = self._start()
+
+    def _start(self):
+        executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self._config,)
+        )
+        # Démarre tous les processus maintenant plutôt qu'à la première requête
+        for future in [executor.submit(_ping) for _ in range(self.processes)]:
+            future.result()
+        return executor
+
+    def _recycle(self, executor):
+        """Remplace un executor cassé ou bloqué ; ses traitements en cours échouent (BrokenProcessPool)"""
+        with self._executor_lock:
+            if self._executor is not executor:
+                # Déjà remplacé par un autre thread
+                return
+            for process in list((getattr(executor, '_processes', None) or {}).values()):
+                process.terminate()
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._start()
+        with self._lock:
+            self.recycled += 1
+
+    def _submit(self, func, *args):
+        """Soumet un traitement ; retourne (executor, future)"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PoolBusy(self.retry_after)
+        with self._lock:
+            self._pending += 1
+        try:
+            executor = self._executor
+            try:
+                future = executor.submit(func, *args)
+            except BrokenProcessPool:
+                self._recycle(executor)
+                executor = self._executor
+                future = executor.submit(func, *args)
+        except BaseException:
+            self._release()
+            raise
+        # La place n'est libérée qu'à la fin réelle du traitement, ou à l'arrêt de son worker
+        future.add_done_callback(lambda _: self._release())
+        return executor, future
+
+    def submit(self, func, *args):
+        """Soumet un traitement ; lève PoolBusy si la file est pleine"""
+        return self._submit(func, *args)[1]
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def run(self, func, *args, timeout=None):
+        """Soumet puis attend le résultat ; lève PoolBusy ou JobTimeout"""
+        timeout = timeout or self.timeout
+        for attempt in range(2):
+            executor, future = self._submit(func, *args)
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeout:
+                with self._lock:
+                    self.timeouts += 1
+                # future.cancel() n'arrête pas un traitement démarré : son worker est arrêté
+                self._recycle(executor)
+                raise JobTimeout(f'Traitement interrompu après {timeout} s')
+            except BrokenProcessPool:
+                # Worker mort, ou pool recyclé pendant le traitement : une seule nouvelle tentative
+                self._recycle(executor)
+                if attempt:
+                    raise
+
+    def stats(self):
+        with self._lock:
+            return {
+                'processes': self.processes,
+                'max_queue': self.max_queue,
+                'pending': self._pending,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'recycled': self.recycled
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)